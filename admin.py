@@ -0,0 +1,27 @@
+# SentimentBot Pro - Access control for admin and debug endpoints
+import hmac
+from functools import wraps
+
+from flask import request, jsonify
+
+from config import Config
+
+ADMIN_HEADER = 'X-Admin-Token'
+
+
+def is_admin_request():
+    """True when the request carries the configured admin token"""
+    token = request.headers.get(ADMIN_HEADER)
+    if not Config.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+
+def admin_required(view):
+    """Hide a view unless the request is authenticated as admin"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            return jsonify({'error': 'Not found'}), 404
+        return view(*args, **kwargs)
+    return wrapper
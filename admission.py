@@ -0,0 +1,195 @@
+# SentimentBot Pro - Admission control and adaptive degradation
+#
+# Each worker tracks the requests it is serving and, when the front proxy sends
+# X-Request-Start, how long a request queued before reaching it. The load is
+# the larger of in-flight / ADMISSION_MAX_IN_FLIGHT and queue delay /
+# ADMISSION_MAX_QUEUE_DELAY_MS. As it grows, requests step down through the
+# degradation levels:
+#
+#   normal      everything runs
+#   no_summary  summaries are served from cache and suggestions are skipped
+#   lite        sentiment comes from the dependency-free lite engine
+#   shed        the request is refused with 503 and Retry-After
+#
+# A request may also carry its own budget in X-Request-Timeout-Ms. It is shed
+# if the budget ran out while queueing, and falls to the cheapest level once
+# the budget is spent mid-request. The level is returned in the
+# X-Degradation-Level header and exported to /metrics.
+import threading
+import time
+
+from flask import g, has_app_context, jsonify, request
+
+from config import Config
+from metrics import registry
+
+LEVELS = ('normal', 'no_summary', 'lite', 'shed')
+NORMAL, NO_SUMMARY, LITE, SHED = range(len(LEVELS))
+# Load (fraction of the limits) at which each level above normal starts
+THRESHOLDS = (0.5, 0.75, 1.0)
+
+LEVEL_HEADER = 'X-Degradation-Level'
+REQUEST_START_HEADER = 'X-Request-Start'
+TIMEOUT_HEADER = 'X-Request-Timeout-Ms'
+
+registry.describe('sentimentbot_admission_requests_total', 'counter',
+                  'Requests under admission control by degradation level')
+
+
+def queue_delay(header, now=None):
+    """Seconds since the proxy received the request, from an X-Request-Start value (or None)
+
+    Accepts nginx's ``t=<seconds>`` and bare seconds, milliseconds or microseconds.
+    """
+    if not header:
+        return None
+    try:
+        start = float(header.strip().lstrip('t='))
+    except ValueError:
+        return None
+    if start > 1e14:
+        start /= 1e6
+    elif start > 1e11:
+        start /= 1e3
+    now = time.time() if now is None else now
+    return max(0.0, now - start)
+
+
+class AdmissionController:
+    """In-flight and queue-delay tracking that maps the current load to a degradation level"""
+
+    def __init__(self, max_in_flight=Config.ADMISSION_MAX_IN_FLIGHT,
+                 max_queue_delay_ms=Config.ADMISSION_MAX_QUEUE_DELAY_MS,
+                 retry_after=Config.ADMISSION_RETRY_AFTER_SECONDS):
+        self.max_in_flight = max_in_flight
+        self.max_queue_delay = max_queue_delay_ms / 1000.0
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.last_level = NORMAL
+        self._lock = threading.Lock()
+        self.stats = {level: 0 for level in LEVELS}
+        self.stats['deadline_exceeded'] = 0
+
+    @property
+    def enabled(self):
+        return bool(self.max_in_flight or self.max_queue_delay)
+
+    def load(self, in_flight, delay=None):
+        """Current load as a fraction of the configured limits"""
+        load = 0.0
+        if self.max_in_flight:
+            load = in_flight / self.max_in_flight
+        if self.max_queue_delay and delay is not None:
+            load = max(load, delay / self.max_queue_delay)
+        return load
+
+    def level_for(self, load):
+        level = NORMAL
+        for threshold in THRESHOLDS:
+            if load >= threshold:
+                level += 1
+        return level
+
+    def admit(self, delay=None):
+        """Level for a new request; anything below SHED is counted in flight until release()"""
+        with self._lock:
+            level = self.level_for(self.load(self.in_flight, delay))
+            if level < SHED:
+                self.in_flight += 1
+            self.last_level = level
+            self.stats[LEVELS[level]] += 1
+        return level
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = self.in_flight
+            stats['last_level'] = LEVELS[self.last_level]
+        stats['max_in_flight'] = self.max_in_flight
+        stats['max_queue_delay_ms'] = self.max_queue_delay * 1000
+        return stats
+
+
+controller = AdmissionController()
+
+
+def current_level():
+    """Degradation level of the current request; escalates to the cheapest one past its deadline"""
+    if not has_app_context():
+        return NORMAL
+    level = g.get('_admission_level', NORMAL)
+    deadline = g.get('_admission_deadline')
+    if deadline is not None and level < LITE and time.monotonic() >= deadline:
+        level = g._admission_level = LITE
+        controller.stats['deadline_exceeded'] += 1
+    return level
+
+
+def degraded(level):
+    """True when the current request runs at ``level`` or below it"""
+    return current_level() >= level
+
+
+def level_name():
+    return LEVELS[current_level()]
+
+
+def _shed(error):
+    response = jsonify({'error': error, 'degradation_level': LEVELS[SHED]})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(controller.retry_after)
+    response.headers[LEVEL_HEADER] = LEVELS[SHED]
+    return response
+
+
+def init_app(app, endpoints):
+    """Apply admission control to the given view endpoints"""
+    endpoints = frozenset(endpoints)
+    registry.register_gauge('sentimentbot_admission_in_flight', 'Requests under admission control being served',
+                            lambda: controller.in_flight)
+    registry.register_gauge('sentimentbot_degradation_level',
+                            'Degradation level given to the latest request (0 normal .. 3 shed)',
+                            lambda: controller.last_level)
+
+    @app.before_request
+    def _admit():
+        if request.endpoint not in endpoints:
+            return None
+        delay = queue_delay(request.headers.get(REQUEST_START_HEADER))
+        timeout = request.headers.get(TIMEOUT_HEADER, type=float)
+        if timeout is not None:
+            remaining = timeout / 1000.0 - (delay or 0.0)
+            if remaining <= 0:
+                controller.stats['deadline_exceeded'] += 1
+                registry.inc('sentimentbot_admission_requests_total', (('level', LEVELS[SHED]),))
+                return _shed('Request deadline exceeded before processing')
+            g._admission_deadline = time.monotonic() + remaining
+        if not controller.enabled:
+            g._admission_level = NORMAL
+            return None
+
+        level = controller.admit(delay)
+        registry.inc('sentimentbot_admission_requests_total', (('level', LEVELS[level]),))
+        if level == SHED:
+            return _shed('Server overloaded, please retry')
+        g._admission_level = level
+        g._admission_admitted = True
+        return None
+
+    @app.after_request
+    def _report_level(response):
+        if '_admission_level' in g:
+            response.headers[LEVEL_HEADER] = level_name()
+        return response
+
+    @app.teardown_request
+    def _release(exc):
+        # Streamed responses are torn down once the stream has been sent
+        if g.pop('_admission_admitted', False):
+            controller.release()
+
+    return app
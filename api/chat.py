@@ -1,12 +1,9 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from textblob import TextBlob
-import nltk
-import json
 from datetime import datetime
 import os
+import sys
 import random
-from collections import defaultdict
 
 # Load environment variables
 try:
@@ -15,65 +12,39 @@ try:
 except ImportError:
     pass
 
-app = Flask(__name__)
-CORS(app)
-
-# Set NLTK data path for Vercel
-NLTK_DATA_PATH = os.environ.get('NLTK_DATA_PATH', '/tmp/nltk_data')
-nltk.data.path.append(NLTK_DATA_PATH)
-
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/vader_lexicon')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    print(f"Downloading NLTK data to {NLTK_DATA_PATH}...")
-    nltk.download('punkt', download_dir=NLTK_DATA_PATH)
-    nltk.download('vader_lexicon', download_dir=NLTK_DATA_PATH)
-    nltk.download('stopwords', download_dir=NLTK_DATA_PATH)
-    print("NLTK data download complete.")
-
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+# Make the shared engine package importable from the api/ directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Initialize sentiment analyzers
-vader_analyzer = SentimentIntensityAnalyzer()
-stop_words = set(stopwords.words('english'))
+from config import Config
+from sentiment_engine import get_engine
+import metrics
+import tracing
+import profiling
+from session_store import create_session_store
+from response_fields import requested_fields
 
-# Sentiment keywords for enhanced analysis
-POSITIVE_WORDS = {
-    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'awesome',
-    'happy', 'joy', 'love', 'like', 'enjoy', 'pleased', 'satisfied', 'perfect',
-    'beautiful', 'nice', 'wonderful', 'brilliant', 'outstanding', 'superb'
-}
-
-NEGATIVE_WORDS = {
-    'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate', 'dislike',
-    'sad', 'angry', 'frustrated', 'disappointed', 'upset', 'worried', 'anxious',
-    'depressed', 'miserable', 'painful', 'suffering', 'terrible', 'dreadful'
-}
-
-# Topic detection keywords and categories
-TOPIC_KEYWORDS = {
-    'technology': ['computer', 'software', 'programming', 'ai', 'machine learning', 'data', 'internet', 'app', 'digital', 'tech', 'code', 'algorithm', 'database', 'cloud', 'cybersecurity'],
-    'health': ['health', 'medical', 'doctor', 'hospital', 'medicine', 'symptoms', 'treatment', 'exercise', 'diet', 'nutrition', 'fitness', 'wellness', 'mental health', 'therapy', 'recovery'],
-    'work': ['job', 'career', 'work', 'office', 'business', 'company', 'project', 'meeting', 'colleague', 'boss', 'salary', 'promotion', 'workplace', 'professional', 'industry'],
-    'relationships': ['friend', 'family', 'partner', 'relationship', 'love', 'dating', 'marriage', 'parent', 'child', 'sibling', 'romance', 'connection', 'social', 'community']
+app = Flask(__name__)
+CORS(app)
+metrics.init_app(app)
+tracing.init_app(app)
+profiling.init_app(app)
+
+# Initialize the sentiment engine ('full' ensemble unless ENGINE_PROFILE says otherwise)
+engine = get_engine(Config.ENGINE_PROFILE or 'full')
+
+# Conversation context and topic tracking (SESSION_BACKEND: bounded in-process LRU, shared SQLite
+# or stateless signed tokens carried by the client)
+conversation_contexts = create_session_store()
+
+# /chat response fields and named profiles; 'full' is the response /chat has always returned
+CHAT_FIELDS = ('user_message', 'bot_response', 'final_sentiment', 'sentiment_analysis', 'timestamp',
+               'confidence', 'detected_topics', 'conversation_summary', 'suggestions', 'session_id')
+CHAT_PROFILES = {
+    'full': frozenset(CHAT_FIELDS) - {'final_sentiment'},
+    'compact': frozenset(('bot_response', 'final_sentiment', 'session_id')),
+    'sentiment': frozenset(('final_sentiment', 'sentiment_analysis', 'confidence', 'session_id')),
 }
 
-# Conversation context and topic tracking
-conversation_contexts = defaultdict(lambda: {
-    'messages': [],
-    'topics': set(),
-    'sentiment_history': [],
-    'conversation_length': 0,
-    'last_activity': datetime.now(),
-    'user_interests': set(),
-    'suggested_topics': []
-})
-
 @app.route('/chat', methods=['POST'])
 def chat():
     try:
@@ -87,120 +58,74 @@ def chat():
         if not user_input:
             return jsonify({'error': 'Empty message'}), 400
 
+        # Stages whose outputs were not asked for are skipped
+        try:
+            fields = requested_fields(data, request.args, CHAT_FIELDS, CHAT_PROFILES)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # Analyze sentiment
-        sentiment_results = analyze_sentiment_comprehensive(user_input)
+        sentiment_results = analyze_sentiment_comprehensive(user_input, breakdown='sentiment_analysis' in fields)
         
-        # Generate response
-        bot_response = generate_contextual_response(sentiment_results, user_input, session_id)
+        response_data = {}
         
-        # Update conversation context
-        update_conversation_context(session_id, user_input)
+        # Generate response
+        if 'bot_response' in fields:
+            response_data['bot_response'] = generate_contextual_response(sentiment_results, user_input, session_id)
         
         # Detect topics
         detected_topics = detect_topics(user_input)
-        conversation_contexts[session_id]['topics'].update(detected_topics)
         
-        # Generate suggestions
-        suggestions = generate_topic_suggestions(session_id, user_input, sentiment_results)
+        # Messages of one session are handled one at a time; other sessions proceed in parallel
+        with conversation_contexts.session_lock(session_id):
+            # Update conversation context (one store write per message)
+            update_conversation_context(session_id, user_input, detected_topics, sentiment_results['combined_score'])
+            
+            # Generate suggestions
+            if 'suggestions' in fields:
+                response_data['suggestions'] = generate_topic_suggestions(session_id, user_input, sentiment_results)
+            
+            if 'conversation_summary' in fields:
+                response_data['conversation_summary'] = get_conversation_summary(session_id)
         
-        return jsonify({
-            'user_message': user_input,
-            'bot_response': bot_response,
-            'sentiment_analysis': sentiment_results,
-            'timestamp': datetime.now().isoformat(),
-            'confidence': calculate_confidence(sentiment_results),
-            'detected_topics': list(detected_topics),
-            'conversation_summary': get_conversation_summary(session_id),
-            'suggestions': suggestions,
-            'session_id': session_id
-        })
+        if 'user_message' in fields:
+            response_data['user_message'] = user_input
+        if 'final_sentiment' in fields:
+            response_data['final_sentiment'] = sentiment_results['sentiment']
+        if 'sentiment_analysis' in fields:
+            response_data['sentiment_analysis'] = sentiment_results
+        if 'timestamp' in fields:
+            response_data['timestamp'] = datetime.now().isoformat()
+        if 'confidence' in fields:
+            response_data['confidence'] = calculate_confidence(sentiment_results)
+        if 'detected_topics' in fields:
+            response_data['detected_topics'] = list(detected_topics)
+        if 'session_id' in fields:
+            response_data['session_id'] = session_id
+        if conversation_contexts.backend == 'stateless':
+            # Serverless: the client carries the session to the next invocation
+            response_data['session_state'] = conversation_contexts.client_state(session_id)
+        return jsonify(response_data)
     
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-def analyze_sentiment_comprehensive(text):
-    """Comprehensive sentiment analysis using multiple methods"""
-    # TextBlob analysis
-    blob = TextBlob(text)
-    textblob_score = blob.sentiment.polarity
-    
-    # VADER analysis
-    vader_scores = vader_analyzer.polarity_scores(text)
-    vader_score = vader_scores['compound']
-    
-    # Keyword analysis
-    keyword_score = analyze_keywords(text)
-    
-    # Rule-based analysis
-    rule_score = rule_based_sentiment(text)
-    
-    # Calculate weighted average
-    weights = [0.3, 0.4, 0.2, 0.1]  # TextBlob, VADER, Keywords, Rules
-    combined_score = (
-        textblob_score * weights[0] +
-        vader_score * weights[1] +
-        keyword_score * weights[2] +
-        rule_score * weights[3]
-    )
-    
-    # Determine sentiment
-    if combined_score > 0.1:
-        sentiment = 'positive'
-    elif combined_score < -0.1:
-        sentiment = 'negative'
-    else:
-        sentiment = 'neutral'
-    
-    return {
-        'sentiment': sentiment,
-        'combined_score': combined_score,
-        'confidence': abs(combined_score),
-        'breakdown': {
-            'textblob': textblob_score,
-            'vader': vader_score,
-            'keywords': keyword_score,
-            'rules': rule_score
-        }
-    }
+def analyze_sentiment_comprehensive(text, breakdown=True):
+    """Comprehensive sentiment analysis using the configured engine profile
 
-def analyze_keywords(text):
-    """Analyze sentiment based on keyword presence"""
-    words = set(word.lower() for word in word_tokenize(text))
-    positive_count = len(words.intersection(POSITIVE_WORDS))
-    negative_count = len(words.intersection(NEGATIVE_WORDS))
-    
-    if positive_count > negative_count:
-        return 0.5
-    elif negative_count > positive_count:
-        return -0.5
-    else:
-        return 0.0
-
-def rule_based_sentiment(text):
-    """Rule-based sentiment analysis"""
-    score = 0.0
-    
-    # Exclamation marks
-    if text.count('!') > 0:
-        score += 0.1 * text.count('!')
-    
-    # Emoticons
-    positive_emoticons = [':)', ':-)', '😊', '😄', '😍', '👍', '❤️']
-    negative_emoticons = [':(', ':-(', '😢', '😭', '😡', '👎', '💔']
-    
-    for emoticon in positive_emoticons:
-        if emoticon in text:
-            score += 0.3
-    
-    for emoticon in negative_emoticons:
-        if emoticon in text:
-            score -= 0.3
-    
-    # Capitalization (all caps = emphasis)
-    if text.isupper() and len(text) > 3:
-        score += 0.2
-    
-    return max(-1.0, min(1.0, score))
+    ``breakdown=False`` leaves out the per-analyzer scores.
+    """
+    results = engine.analyze(text)
+    sentiment_results = {
+        'sentiment': results['final_sentiment'],
+        'combined_score': results['combined_score'],
+        'confidence': results['confidence'],
+    }
+    if breakdown:
+        sentiment_results['breakdown'] = {
+            name: engine.component_score(name, results[name]) for name in engine.analyzers
+        }
+    return sentiment_results
 
 def generate_contextual_response(sentiment_results, user_input, session_id):
     """Generate contextual response based on sentiment and conversation"""
@@ -240,35 +165,20 @@ def calculate_confidence(sentiment_results):
     else:
         return 'low'
 
-def update_conversation_context(session_id, user_input):
-    """Update conversation context for a session"""
-    context = conversation_contexts[session_id]
-    context['messages'].append({
-        'text': user_input,
-        'timestamp': datetime.now().isoformat()
-    })
-    context['conversation_length'] += 1
-    context['last_activity'] = datetime.now()
+def update_conversation_context(session_id, user_input, topics=(), sentiment_score=None):
+    """Update conversation context for a session and return it"""
+    return conversation_contexts.record_message(session_id, user_input, topics, sentiment_score)
 
 def detect_topics(text):
     """Detect topics from user input"""
-    text_lower = text.lower()
-    detected_topics = set()
-    
-    for topic, keywords in TOPIC_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                detected_topics.add(topic)
-                break
-    
-    return detected_topics
+    return engine.detect_topics(text)
 
 def generate_topic_suggestions(session_id, user_input, sentiment_results):
     """Generate topic suggestions based on conversation"""
-    context = conversation_contexts[session_id]
+    context = conversation_contexts.get(session_id)
     suggestions = []
     
-    if context['conversation_length'] < 3:
+    if context is None or context['conversation_length'] < 3:
         suggestions.append("Tell me more about your day")
         suggestions.append("What's on your mind lately?")
     else:
@@ -284,7 +194,9 @@ def generate_topic_suggestions(session_id, user_input, sentiment_results):
 
 def get_conversation_summary(session_id):
     """Get conversation summary for a session"""
-    context = conversation_contexts[session_id]
+    context = conversation_contexts.get(session_id)
+    if context is None:
+        return {'message_count': 0, 'topics': [], 'last_activity': None}
     return {
         'message_count': context['conversation_length'],
         'topics': list(context['topics']),
@@ -297,12 +209,8 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'services': {
-            'textblob': 'active',
-            'vader': 'active',
-            'keyword_analysis': 'active',
-            'rule_based': 'active'
-        }
+        'engine_profile': engine.profile,
+        'services': {name: 'active' for name in engine.analyzers}
     })
 
 # For Vercel deployment
@@ -1,106 +1,111 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
-from textblob import TextBlob
-import nltk
-import re
 import json
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 import random
-from collections import defaultdict
+import time
 
 # Load environment variables
 load_dotenv()
 
+from config import Config
+from sentiment_engine import get_engine
+from admin import admin_required
+from memory_stats import estimate_store_size, process_memory
+from session_store import EMPTY_CONTEXT, create_session_store
+import metrics
+import tracing
+import profiling
+import session_router
+import session_import
+import admission
+import idempotency
+import static_assets
+from response_fields import requested_fields
+from metrics import observe_stage, record_cache, record_stream_event
+
 app = Flask(__name__)
 CORS(app)
-
-# Set NLTK data path for Vercel
-NLTK_DATA_PATH = os.environ.get('NLTK_DATA_PATH', '/tmp/nltk_data')
-nltk.data.path.append(NLTK_DATA_PATH)
-
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/vader_lexicon')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    print(f"Downloading NLTK data to {NLTK_DATA_PATH}...")
-    nltk.download('punkt', download_dir=NLTK_DATA_PATH)
-    nltk.download('vader_lexicon', download_dir=NLTK_DATA_PATH)
-    nltk.download('stopwords', download_dir=NLTK_DATA_PATH)
-    print("NLTK data download complete.")
-
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-
-# Initialize sentiment analyzers
-vader_analyzer = SentimentIntensityAnalyzer()
-stop_words = set(stopwords.words('english'))
-
-# Try to import optional dependencies
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except ImportError:
-    NUMPY_AVAILABLE = False
-    print("Warning: numpy not available, some features may be limited")
-
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
-    print("Warning: pandas not available, some features may be limited")
-
-# Sentiment keywords for enhanced analysis
-POSITIVE_WORDS = {
-    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'awesome',
-    'happy', 'joy', 'love', 'like', 'enjoy', 'pleased', 'satisfied', 'perfect',
-    'beautiful', 'nice', 'wonderful', 'brilliant', 'outstanding', 'superb'
-}
-
-NEGATIVE_WORDS = {
-    'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate', 'dislike',
-    'sad', 'angry', 'frustrated', 'disappointed', 'upset', 'worried', 'anxious',
-    'depressed', 'miserable', 'painful', 'suffering', 'terrible', 'dreadful'
-}
+metrics.init_app(app)
+tracing.init_app(app)
+profiling.init_app(app)
+# Static files served from memory, fingerprinted and precompressed
+static_assets.init_app(app)
+# Retries carrying the same Idempotency-Key get the stored response; checked before admission so replays are never shed
+idempotency.init_app(app, ('chat', 'chat_batch', 'analyze_sentiment_only'))
+# Under overload these routes skip summaries, then switch to the lite engine, then shed with 503
+admission.init_app(app, ('chat', 'chat_stream', 'chat_batch', 'analyze_sentiment_only', 'long_conversation'))
+
+# Initialize the sentiment engine ('full' ensemble unless ENGINE_PROFILE says otherwise)
+engine = get_engine(Config.ENGINE_PROFILE or 'full')
+lite_engine = get_engine('lite')
+
+def analysis_engine():
+    """Engine for the current request: the lite one once admission control degrades it that far"""
+    return lite_engine if admission.degraded(admission.LITE) else engine
 
 # Topic detection keywords and categories
-TOPIC_KEYWORDS = {
-    'technology': ['computer', 'software', 'programming', 'ai', 'machine learning', 'data', 'internet', 'app', 'digital', 'tech', 'code', 'algorithm', 'database', 'cloud', 'cybersecurity'],
-    'health': ['health', 'medical', 'doctor', 'hospital', 'medicine', 'symptoms', 'treatment', 'exercise', 'diet', 'nutrition', 'fitness', 'wellness', 'mental health', 'therapy', 'recovery'],
-    'education': ['school', 'university', 'college', 'study', 'learning', 'course', 'degree', 'student', 'teacher', 'professor', 'education', 'academic', 'research', 'knowledge', 'skill'],
-    'work': ['job', 'career', 'work', 'office', 'business', 'company', 'project', 'meeting', 'colleague', 'boss', 'salary', 'promotion', 'workplace', 'professional', 'industry'],
-    'relationships': ['friend', 'family', 'partner', 'relationship', 'love', 'dating', 'marriage', 'parent', 'child', 'sibling', 'romance', 'connection', 'social', 'community'],
-    'finance': ['money', 'finance', 'investment', 'banking', 'budget', 'savings', 'expenses', 'income', 'tax', 'insurance', 'loan', 'credit', 'financial', 'economy', 'market'],
-    'travel': ['travel', 'vacation', 'trip', 'destination', 'hotel', 'flight', 'tourism', 'adventure', 'explore', 'journey', 'culture', 'experience', 'sightseeing', 'backpacking'],
-    'hobbies': ['hobby', 'interest', 'passion', 'activity', 'sport', 'music', 'art', 'reading', 'gaming', 'cooking', 'gardening', 'photography', 'crafting', 'collecting', 'outdoor'],
-    'current_events': ['news', 'politics', 'world', 'society', 'environment', 'climate', 'pandemic', 'election', 'government', 'policy', 'social issues', 'global', 'current affairs'],
-    'personal_development': ['growth', 'self-improvement', 'goals', 'motivation', 'success', 'happiness', 'mindset', 'productivity', 'leadership', 'confidence', 'skills', 'development', 'achievement']
+TOPIC_KEYWORDS = Config.TOPIC_KEYWORDS
+
+# Conversation context and topic tracking (SESSION_BACKEND: bounded in-process LRU, shared SQLite
+# or stateless signed tokens carried by the client)
+conversation_contexts = create_session_store()
+# Session handoff endpoints for session_router.py (answer 404 outside a router pool)
+session_router.init_worker(app, conversation_contexts)
+
+def get_context(session_id):
+    """Return the stored context for a session, or EMPTY_CONTEXT without creating one"""
+    context = conversation_contexts.get(session_id)
+    return EMPTY_CONTEXT if context is None else context
+
+# Per-analyzer timings inside /chat and /chat/stream
+_record_analyzer_stage = metrics.stage_recorder('/chat', prefix='sentiment_')
+_record_stream_analyzer_stage = metrics.stage_recorder('/chat/stream', prefix='sentiment_')
+_record_batch_analyzer_stage = metrics.stage_recorder('/chat/batch', prefix='sentiment_')
+
+metrics.registry.register_gauge('sentimentbot_sessions', 'Sessions held in the session store',
+                                lambda: len(conversation_contexts))
+metrics.registry.register_gauge('sentimentbot_session_messages', 'Messages held in the session store',
+                                conversation_contexts.message_count)
+metrics.registry.register_gauge('sentimentbot_session_store_events', 'Session store lookups, creations and evictions',
+                                lambda: {(('event', name),): value for name, value in conversation_contexts.stats.items()})
+if getattr(conversation_contexts, 'journal', None) is not None:
+    metrics.registry.register_gauge('sentimentbot_session_journal_pending_entries',
+                                    'Session mutations queued but not yet written to the journal',
+                                    conversation_contexts.journal.pending)
+    metrics.registry.register_gauge('sentimentbot_session_journal_flush_lag_seconds',
+                                    'Age of the oldest entry in the last journal batch when it was fsynced',
+                                    lambda: conversation_contexts.journal.stats['last_flush_lag_ms'] / 1000.0)
+if getattr(conversation_contexts, 'cold', None) is not None:
+    metrics.registry.register_gauge('sentimentbot_cold_sessions', 'Idle sessions spilled to the cold tier',
+                                    lambda: len(conversation_contexts.cold))
+    metrics.registry.register_gauge('sentimentbot_cold_tier_events', 'Sessions spilled to, rehydrated from and expired in the cold tier',
+                                    lambda: {(('event', name),): conversation_contexts.cold.stats[name]
+                                             for name in ('spills', 'rehydrations', 'expired')})
+metrics.registry.register_gauge('sentimentbot_engine_info', 'Active sentiment engine profile',
+                                lambda: {(('profile', engine.profile),): 1})
+
+# /chat response fields and named profiles; 'full' is the response /chat has always returned
+CHAT_FIELDS = ('user_message', 'bot_response', 'final_sentiment', 'sentiment_analysis', 'timestamp',
+               'confidence', 'detected_topics', 'conversation_summary', 'suggestions', 'session_id')
+CHAT_PROFILES = {
+    'full': frozenset(CHAT_FIELDS) - {'final_sentiment'},
+    'compact': frozenset(('bot_response', 'final_sentiment', 'session_id')),
+    'sentiment': frozenset(('final_sentiment', 'sentiment_analysis', 'confidence', 'session_id')),
 }
 
-# Conversation context and topic tracking
-conversation_contexts = defaultdict(lambda: {
-    'messages': [],
-    'topics': set(),
-    'sentiment_history': [],
-    'conversation_length': 0,
-    'last_activity': datetime.now(),
-    'user_interests': set(),
-    'suggested_topics': []
-})
-
 @app.route('/')
+@static_assets.cached_page
 def home():
     return render_template('index_local.html')
 
 @app.route('/chat', methods=['POST'])
 def chat():
     try:
-        data = request.get_json()
+        with observe_stage('json_parse'):
+            data = request.get_json()
         if not data or 'message' not in data:
             return jsonify({'error': 'No message provided'}), 400
         
@@ -110,71 +115,230 @@ def chat():
         if not user_input:
             return jsonify({'error': 'Empty message'}), 400
 
-        # Update conversation context
-        update_conversation_context(session_id, user_input)
-        
+        # Stages whose outputs were not asked for are skipped
+        try:
+            fields = requested_fields(data, request.args, CHAT_FIELDS, CHAT_PROFILES)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # Perform sentiment analysis using multiple methods
-        sentiment_results = analyze_sentiment_comprehensive(user_input)
+        with observe_stage('sentiment'):
+            sentiment_results = analysis_engine().analyze(user_input, timer=_record_analyzer_stage)
         
         # Detect topics from user input
-        detected_topics = detect_topics(user_input)
-        conversation_contexts[session_id]['topics'].update(detected_topics)
+        with observe_stage('topic_detection'):
+            detected_topics = detect_topics(user_input)
         
-        # Generate contextual response with long conversation support
-        response = generate_contextual_response(sentiment_results, user_input, session_id)
+        # Prepare response data
+        response_data = {}
         
-        # Generate topic suggestions
-        suggestions = generate_topic_suggestions(session_id, user_input, sentiment_results)
+        # Messages of one session are handled one at a time; other sessions proceed in parallel
+        with conversation_contexts.session_lock(session_id):
+            # Record the message, its topics and score in the session (one store write per message)
+            with observe_stage('update_context'):
+                update_conversation_context(session_id, user_input, detected_topics,
+                                            sentiment_results['combined_score'])
+            
+            # Generate contextual response with long conversation support
+            if 'bot_response' in fields:
+                with observe_stage('response_generation'):
+                    response_data['bot_response'] = generate_contextual_response(sentiment_results, user_input, session_id)
+            
+            # Generate topic suggestions
+            if 'suggestions' in fields and not admission.degraded(admission.NO_SUMMARY):
+                with observe_stage('suggestions'):
+                    response_data['suggestions'] = generate_topic_suggestions(session_id, user_input, sentiment_results)
+            
+            if 'conversation_summary' in fields:
+                with observe_stage('summary'):
+                    response_data['conversation_summary'] = get_conversation_summary(
+                        session_id, recompute=not admission.degraded(admission.NO_SUMMARY))
         
-        # Prepare response data
+        if 'user_message' in fields:
+            response_data['user_message'] = user_input
+        if 'final_sentiment' in fields:
+            response_data['final_sentiment'] = sentiment_results['final_sentiment']
+        if 'sentiment_analysis' in fields:
+            response_data['sentiment_analysis'] = sentiment_results
+        if 'timestamp' in fields:
+            response_data['timestamp'] = datetime.now().isoformat()
+        if 'confidence' in fields:
+            response_data['confidence'] = calculate_confidence(sentiment_results)
+        if 'detected_topics' in fields:
+            response_data['detected_topics'] = list(detected_topics)
+        if 'session_id' in fields:
+            response_data['session_id'] = session_id
+        if admission.degraded(admission.NO_SUMMARY):
+            response_data['degradation_level'] = admission.level_name()
+        if conversation_contexts.backend == 'stateless':
+            response_data['session_state'] = conversation_contexts.client_state(session_id)
+
+        return jsonify(response_data)
+    
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+def sse_event(event, data):
+    """One Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """/chat as Server-Sent Events, each part sent as soon as it is ready
+
+    Events, in order: sentiment (preliminary label from the cheap analyzers),
+    analysis, response, topics, suggestions, summary, done (or error).
+    """
+    start = time.perf_counter()
+    data = request.get_json(silent=True)
+    # Validated before the stream starts: afterwards the status is already 200
+    message = data.get('message') if isinstance(data, dict) else None
+    if not isinstance(message, str):
+        return jsonify({'error': 'No message provided'}), 400
+    
+    user_input = message.strip()
+    session_id = data.get('session_id', 'default')
+    
+    if not user_input:
+        return jsonify({'error': 'Empty message'}), 400
+
+    def emit(event, payload):
+        record_stream_event('/chat/stream', event, time.perf_counter() - start)
+        return sse_event(event, payload)
+
+    def events():
+        try:
+            stream_engine = analysis_engine()
+            preliminary, scores = stream_engine.quick_analyze(user_input)
+            yield emit('sentiment', preliminary)
+
+            # The cheap analyzers' scores are reused rather than recomputed
+            sentiment_results = stream_engine.analyze(user_input, timer=_record_stream_analyzer_stage, scores=scores)
+            yield emit('analysis', {'sentiment_analysis': sentiment_results,
+                                    'confidence': calculate_confidence(sentiment_results)})
+
+            detected_topics = detect_topics(user_input)
+            # The session lock is never held across a yield: a slow client would
+            # otherwise stall every request on the same lock stripe
+            with conversation_contexts.session_lock(session_id):
+                update_conversation_context(session_id, user_input, detected_topics,
+                                            sentiment_results['combined_score'])
+                bot_response = generate_contextual_response(sentiment_results, user_input, session_id)
+            yield emit('response', {'bot_response': bot_response})
+            yield emit('topics', {'detected_topics': list(detected_topics)})
+            degraded = admission.degraded(admission.NO_SUMMARY)
+            if not degraded:
+                with conversation_contexts.session_lock(session_id):
+                    suggestions = generate_topic_suggestions(session_id, user_input, sentiment_results)
+                yield emit('suggestions', {'suggestions': suggestions})
+            with conversation_contexts.session_lock(session_id):
+                summary = get_conversation_summary(session_id, recompute=not degraded)
+            yield emit('summary', {'conversation_summary': summary})
+
+            done = {
+                'user_message': user_input,
+                'session_id': session_id,
+                'timestamp': datetime.now().isoformat()
+            }
+            if admission.degraded(admission.NO_SUMMARY):
+                done['degradation_level'] = admission.level_name()
+            if conversation_contexts.backend == 'stateless':
+                done['session_state'] = conversation_contexts.client_state(session_id)
+            yield emit('done', done)
+        except Exception as e:
+            yield sse_event('error', {'error': f'An error occurred: {str(e)}'})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Several queued messages of one session in a single call
+
+    Messages are scored together and recorded in order, each with its own bot
+    response; the summary and suggestions are computed once, after the last one.
+    """
+    route = '/chat/batch'
+    try:
+        with observe_stage('json_parse', route):
+            data = request.get_json(silent=True)
+        messages = data.get('messages') if isinstance(data, dict) else None
+        if not isinstance(messages, list) or not messages:
+            return jsonify({'error': 'No messages provided'}), 400
+        if len(messages) > Config.CHAT_BATCH_MAX_MESSAGES:
+            return jsonify({'error': f'At most {Config.CHAT_BATCH_MAX_MESSAGES} messages per batch'}), 400
+
+        user_inputs = []
+        for index, message in enumerate(messages):
+            # Either plain strings or {"message": ...} objects, like the /chat body
+            if isinstance(message, dict):
+                message = message.get('message')
+            if not isinstance(message, str) or not message.strip():
+                return jsonify({'error': f'Empty or invalid message at index {index}'}), 400
+            user_inputs.append(message.strip())
+        session_id = data.get('session_id', 'default')
+
+        with observe_stage('sentiment', route):
+            batch_results = analysis_engine().analyze_batch(user_inputs, timer=_record_batch_analyzer_stage)
+        with observe_stage('topic_detection', route):
+            batch_topics = [detect_topics(user_input) for user_input in user_inputs]
+
+        results = []
+        with conversation_contexts.session_lock(session_id):
+            for user_input, sentiment_results, detected_topics in zip(user_inputs, batch_results, batch_topics):
+                with observe_stage('update_context', route):
+                    update_conversation_context(session_id, user_input, detected_topics,
+                                                sentiment_results['combined_score'])
+                # Each reply sees the conversation as it stood after its own message
+                with observe_stage('response_generation', route):
+                    bot_response = generate_contextual_response(sentiment_results, user_input, session_id)
+                results.append({
+                    'user_message': user_input,
+                    'bot_response': bot_response,
+                    'sentiment_analysis': sentiment_results,
+                    'confidence': calculate_confidence(sentiment_results),
+                    'detected_topics': list(detected_topics)
+                })
+
+            degraded = admission.degraded(admission.NO_SUMMARY)
+            suggestions = []
+            if not degraded:
+                with observe_stage('suggestions', route):
+                    suggestions = generate_topic_suggestions(session_id, user_inputs[-1], batch_results[-1])
+            with observe_stage('summary', route):
+                conversation_summary = get_conversation_summary(session_id, recompute=not degraded)
+
         response_data = {
-            'user_message': user_input,
-            'bot_response': response,
-            'sentiment_analysis': sentiment_results,
-            'timestamp': datetime.now().isoformat(),
-            'confidence': calculate_confidence(sentiment_results),
-            'detected_topics': list(detected_topics),
-            'conversation_summary': get_conversation_summary(session_id),
+            'results': results,
+            'conversation_summary': conversation_summary,
             'suggestions': suggestions,
+            'timestamp': datetime.now().isoformat(),
             'session_id': session_id
         }
-        
+        if degraded:
+            response_data['degradation_level'] = admission.level_name()
+        if conversation_contexts.backend == 'stateless':
+            response_data['session_state'] = conversation_contexts.client_state(session_id)
+
         return jsonify(response_data)
-    
+
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
-def update_conversation_context(session_id, user_input):
-    """Update conversation context with new message"""
-    context = conversation_contexts[session_id]
-    context['messages'].append({
-        'message': user_input,
-        'timestamp': datetime.now(),
-        'type': 'user'
-    })
-    context['conversation_length'] += 1
-    context['last_activity'] = datetime.now()
-    
-    # Keep only last 50 messages for memory management
-    if len(context['messages']) > 50:
-        context['messages'] = context['messages'][-50:]
+# Bulk transcript import (admin only); registered here so the summary matches /chat's
+session_import.init_app(app, conversation_contexts, engine, lambda session_id: get_conversation_summary(session_id))
+
+def update_conversation_context(session_id, user_input, topics=(), sentiment_score=None):
+    """Record a new message (with its topics and sentiment score) and return the context"""
+    return conversation_contexts.record_message(session_id, user_input, topics, sentiment_score)
 
 def detect_topics(text):
     """Detect topics from user input text"""
-    text_lower = text.lower()
-    detected_topics = set()
-    
-    for topic, keywords in TOPIC_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                detected_topics.add(topic)
-                break
-    
-    return detected_topics
+    return engine.detect_topics(text)
 
 def generate_topic_suggestions(session_id, user_input, sentiment_results):
     """Generate intelligent topic suggestions based on conversation context"""
-    context = conversation_contexts[session_id]
+    context = get_context(session_id)
     suggestions = []
     
     # Get current topics
@@ -244,38 +408,55 @@ def generate_topic_suggestions(session_id, user_input, sentiment_results):
     unique_suggestions = list(dict.fromkeys(suggestions))
     return unique_suggestions[:5]
 
-def get_conversation_summary(session_id):
-    """Generate a summary of the current conversation"""
-    context = conversation_contexts[session_id]
+def cached_for_version(context, name, compute, stale_ok=False):
+    """Return compute(context), cached on the session until its version changes
+
+    With ``stale_ok`` a value cached for an older version is returned as is.
+    """
+    derived = context['derived']
+    if derived is None:
+        return compute(context)
+    version = context['version']
+    entry = derived.get(name)
+    if entry is not None and (entry[0] == version or stale_ok):
+        record_cache(name, True)
+        return entry[1]
+    record_cache(name, False)
+    value = compute(context)
+    derived[name] = (version, value)
+    return value
+
+def session_etag(context):
+    """Weak ETag identifying one version of one incarnation of a session"""
+    return f"{int(context['created_at'] * 1000):x}-{context['version']}"
+
+def get_conversation_summary(session_id, recompute=True):
+    """Generate a summary of the current conversation
+
+    ``recompute=False`` serves the last cached summary even if messages arrived since.
+    """
+    context = get_context(session_id)
     
     if context['conversation_length'] == 0:
         return "Starting a new conversation"
     
-    summary = {
+    summary = cached_for_version(context, 'conversation_summary', _summarize_conversation, stale_ok=not recompute)
+    # Elapsed time changes without new messages, so it is never cached
+    return dict(summary, conversation_duration=str(datetime.now() - context['last_activity']).split('.')[0])
+
+def _summarize_conversation(context):
+    return {
         'total_messages': context['conversation_length'],
         'topics_discussed': list(context['topics']),
-        'conversation_duration': str(datetime.now() - context['last_activity']).split('.')[0],
         'sentiment_trend': analyze_sentiment_trend(context['sentiment_history']),
+        'average_sentiment': round(context['sentiment_history'].mean, 3),
+        'recent_sentiment': round(context['sentiment_history'].ewma, 3),
         'engagement_level': get_engagement_level(context['conversation_length'])
     }
-    
-    return summary
 
 def analyze_sentiment_trend(sentiment_history):
-    """Analyze the trend of sentiment over the conversation"""
-    if len(sentiment_history) < 2:
-        return "stable"
-    
-    recent_sentiments = sentiment_history[-5:]  # Last 5 sentiments
-    positive_count = sum(1 for s in recent_sentiments if s > 0)
-    negative_count = sum(1 for s in recent_sentiments if s < 0)
-    
-    if positive_count > negative_count:
-        return "improving"
-    elif negative_count > positive_count:
-        return "declining"
-    else:
-        return "stable"
+    """Analyze the trend of sentiment over the last 5 messages"""
+    return sentiment_history.trend(5)
 
 def get_engagement_level(conversation_length):
     """Determine the level of user engagement"""
@@ -297,16 +478,18 @@ def long_conversation():
             return jsonify({'error': 'No session ID provided'}), 400
         
         session_id = data['session_id']
-        context = conversation_contexts[session_id]
-        
-        # Analyze conversation patterns
-        analysis = analyze_conversation_patterns(session_id)
-        
-        # Generate comprehensive suggestions
-        comprehensive_suggestions = generate_comprehensive_suggestions(session_id, analysis)
+        if session_id not in conversation_contexts:
+            return jsonify({'error': 'Session not found'}), 404
         
-        # Get conversation insights
-        insights = get_conversation_insights(session_id)
+        with conversation_contexts.session_lock(session_id):
+            # Analyze conversation patterns
+            analysis = analyze_conversation_patterns(session_id)
+            
+            # Generate comprehensive suggestions
+            comprehensive_suggestions = generate_comprehensive_suggestions(session_id, analysis)
+            
+            # Get conversation insights
+            insights = get_conversation_insights(session_id)
         
         return jsonify({
             'conversation_analysis': analysis,
@@ -320,27 +503,30 @@ def long_conversation():
 
 def analyze_conversation_patterns(session_id):
     """Analyze patterns in the conversation"""
-    context = conversation_contexts[session_id]
+    context = get_context(session_id)
     
     if not context['messages']:
         return {"error": "No conversation data available"}
     
-    # Analyze message patterns
-    message_lengths = [len(msg['message']) for msg in context['messages']]
-    avg_message_length = sum(message_lengths) / len(message_lengths) if message_lengths else 0
-    
-    # Analyze topic distribution
-    topic_frequency = {}
-    for topic in context['topics']:
-        topic_frequency[topic] = sum(1 for msg in context['messages'] if topic in detect_topics(msg['message']))
+    analysis = cached_for_version(context, 'conversation_patterns', _analyze_patterns)
+    # Elapsed time changes without new messages, so it is never cached
+    return dict(analysis, conversation_duration=str(datetime.now() - context['messages'][0].created_at).split('.')[0])
+
+def _analyze_patterns(context):
+    # Message patterns and topic distribution come from counters kept at ingest
+    stats = context['message_stats']
+    avg_message_length = stats.mean_length
+    topic_frequency = {topic: stats.frequency(topic) for topic in context['topics']}
     
     # Analyze conversation flow
     conversation_flow = "steady"
-    if context['conversation_length'] > 10:
-        recent_activity = context['last_activity'] - context['messages'][-10]['timestamp']
-        if recent_activity.seconds < 300:  # 5 minutes
+    # Stateless tokens may carry fewer than ten messages; measure from the oldest one kept
+    messages = context['messages']
+    if context['conversation_length'] > 10 and len(messages):
+        recent_activity = context['last_activity'].timestamp() - messages[-min(10, len(messages))].timestamp
+        if recent_activity < 300:  # 5 minutes
             conversation_flow = "intense"
-        elif recent_activity.seconds > 1800:  # 30 minutes
+        elif recent_activity > 1800:  # 30 minutes
             conversation_flow = "sporadic"
     
     return {
@@ -348,13 +534,12 @@ def analyze_conversation_patterns(session_id):
         'average_message_length': round(avg_message_length, 1),
         'topic_distribution': topic_frequency,
         'conversation_flow': conversation_flow,
-        'user_engagement': get_engagement_level(context['conversation_length']),
-        'conversation_duration': str(datetime.now() - context['messages'][0]['timestamp']).split('.')[0] if context['messages'] else "0:00:00"
+        'user_engagement': get_engagement_level(context['conversation_length'])
     }
 
 def generate_comprehensive_suggestions(session_id, analysis):
     """Generate comprehensive suggestions based on conversation analysis"""
-    context = conversation_contexts[session_id]
+    context = get_context(session_id)
     suggestions = {
         'immediate': [],
         'short_term': [],
@@ -385,7 +570,7 @@ def generate_comprehensive_suggestions(session_id, analysis):
     
     # Long-term suggestions (future conversations)
     if context['topics']:
-        primary_topic = max(context['topics'], key=lambda t: sum(1 for msg in context['messages'] if t in detect_topics(msg['message'])))
+        primary_topic = max(context['topics'], key=context['message_stats'].frequency)
         suggestions['long_term'].extend([
             f"Consider exploring more about {primary_topic} in future conversations",
             "You might want to set some goals related to the topics we've discussed",
@@ -396,7 +581,7 @@ def generate_comprehensive_suggestions(session_id, analysis):
 
 def get_conversation_insights(session_id):
     """Get insights about the conversation"""
-    context = conversation_contexts[session_id]
+    context = get_context(session_id)
     
     insights = {
         'strengths': [],
@@ -419,8 +604,8 @@ def get_conversation_insights(session_id):
         insights['areas_for_growth'].append("Try to be more specific about topics you'd like to discuss")
     
     # Generate recommendations
-    if context['sentiment_history'] and len(context['sentiment_history']) > 3:
-        recent_sentiment = context['sentiment_history'][-1]
+    if context['sentiment_history'].count > 3:
+        recent_sentiment = context['sentiment_history'].last
         if recent_sentiment < 0:
             insights['recommendations'].append("Consider focusing on positive aspects or solutions")
         elif recent_sentiment > 0:
@@ -429,101 +614,23 @@ def get_conversation_insights(session_id):
     return insights
 
 def analyze_sentiment_comprehensive(text):
-    """Perform comprehensive sentiment analysis using multiple methods"""
-    
-    # Method 1: TextBlob
-    textblob_analysis = TextBlob(text)
-    textblob_sentiment = textblob_analysis.sentiment
-    
-    # Method 2: VADER
-    vader_scores = vader_analyzer.polarity_scores(text)
-    
-    # Method 3: Keyword-based analysis
-    keyword_sentiment = analyze_keywords(text)
-    
-    # Method 4: Rule-based analysis
-    rule_based = rule_based_sentiment(text)
-    
-    # Combine results
-    combined_score = (
-        textblob_sentiment.polarity * 0.3 +
-        vader_scores['compound'] * 0.4 +
-        keyword_sentiment * 0.2 +
-        rule_based * 0.1
-    )
-    
-    # Determine final sentiment
-    if combined_score > 0.1:
-        final_sentiment = 'positive'
-    elif combined_score < -0.1:
-        final_sentiment = 'negative'
-    else:
-        final_sentiment = 'neutral'
-    
-    return {
-        'final_sentiment': final_sentiment,
-        'combined_score': combined_score,
-        'textblob': {
-            'polarity': textblob_sentiment.polarity,
-            'subjectivity': textblob_sentiment.subjectivity
-        },
-        'vader': vader_scores,
-        'keyword_based': keyword_sentiment,
-        'rule_based': rule_based,
-        'confidence': abs(combined_score)
-    }
+    """Perform comprehensive sentiment analysis using the configured engine profile"""
+    return analysis_engine().analyze(text)
 
 def analyze_keywords(text):
     """Analyze sentiment based on keyword presence"""
-    text_lower = text.lower()
-    words = word_tokenize(text_lower)
-    
-    positive_count = sum(1 for word in words if word in POSITIVE_WORDS)
-    negative_count = sum(1 for word in words if word in NEGATIVE_WORDS)
-    
-    if positive_count > negative_count:
-        return 0.5
-    elif negative_count > positive_count:
-        return -0.5
-    else:
-        return 0.0
+    return engine.analyze_keywords(text)
 
 def rule_based_sentiment(text):
     """Simple rule-based sentiment analysis"""
-    text_lower = text.lower()
-    
-    # Exclamation marks
-    exclamation_count = text.count('!')
-    
-    # Question marks
-    question_count = text.count('?')
-    
-    # Capital letters (shouting)
-    capital_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
-    
-    # Emoticons
-    positive_emoticons = [':)', ':-)', '😊', '😄', '😃', '😀', '😁', '😆', '😅', '🤗']
-    negative_emoticons = [':(', ':-(', '😢', '😭', '😞', '😔', '😟', '😕', '😣', '😖']
-    
-    positive_emoticon_count = sum(text.count(emoticon) for emoticon in positive_emoticons)
-    negative_emoticon_count = sum(text.count(emoticon) for emoticon in negative_emoticons)
-    
-    score = 0
-    score += exclamation_count * 0.1
-    score += (positive_emoticon_count - negative_emoticon_count) * 0.3
-    score += capital_ratio * 0.2
-    
-    return max(-1.0, min(1.0, score))
+    return engine.rule_based_sentiment(text)
 
 def generate_contextual_response(sentiment_results, user_input, session_id):
     """Generate contextual response based on sentiment analysis and conversation context"""
     
     sentiment = sentiment_results['final_sentiment']
     confidence = sentiment_results['confidence']
-    context = conversation_contexts[session_id]
-    
-    # Update sentiment history
-    context['sentiment_history'].append(sentiment_results['combined_score'])
+    context = get_context(session_id)
     
     # Context-aware responses
     if 'how are you' in user_input.lower() or 'how do you feel' in user_input.lower():
@@ -585,11 +692,9 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
+        'engine_profile': engine.profile,
         'services': {
-            'textblob': 'active',
-            'vader': 'active',
-            'keyword_analysis': 'active',
-            'rule_based': 'active',
+            **{name: 'active' for name in engine.analyzers},
             'long_conversation': 'active',
             'topic_detection': 'active'
         }
@@ -616,23 +721,47 @@ def analyze_sentiment_only():
 
 @app.route('/conversation_summary/<session_id>', methods=['GET'])
 def get_conversation_summary_endpoint(session_id):
-    """Get conversation summary for a specific session"""
+    """Get conversation summary for a specific session (answers If-None-Match with 304)"""
     try:
-        if session_id not in conversation_contexts:
+        context = conversation_contexts.get(session_id)
+        if context is None:
             return jsonify({'error': 'Session not found'}), 404
         
-        summary = get_conversation_summary(session_id)
-        analysis = analyze_conversation_patterns(session_id)
-        
-        return jsonify({
-            'session_id': session_id,
-            'summary': summary,
-            'analysis': analysis
-        })
+        with conversation_contexts.session_lock(session_id):
+            etag = session_etag(context)
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+            else:
+                response = jsonify({
+                    'session_id': session_id,
+                    'summary': get_conversation_summary(session_id),
+                    'analysis': analyze_conversation_patterns(session_id)
+                })
+        response.set_etag(etag, weak=True)
+        # Let browsers revalidate on every poll instead of reusing a stale copy
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
+@app.route('/admin/memory', methods=['GET'])
+@admin_required
+def admin_memory():
+    """Estimate the memory held by the session store (admin only)"""
+    sample_size = request.args.get('sample', 200, type=int)
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'session_store': estimate_store_size(
+            dict(conversation_contexts.items()),
+            lambda context: len(context['messages']),
+            sample_size=sample_size
+        ),
+        'eviction': conversation_contexts.get_stats(),
+        'journal': conversation_contexts.journal.get_stats() if getattr(conversation_contexts, 'journal', None) else None,
+        'process': process_memory()
+    })
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
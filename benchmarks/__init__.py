@@ -0,0 +1,5 @@
+"""
+Benchmark and load-testing tools for SentimentBot Pro.
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_engine --help``.
+"""
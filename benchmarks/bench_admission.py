@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Admission control burst benchmark.
+
+Fires a burst of ``/chat`` requests from ``--concurrency`` threads
+(in-process, Flask test client) once without admission control and once with
+``ADMISSION_MAX_IN_FLIGHT`` set to ``--max-in-flight``, and reports latency
+percentiles of the served requests, how many were shed and how the rest were
+spread over the degradation levels.
+
+    python -m benchmarks.bench_admission --app app:app --requests 2000 --concurrency 32 --max-in-flight 8
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import admission
+from benchmarks.common import environment, percentile, save_results
+from benchmarks.corpus import make_corpus
+from benchmarks.loadgen import load_app
+
+
+def burst(client, corpus, concurrency, sessions):
+    latencies = []
+    levels = Counter()
+    lock = threading.Lock()
+
+    def send(item):
+        i, text = item
+        start = time.perf_counter()
+        response = client.post('/chat', json={'message': text, 'session_id': f'burst-{i % sessions}'})
+        elapsed = time.perf_counter() - start
+        with lock:
+            levels[response.headers.get('X-Degradation-Level', 'normal')] += 1
+            if response.status_code == 200:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(send, enumerate(corpus)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'served': len(latencies),
+        'shed': levels.get('shed', 0),
+        'levels': dict(levels),
+        'served_per_sec': round(len(latencies) / seconds, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+def run(app_spec='app:app', requests=2000, concurrency=32, max_in_flight=8, sessions=50, seed=42):
+    flask_app = load_app(app_spec)
+    client = flask_app.test_client()
+    corpus = make_corpus(requests, 'medium', seed)
+    controller = admission.controller
+
+    saved = controller.max_in_flight
+    try:
+        controller.max_in_flight = 0
+        unlimited = burst(client, corpus, concurrency, sessions)
+        controller.max_in_flight = max_in_flight
+        limited = burst(client, corpus, concurrency, sessions)
+    finally:
+        controller.max_in_flight = saved
+
+    return {
+        'suite': 'admission',
+        'app': app_spec,
+        'corpus': {'requests': requests, 'concurrency': concurrency, 'sessions': sessions, 'seed': seed},
+        'environment': environment(),
+        'benchmarks': {'no_admission': unlimited, f'max_in_flight={max_in_flight}': limited},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Admission control burst benchmark')
+    parser.add_argument('--app', default='app:app', help='module:app to benchmark')
+    parser.add_argument('--requests', type=int, default=2000, help='requests in the burst')
+    parser.add_argument('--concurrency', type=int, default=32, help='client threads')
+    parser.add_argument('--max-in-flight', type=int, default=8, help='ADMISSION_MAX_IN_FLIGHT for the second run')
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.app, args.requests, args.concurrency, args.max_in_flight, args.sessions, args.seed)
+    for name, stats in report['benchmarks'].items():
+        print(f"{name:<20} served {stats['served']:>6} ({stats['served_per_sec']:>8}/s)  shed {stats['shed']:>5}  "
+              f"p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms")
+        print(f"{'':<20} levels {stats['levels']}")
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+/chat/batch benchmark.
+
+Replays queued conversations of ``--batch-size`` messages (in-process, Flask
+test client) once as one ``/chat`` call per message and once as a single
+``/chat/batch`` call, and reports the latency of delivering a whole queue
+and the per-message cost of each.
+
+    python -m benchmarks.bench_batch --app app:app --queues 50 --batch-size 10
+"""
+
+import argparse
+import sys
+
+from benchmarks.common import environment, measure, print_table, save_results
+from benchmarks.corpus import make_corpus
+from benchmarks.loadgen import load_app
+
+
+def run(app_spec='app:app', queues=50, batch_size=10, rounds=3, seed=42):
+    flask_app = load_app(app_spec)
+    client = flask_app.test_client()
+    corpus = make_corpus(queues * batch_size, 'short', seed)
+    batches = [(f'queue-{i}', corpus[i * batch_size:(i + 1) * batch_size]) for i in range(queues)]
+
+    def one_by_one(item):
+        session_id, messages = item
+        for message in messages:
+            client.post('/chat', json={'message': message, 'session_id': f'single-{session_id}'})
+
+    def batched(item):
+        session_id, messages = item
+        client.post('/chat/batch', json={'messages': messages, 'session_id': f'batch-{session_id}'})
+
+    benchmarks = {
+        f'chat x{batch_size}': measure(one_by_one, batches, rounds=rounds),
+        f'chat/batch[{batch_size}]': measure(batched, batches, rounds=rounds),
+    }
+    for stats in benchmarks.values():
+        stats['per_message_us'] = round(stats['mean_us'] / batch_size, 1)
+
+    return {
+        'suite': 'batch',
+        'app': app_spec,
+        'corpus': {'queues': queues, 'batch_size': batch_size, 'seed': seed},
+        'environment': environment(),
+        'benchmarks': benchmarks,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='/chat/batch benchmark')
+    parser.add_argument('--app', default='app:app', help='module:app to benchmark')
+    parser.add_argument('--queues', type=int, default=50, help='queued conversations to deliver')
+    parser.add_argument('--batch-size', type=int, default=10, help='messages per queue')
+    parser.add_argument('--rounds', type=int, default=3, help='timed passes over the queues')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.app, args.queues, args.batch_size, args.rounds, args.seed)
+    print_table(report['benchmarks'])
+    print()
+    single, batch = report['benchmarks'].values()
+    print(f"per message: {single['per_message_us']} µs one by one, {batch['per_message_us']} µs batched "
+          f"({(1 - batch['mean_us'] / single['mean_us']) * 100:.1f}% less)")
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Sentiment engine micro-benchmarks.
+
+Measures per-call latency and throughput of every analyzer of the selected
+engine profile, ``detect_topics`` and the full ``analyze_sentiment_comprehensive``
+pipeline over a reproducible synthetic corpus of short, medium and long messages.
+
+    python -m benchmarks.bench_engine --profile lite --save      # record a baseline
+    python -m benchmarks.bench_engine --profile lite             # compare, exit 1 on regression
+"""
+
+import argparse
+import sys
+
+from config import Config
+from sentiment_engine import get_engine
+from benchmarks.common import (
+    DEFAULT_MAX_REGRESSION_PCT, baseline_path, environment, measure,
+    print_table, report_comparison, save_results
+)
+from benchmarks.corpus import SIZES, make_corpus
+
+
+def engine_cases(engine):
+    """Benchmark name -> callable for every stage of the engine"""
+    cases = {name: analyzer for name, (analyzer, _) in engine.analyzers.items()}
+    cases['detect_topics'] = engine.detect_topics
+    cases['analyze_sentiment_comprehensive'] = engine.analyze
+    return cases
+
+
+def run(profile, messages=200, rounds=5, seed=42, sizes=tuple(SIZES)):
+    """Run every engine benchmark and return the results document"""
+    engine = get_engine(profile)
+    benchmarks = {}
+    for size in sizes:
+        corpus = make_corpus(messages, size, seed)
+        for name, fn in engine_cases(engine).items():
+            benchmarks[f'{name}[{size}]'] = measure(fn, corpus, rounds=rounds)
+
+    return {
+        'suite': 'engine',
+        'profile': engine.profile,
+        'corpus': {'messages': messages, 'seed': seed, 'sizes': list(sizes)},
+        'environment': environment(),
+        'benchmarks': benchmarks,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sentiment engine micro-benchmarks')
+    parser.add_argument('--profile', default=Config.ENGINE_PROFILE or 'full', help='engine profile (full or lite)')
+    parser.add_argument('--messages', type=int, default=200, help='messages per size bucket')
+    parser.add_argument('--rounds', type=int, default=5, help='timed passes over the corpus')
+    parser.add_argument('--seed', type=int, default=42, help='corpus seed')
+    parser.add_argument('--sizes', default=','.join(SIZES), help='comma-separated size buckets')
+    parser.add_argument('--baseline', help='baseline JSON file (default: benchmarks/baselines/engine-<profile>.json)')
+    parser.add_argument('--save', action='store_true', help='write results as the new baseline')
+    parser.add_argument('--max-regression', type=float, default=DEFAULT_MAX_REGRESSION_PCT,
+                        help='allowed p50 slowdown in percent before failing')
+    args = parser.parse_args(argv)
+
+    results = run(args.profile, args.messages, args.rounds, args.seed, tuple(args.sizes.split(',')))
+    print(f"Engine profile: {results['profile']}")
+    print_table(results['benchmarks'])
+    print()
+
+    baseline_file = args.baseline or baseline_path(f"engine-{results['profile']}")
+    if args.save:
+        save_results(baseline_file, results)
+        print(f"💾 Baseline saved to {baseline_file}")
+        return 0
+    return report_comparison(results, baseline_file, args.max_regression)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
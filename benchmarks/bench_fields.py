@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+/chat field selection benchmark.
+
+Sends the same conversations through ``/chat`` (in-process, Flask test
+client) once per response profile and reports per-request latency and the
+mean response payload size, so the saving from skipping unrequested stages
+is visible next to the full response.
+
+    python -m benchmarks.bench_fields --app app:app --messages 100
+"""
+
+import argparse
+import sys
+
+from benchmarks.common import environment, measure, print_table, save_results
+from benchmarks.corpus import make_corpus
+from benchmarks.loadgen import load_app
+
+
+def run(app_spec='app:app', messages=100, sessions=10, rounds=3, seed=42, profiles=None):
+    flask_app = load_app(app_spec)
+    module = sys.modules[flask_app.import_name]
+    profiles = profiles or list(module.CHAT_PROFILES)
+    client = flask_app.test_client()
+    corpus = make_corpus(messages, 'short', seed)
+
+    benchmarks = {}
+    for profile in profiles:
+        inputs = [(f'{profile}-{i % sessions}', text) for i, text in enumerate(corpus)]
+        sizes = []
+
+        def send(item, profile=profile, sizes=sizes):
+            session_id, text = item
+            response = client.post('/chat', json={'message': text, 'session_id': session_id, 'profile': profile})
+            sizes.append(len(response.get_data()))
+
+        stats = measure(send, inputs, rounds=rounds)
+        stats['payload_bytes'] = round(sum(sizes) / len(sizes))
+        benchmarks[f'chat[{profile}]'] = stats
+
+    full = benchmarks.get('chat[full]')
+    if full:
+        for stats in benchmarks.values():
+            stats['latency_saving_pct'] = round((1 - stats['mean_us'] / full['mean_us']) * 100, 1)
+            stats['payload_saving_pct'] = round((1 - stats['payload_bytes'] / full['payload_bytes']) * 100, 1)
+
+    return {
+        'suite': 'fields',
+        'app': app_spec,
+        'corpus': {'messages': messages, 'sessions': sessions, 'seed': seed},
+        'environment': environment(),
+        'benchmarks': benchmarks,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='/chat field selection benchmark')
+    parser.add_argument('--app', default='app:app', help='module:app to benchmark')
+    parser.add_argument('--messages', type=int, default=100, help='messages per profile')
+    parser.add_argument('--sessions', type=int, default=10, help='sessions the messages are spread over')
+    parser.add_argument('--rounds', type=int, default=3, help='timed passes over the messages')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.app, args.messages, args.sessions, args.rounds, args.seed)
+    print_table(report['benchmarks'])
+    print()
+    for name, stats in report['benchmarks'].items():
+        print(f"{name:<24} {stats['payload_bytes']:>6} bytes  "
+              f"payload {-stats.get('payload_saving_pct', 0.0):+.1f}%  "
+              f"latency {-stats.get('latency_saving_pct', 0.0):+.1f}%")
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
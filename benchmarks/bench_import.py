@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Session import benchmark.
+
+Seeds sessions with transcripts of ``--messages`` messages (in-process, Flask
+test client) once through ``/admin/sessions/import`` and once by replaying
+every message through ``/chat``, and reports messages per second for each.
+
+    python -m benchmarks.bench_import --app app:app --sessions 5 --messages 500
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.common import environment, save_results
+from benchmarks.corpus import make_corpus
+from benchmarks.loadgen import load_app
+from config import Config
+
+TOKEN = 'bench-import'
+
+
+def run(app_spec='app:app', sessions=5, messages=500, seed=42):
+    flask_app = load_app(app_spec)
+    client = flask_app.test_client()
+    corpus = make_corpus(sessions * messages, 'short', seed)
+    transcripts = [corpus[i * messages:(i + 1) * messages] for i in range(sessions)]
+
+    token, Config.ADMIN_TOKEN = Config.ADMIN_TOKEN, TOKEN
+    try:
+        start = time.perf_counter()
+        server_rates = []
+        for i, transcript in enumerate(transcripts):
+            response = client.post('/admin/sessions/import', headers={'X-Admin-Token': TOKEN},
+                                   json={'session_id': f'import-{i}', 'messages': transcript})
+            server_rates.append(response.get_json()['import_stats']['messages_per_second'])
+        import_seconds = time.perf_counter() - start
+    finally:
+        Config.ADMIN_TOKEN = token
+
+    start = time.perf_counter()
+    for i, transcript in enumerate(transcripts):
+        for message in transcript:
+            client.post('/chat', json={'message': message, 'session_id': f'replay-{i}'})
+    replay_seconds = time.perf_counter() - start
+
+    total = sessions * messages
+    return {
+        'suite': 'import',
+        'app': app_spec,
+        'corpus': {'sessions': sessions, 'messages': messages, 'seed': seed},
+        'environment': environment(),
+        'import': {
+            'seconds': round(import_seconds, 4),
+            'messages_per_second': round(total / import_seconds, 1),
+            'server_messages_per_second': round(sum(server_rates) / len(server_rates), 1),
+        },
+        'chat_replay': {
+            'seconds': round(replay_seconds, 4),
+            'messages_per_second': round(total / replay_seconds, 1),
+        },
+        'speedup': round(replay_seconds / import_seconds, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Session import benchmark')
+    parser.add_argument('--app', default='app:app', help='module:app to benchmark')
+    parser.add_argument('--sessions', type=int, default=5, help='transcripts to import')
+    parser.add_argument('--messages', type=int, default=500, help='messages per transcript')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.app, args.sessions, args.messages, args.seed)
+    imported, replay = report['import'], report['chat_replay']
+    print(f"import        {imported['messages_per_second']:>10} messages/s "
+          f"({imported['server_messages_per_second']} on the server)")
+    print(f"/chat replay  {replay['messages_per_second']:>10} messages/s")
+    print(f"speedup       {report['speedup']:>10}x")
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
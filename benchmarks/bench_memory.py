@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Session store memory benchmark.
+
+Fills the app's session store with N sessions of M messages through the same
+functions ``/chat`` uses and reports, with tracemalloc, the bytes held per
+session and per message, peak traced memory and the top allocation sites.
+
+    python -m benchmarks.bench_memory --sessions 100000 --messages 10
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import environment, save_results
+from benchmarks.corpus import make_corpus
+
+
+def ingest(app_module, session_id, message, score):
+    """Apply the session-store mutations of one /chat call (without the analysis cost)"""
+    app_module.update_conversation_context(session_id, message, app_module.detect_topics(message), score)
+
+
+def fill_store(app_module, sessions, messages, pool, seed=42):
+    rng = random.Random(seed)
+    for i in range(sessions):
+        session_id = f'session_{i}_{rng.getrandbits(32):08x}'
+        for j in range(messages):
+            # Fresh string per message, like real traffic
+            text = f'{pool[(i * messages + j) % len(pool)]} #{j}'
+            ingest(app_module, session_id, text, rng.uniform(-1, 1))
+
+
+def measure_append(app_module, appends=20000):
+    """Mean cost in microseconds of recording a message into a session already at capacity"""
+    store = app_module.conversation_contexts
+    session_id = '__append_benchmark__'
+    for i in range(app_module.Config.MAX_CONVERSATION_MEMORY):
+        store.record_message(session_id, f'warm up {i}')
+    texts = [f'steady state message {i}' for i in range(appends)]
+    start = time.perf_counter()
+    for text in texts:
+        store.record_message(session_id, text)
+    elapsed = time.perf_counter() - start
+    store.delete(session_id)
+    return round(elapsed / appends * 1e6, 3)
+
+
+def run(sessions, messages, top=10, frames=1, seed=42):
+    import app as app_module
+    from memory_stats import estimate_store_size, process_memory
+
+    pool = make_corpus(500, 'short', seed) + make_corpus(100, 'medium', seed)
+    store = app_module.conversation_contexts
+    store.clear()
+    # Keep every session resident for the measurement
+    max_sessions = store.max_sessions
+    store.max_sessions = max(max_sessions, sessions)
+    gc.collect()
+
+    tracemalloc.start(frames)
+    before = tracemalloc.take_snapshot()
+    baseline_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    fill_store(app_module, sessions, messages, pool, seed)
+    fill_seconds = time.perf_counter() - start
+
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    top_sites = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')[:top]
+
+    held = current - baseline_current
+    total_messages = sessions * messages
+    estimate = estimate_store_size(
+        dict(store.items()),
+        lambda context: len(context['messages'])
+    )
+    store.clear()
+    store.max_sessions = max_sessions
+    append_us = measure_append(app_module)
+
+    return {
+        'suite': 'memory',
+        'sessions': sessions,
+        'messages_per_session': messages,
+        'environment': environment(),
+        'fill_seconds': round(fill_seconds, 3),
+        'held_bytes': held,
+        'peak_bytes': peak - baseline_current,
+        'bytes_per_session': round(held / sessions) if sessions else 0,
+        'bytes_per_message': round(held / total_messages) if total_messages else 0,
+        'append_us_per_message': append_us,
+        'estimator': estimate,
+        'process': process_memory(),
+        'top_allocation_sites': [
+            {
+                'site': str(stat.traceback[0]),
+                'size_diff_bytes': stat.size_diff,
+                'count_diff': stat.count_diff,
+            }
+            for stat in top_sites
+        ],
+    }
+
+
+def _mib(value):
+    return f'{value / (1024 * 1024):.1f} MiB'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Session store memory benchmark')
+    parser.add_argument('--sessions', type=int, default=10000, help='number of sessions to create')
+    parser.add_argument('--messages', type=int, default=10, help='messages per session')
+    parser.add_argument('--top', type=int, default=10, help='allocation sites to report')
+    parser.add_argument('--frames', type=int, default=1, help='traceback depth recorded by tracemalloc')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.sessions, args.messages, args.top, args.frames, args.seed)
+
+    print(f"Sessions: {report['sessions']} x {report['messages_per_session']} messages "
+          f"(filled in {report['fill_seconds']}s)")
+    print(f"Held:     {_mib(report['held_bytes'])}")
+    print(f"Peak:     {_mib(report['peak_bytes'])}")
+    print(f"Per session: {report['bytes_per_session']} bytes")
+    print(f"Per message: {report['bytes_per_message']} bytes")
+    print(f"Append:      {report['append_us_per_message']} µs/message (session at capacity)")
+    print(f"/admin/memory estimate: {_mib(report['estimator']['estimated_total_bytes'])} "
+          f"({report['estimator']['bytes_per_session']} bytes/session)")
+    print("\nTop allocation sites:")
+    for site in report['top_allocation_sites']:
+        print(f"  {site['size_diff_bytes'] / 1024:>10.1f} KiB {site['count_diff']:>9} blocks  {site['site']}")
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
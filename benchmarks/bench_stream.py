@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+/chat/stream time-to-first-event benchmark.
+
+Sends conversations through ``/chat/stream`` (in-process, Flask test client,
+unbuffered) and reports, per request, the time until each Server-Sent Event
+arrived: the first event (the preliminary sentiment label), the bot response
+and the end of the stream, next to the latency of a plain ``/chat``.
+
+    python -m benchmarks.bench_stream --app app:app --messages 100
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.common import environment, percentile, save_results
+from benchmarks.corpus import make_corpus
+from benchmarks.loadgen import load_app
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {
+        'calls': len(samples),
+        'mean_us': round(sum(samples) / len(samples) * 1e6, 1),
+        'p50_us': round(percentile(samples, 50) * 1e6, 1),
+        'p95_us': round(percentile(samples, 95) * 1e6, 1),
+    }
+
+
+def stream_timings(client, text, session_id):
+    """Seconds from sending the request until each event arrived"""
+    start = time.perf_counter()
+    response = client.post('/chat/stream', json={'message': text, 'session_id': session_id}, buffered=False)
+    timings = {}
+    for chunk in response.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        event = chunk.split('\n', 1)[0][len('event: '):]
+        timings[event] = time.perf_counter() - start
+    response.close()
+    return timings
+
+
+def run(app_spec='app:app', messages=100, sessions=10, seed=42):
+    flask_app = load_app(app_spec)
+    client = flask_app.test_client()
+    corpus = make_corpus(messages, 'medium', seed)
+
+    events = {}
+    chat = []
+    for i, text in enumerate(corpus):
+        for event, seconds in stream_timings(client, text, f'stream-{i % sessions}').items():
+            events.setdefault(event, []).append(seconds)
+        start = time.perf_counter()
+        client.post('/chat', json={'message': text, 'session_id': f'chat-{i % sessions}'})
+        chat.append(time.perf_counter() - start)
+
+    return {
+        'suite': 'stream',
+        'app': app_spec,
+        'corpus': {'messages': messages, 'sessions': sessions, 'seed': seed},
+        'environment': environment(),
+        'time_to_first_event': _summary(events['sentiment']),
+        'time_to_response': _summary(events['response']),
+        'time_to_done': _summary(events['done']),
+        'events': {event: _summary(samples) for event, samples in events.items()},
+        'chat': _summary(chat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='/chat/stream time-to-first-event benchmark')
+    parser.add_argument('--app', default='app:app', help='module:app to benchmark')
+    parser.add_argument('--messages', type=int, default=100)
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.app, args.messages, args.sessions, args.seed)
+    for name in ('time_to_first_event', 'time_to_response', 'time_to_done', 'chat'):
+        stats = report[name]
+        print(f"{name:<22} mean {stats['mean_us']:>9} µs   p50 {stats['p50_us']:>9} µs   p95 {stats['p95_us']:>9} µs")
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Stateless session token benchmark.
+
+Grows one session message by message and reports, at each checkpoint, the
+size of the signed session token the client has to carry and the cost of
+encoding it (end of a /chat) and decoding it (start of the next one).
+
+    python -m benchmarks.bench_token --lengths 1 10 50 200 1000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.common import environment, save_results
+from benchmarks.corpus import make_corpus
+
+
+def _mean_us(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return round((time.perf_counter() - start) / rounds * 1e6, 1)
+
+
+def run(lengths, rounds=200, seed=42):
+    from api.chat import detect_topics
+    from config import Config
+    from session_store import apply_message, new_conversation_context
+    from session_token import decode_session, encode_session
+
+    rng = random.Random(seed)
+    pool = make_corpus(200, 'short', seed) + make_corpus(50, 'medium', seed)
+    session_id = 'token-benchmark'
+    context = new_conversation_context()
+    results = []
+    for length in sorted(lengths):
+        while context['conversation_length'] < length:
+            text = pool[context['conversation_length'] % len(pool)]
+            apply_message(context, text, time.time(), detect_topics(text), rng.uniform(-1, 1))
+        token = encode_session(session_id, context)
+        assert decode_session(token, session_id) is not None
+        results.append({
+            'messages': length,
+            'token_bytes': len(token),
+            'encode_us': _mean_us(lambda: encode_session(session_id, context), rounds),
+            'decode_us': _mean_us(lambda: decode_session(token, session_id), rounds),
+        })
+    return {
+        'suite': 'token',
+        'environment': environment(),
+        'max_token_bytes': Config.SESSION_TOKEN_MAX_BYTES,
+        'token_messages': Config.SESSION_TOKEN_MESSAGES,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stateless session token benchmark')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[1, 5, 10, 50, 200, 1000],
+                        help='conversation lengths to measure')
+    parser.add_argument('--rounds', type=int, default=200, help='encode/decode calls per measurement')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.lengths, args.rounds, args.seed)
+
+    print(f"Token bound: {report['max_token_bytes']} bytes, "
+          f"window: {report['token_messages']} messages")
+    print(f"{'messages':>9} {'bytes':>7} {'encode µs':>10} {'decode µs':>10}")
+    for row in report['results']:
+        print(f"{row['messages']:>9} {row['token_bytes']:>7} {row['encode_us']:>10} {row['decode_us']:>10}")
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
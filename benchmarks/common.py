@@ -0,0 +1,119 @@
+"""Timing, reporting and baseline helpers shared by the benchmark scripts"""
+
+import json
+import math
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# Default allowed slowdown before a benchmark counts as a regression
+DEFAULT_MAX_REGRESSION_PCT = float(os.environ.get('BENCH_MAX_REGRESSION_PCT', 20))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(fn, inputs, rounds=5, warmup=1):
+    """Time ``fn(x)`` for every input, ``rounds`` times, and summarize per-call latency"""
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(warmup):
+        for item in inputs:
+            fn(item)
+
+    samples = []
+    round_totals = []
+    for _ in range(rounds):
+        round_start = perf_counter_ns()
+        for item in inputs:
+            start = perf_counter_ns()
+            fn(item)
+            samples.append(perf_counter_ns() - start)
+        round_totals.append(perf_counter_ns() - round_start)
+
+    samples.sort()
+    best_round = min(round_totals)
+    return {
+        'calls': len(samples),
+        'mean_us': round(sum(samples) / len(samples) / 1000.0, 3),
+        'p50_us': round(percentile(samples, 50) / 1000.0, 3),
+        'p95_us': round(percentile(samples, 95) / 1000.0, 3),
+        'p99_us': round(percentile(samples, 99) / 1000.0, 3),
+        'ops_per_sec': round(len(inputs) / (best_round / 1e9), 1) if best_round else 0.0,
+    }
+
+
+def environment():
+    """Describe the machine a result was recorded on"""
+    return {
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def save_results(path, results):
+    """Write benchmark results as a JSON baseline"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(current, baseline, max_regression_pct=DEFAULT_MAX_REGRESSION_PCT, metric='p50_us'):
+    """Return a list of (name, baseline, current, pct_change) for every regressed benchmark"""
+    regressions = []
+    for name, stats in current['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous or not previous.get(metric):
+            continue
+        change = (stats[metric] - previous[metric]) / previous[metric] * 100.0
+        if change > max_regression_pct:
+            regressions.append((name, previous[metric], stats[metric], round(change, 1)))
+    return regressions
+
+
+def print_table(benchmarks):
+    """Print benchmark results as an aligned table"""
+    header = f"{'benchmark':<40} {'mean us':>10} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'ops/s':>12}"
+    print(header)
+    print('-' * len(header))
+    for name, stats in benchmarks.items():
+        print(f"{name:<40} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} "
+              f"{stats['p95_us']:>10.1f} {stats['p99_us']:>10.1f} {stats['ops_per_sec']:>12.1f}")
+
+
+def report_comparison(current, baseline_file, max_regression_pct):
+    """Compare against a stored baseline, print the verdict and return a process exit code"""
+    if not os.path.exists(baseline_file):
+        # A gate without a baseline would pass whatever the timings are
+        print(f"❌ No baseline at {baseline_file}; run with --save to record one on this machine")
+        return 1
+
+    regressions = compare_results(current, load_results(baseline_file), max_regression_pct)
+    if not regressions:
+        print(f"✅ No regressions beyond {max_regression_pct:.0f}% against {baseline_file}")
+        return 0
+
+    print(f"❌ {len(regressions)} benchmark(s) regressed beyond {max_regression_pct:.0f}%:")
+    for name, before, after, change in regressions:
+        print(f"  {name}: {before:.1f}us -> {after:.1f}us (+{change}%)")
+    return 1
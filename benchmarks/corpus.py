@@ -0,0 +1,66 @@
+"""Reproducible synthetic message corpus used by the benchmarks"""
+
+import random
+
+from config import Config
+
+# Approximate word counts per message size bucket
+SIZES = {
+    'short': (4, 12),
+    'medium': (30, 60),
+    'long': (200, 400),
+}
+
+FILLER_WORDS = [
+    'the', 'a', 'i', 'you', 'we', 'it', 'is', 'was', 'have', 'been', 'today',
+    'really', 'just', 'about', 'think', 'feel', 'maybe', 'some', 'that', 'this',
+    'with', 'my', 'our', 'and', 'but', 'so', 'very', 'again', 'week', 'people'
+]
+
+PUNCTUATION = ['.', '.', '.', '!', '?', '!!', '...', ',']
+
+
+def _vocabulary():
+    topic_words = [keyword for keywords in Config.TOPIC_KEYWORDS.values() for keyword in keywords]
+    return (
+        FILLER_WORDS * 6,
+        sorted(Config.POSITIVE_WORDS),
+        sorted(Config.NEGATIVE_WORDS),
+        topic_words,
+        Config.POSITIVE_EMOTICONS + Config.NEGATIVE_EMOTICONS,
+    )
+
+
+def make_message(rng, size='short'):
+    """Build one synthetic message of the given size bucket"""
+    filler, positive, negative, topics, emoticons = _vocabulary()
+    low, high = SIZES[size]
+    words = []
+    for _ in range(rng.randint(low, high)):
+        roll = rng.random()
+        if roll < 0.1:
+            words.append(rng.choice(positive))
+        elif roll < 0.2:
+            words.append(rng.choice(negative))
+        elif roll < 0.3:
+            words.append(rng.choice(topics))
+        elif roll < 0.32:
+            words.append(rng.choice(emoticons))
+        else:
+            words.append(rng.choice(filler))
+        if rng.random() < 0.08:
+            words[-1] += rng.choice(PUNCTUATION)
+    if rng.random() < 0.1:
+        words = [word.upper() for word in words]
+    return ' '.join(words).capitalize()
+
+
+def make_corpus(count=200, size='short', seed=42):
+    """Return ``count`` deterministic messages for a size bucket"""
+    rng = random.Random(f'{seed}-{size}')
+    return [make_message(rng, size) for _ in range(count)]
+
+
+def make_conversation(rng, turns=10, sizes=('short', 'short', 'medium')):
+    """Return one synthetic multi-turn conversation as a list of messages"""
+    return [make_message(rng, rng.choice(sizes)) for _ in range(turns)]
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+HTTP load generation and conversation replay harness.
+
+Replays synthetic (or recorded) multi-turn conversations against ``/chat``,
+``/sentiment``, ``/conversation_summary/<id>`` and ``/long_conversation`` and
+reports throughput, p50/p95/p99 latency and error rate per endpoint.
+
+    # In-process through the Flask test client
+    python -m benchmarks.loadgen --app app:app --sessions 50 --concurrency 8
+
+    # Against a running server
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000 --sessions 200 --concurrency 32
+
+    # Start gunicorn in sync, threaded and multi-process configurations and compare them
+    python -m benchmarks.loadgen --matrix --app app:app --sessions 100 --concurrency 16
+
+Recorded conversations are a JSON list whose items are either a list of
+messages or an object with a ``messages`` list (and optional ``session_id``).
+"""
+
+import argparse
+import http.client
+import importlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.common import environment, percentile, save_results
+from benchmarks.corpus import make_conversation
+
+# Poll the summary endpoint every N turns, like the UI does
+SUMMARY_EVERY = 5
+SENTIMENT_EVERY = 4
+
+# Built-in gunicorn configurations for --matrix
+MATRIX = {
+    'sync': ['--workers', '1', '--worker-class', 'sync'],
+    'threaded': ['--workers', '1', '--worker-class', 'gthread', '--threads', '8'],
+    'multi-process': ['--workers', str(max(2, os.cpu_count() or 2)), '--worker-class', 'sync'],
+}
+
+
+class InProcessClient:
+    """Send requests through the Flask test client (one per thread)"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.flask_app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code
+
+
+class HttpClient:
+    """Send requests to a live server over persistent per-thread connections"""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def request(self, method, path, body=None):
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        try:
+            connection = self._connection()
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.local.connection = None
+            return 599
+
+
+class Recorder:
+    """Collect latencies and errors per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, elapsed, status):
+        with self.lock:
+            self.latencies[endpoint].append(elapsed)
+            if status >= 400:
+                self.errors[endpoint] += 1
+
+    def summary(self, duration):
+        endpoints = {}
+        all_latencies = []
+        total_errors = 0
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            all_latencies.extend(latencies)
+            total_errors += self.errors[endpoint]
+            endpoints[endpoint] = _stats(latencies, self.errors[endpoint], duration)
+        all_latencies.sort()
+        return {
+            'duration_s': round(duration, 3),
+            'total': _stats(all_latencies, total_errors, duration),
+            'endpoints': endpoints,
+        }
+
+
+def _stats(sorted_latencies, errors, duration):
+    count = len(sorted_latencies)
+    return {
+        'requests': count,
+        'throughput_rps': round(count / duration, 1) if duration else 0.0,
+        'p50_ms': round(percentile(sorted_latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(sorted_latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(sorted_latencies, 99) * 1000, 2),
+        'error_rate': round(errors / count, 4) if count else 0.0,
+    }
+
+
+def timed(client, recorder, endpoint, method, path, body=None):
+    start = time.perf_counter()
+    status = client.request(method, path, body)
+    recorder.record(endpoint, time.perf_counter() - start, status)
+
+
+def replay_session(client, recorder, session_id, messages):
+    """Replay one conversation the way the web UI drives the API"""
+    for turn, message in enumerate(messages, 1):
+        timed(client, recorder, '/chat', 'POST', '/chat', {'message': message, 'session_id': session_id})
+        if turn % SENTIMENT_EVERY == 0:
+            timed(client, recorder, '/sentiment', 'POST', '/sentiment', {'text': message})
+        if turn % SUMMARY_EVERY == 0:
+            timed(client, recorder, '/conversation_summary', 'GET', f'/conversation_summary/{session_id}')
+    timed(client, recorder, '/long_conversation', 'POST', '/long_conversation', {'session_id': session_id})
+
+
+def synthetic_sessions(count, turns, seed):
+    rng = random.Random(seed)
+    return [(f'load_{seed}_{i}', make_conversation(rng, turns)) for i in range(count)]
+
+
+def recorded_sessions(path, count=None):
+    with open(path) as f:
+        data = json.load(f)
+    sessions = []
+    for i, item in enumerate(data):
+        if isinstance(item, dict):
+            sessions.append((item.get('session_id', f'replay_{i}'), item['messages']))
+        else:
+            sessions.append((f'replay_{i}', list(item)))
+    return sessions[:count] if count else sessions
+
+
+def run_load(client, sessions, concurrency):
+    """Replay every session with ``concurrency`` parallel clients and return the report"""
+    recorder = Recorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(replay_session, client, recorder, sid, messages) for sid, messages in sessions]
+        for future in futures:
+            future.result()
+    return recorder.summary(time.perf_counter() - start)
+
+
+def load_app(spec):
+    """Import a Flask app from ``module:attribute``"""
+    module_name, _, attribute = spec.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute or 'app')
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_ready(url, process, timeout=60):
+    client = HttpClient(url, timeout=2)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during start-up')
+        if client.request('GET', '/health') == 200:
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f'server at {url} did not become ready')
+
+
+def run_matrix(app_spec, sessions, concurrency, configs=MATRIX):
+    """Run the same load against gunicorn in each built-in configuration"""
+    results = {}
+    for name, gunicorn_args in configs.items():
+        port = _free_port()
+        url = f'http://127.0.0.1:{port}'
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--log-level', 'warning']
+        command += gunicorn_args + [app_spec]
+        print(f"▶ {name}: {' '.join(command[2:])}")
+        process = subprocess.Popen(command)
+        try:
+            _wait_until_ready(url, process)
+            results[name] = run_load(HttpClient(url), sessions, concurrency)
+            results[name]['gunicorn_args'] = gunicorn_args
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return results
+
+
+def print_report(title, report):
+    print(f"\n{title} ({report['duration_s']}s)")
+    header = f"{'endpoint':<24} {'requests':>9} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}"
+    print(header)
+    print('-' * len(header))
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+    for endpoint, stats in rows:
+        print(f"{endpoint:<24} {stats['requests']:>9} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['error_rate']:>8.2%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Conversation replay load generator')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help='base URL of a running server')
+    target.add_argument('--matrix', action='store_true', help='compare gunicorn sync, threaded and multi-process')
+    parser.add_argument('--app', default='app:app', help='Flask app as module:attribute (in-process and --matrix)')
+    parser.add_argument('--sessions', type=int, default=50, help='number of conversations to replay')
+    parser.add_argument('--turns', type=int, default=10, help='messages per synthetic conversation')
+    parser.add_argument('--concurrency', type=int, default=8, help='parallel clients')
+    parser.add_argument('--seed', type=int, default=42, help='synthetic conversation seed')
+    parser.add_argument('--replay', help='JSON file of recorded conversations to replay')
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        sessions = recorded_sessions(args.replay, args.sessions)
+    else:
+        sessions = synthetic_sessions(args.sessions, args.turns, args.seed)
+
+    report = {
+        'suite': 'load',
+        'sessions': len(sessions),
+        'concurrency': args.concurrency,
+        'environment': environment(),
+    }
+    if args.matrix:
+        report['matrix'] = run_matrix(args.app, sessions, args.concurrency)
+        for name, result in report['matrix'].items():
+            print_report(name, result)
+    elif args.url:
+        report['target'] = args.url
+        report.update(run_load(HttpClient(args.url), sessions, args.concurrency))
+        print_report(args.url, report)
+    else:
+        report['target'] = f'in-process {args.app}'
+        report.update(run_load(InProcessClient(load_app(args.app)), sessions, args.concurrency))
+        print_report(report['target'], report)
+
+    if args.output:
+        save_results(args.output, report)
+        print(f"\n💾 Report saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
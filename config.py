@@ -5,7 +5,9 @@ class Config:
     """Configuration class for the SentimentBot Pro - AI-Powered Sentiment Analysis & Long Conversation Chatbot"""
     
     # Flask Configuration
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
+    # Used when SECRET_KEY is unset; it is public, so nothing that must not be forged is signed with it
+    DEFAULT_SECRET_KEY = 'dev-secret-key-change-in-production'
+    SECRET_KEY = os.environ.get('SECRET_KEY') or DEFAULT_SECRET_KEY
     DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     HOST = os.environ.get('HOST', '0.0.0.0')
     PORT = int(os.environ.get('PORT', 5000))
@@ -18,22 +20,88 @@ class Config:
     VADER_WEIGHT = float(os.environ.get('VADER_WEIGHT', 0.4))
     KEYWORD_WEIGHT = float(os.environ.get('KEYWORD_WEIGHT', 0.2))
     RULE_BASED_WEIGHT = float(os.environ.get('RULE_BASED_WEIGHT', 0.1))
-    
+
+    # Engine Profile ('full' = TextBlob+VADER ensemble, 'lite' = dependency-free, fast cold start)
+    # Empty means each entry point uses its own default
+    ENGINE_PROFILE = os.environ.get('ENGINE_PROFILE', '')
+
+    # Model Weights for the Lite Engine Profile
+    LITE_KEYWORD_WEIGHT = float(os.environ.get('LITE_KEYWORD_WEIGHT', 0.4))
+    LITE_RULE_BASED_WEIGHT = float(os.environ.get('LITE_RULE_BASED_WEIGHT', 0.3))
+    LITE_EMOTICON_WEIGHT = float(os.environ.get('LITE_EMOTICON_WEIGHT', 0.2))
+    LITE_PUNCTUATION_WEIGHT = float(os.environ.get('LITE_PUNCTUATION_WEIGHT', 0.1))
+
     # Long Conversation Configuration
     MAX_CONVERSATION_MEMORY = int(os.environ.get('MAX_CONVERSATION_MEMORY', 50))
     SESSION_TIMEOUT_MINUTES = int(os.environ.get('SESSION_TIMEOUT_MINUTES', 60))
     MIN_MESSAGES_FOR_INSIGHTS = int(os.environ.get('MIN_MESSAGES_FOR_INSIGHTS', 5))
     MIN_MESSAGES_FOR_SUGGESTIONS = int(os.environ.get('MIN_MESSAGES_FOR_SUGGESTIONS', 3))
+
+    # Running Sentiment Aggregates (per session)
+    SENTIMENT_HISTORY_SIZE = int(os.environ.get('SENTIMENT_HISTORY_SIZE', 20))
+    SENTIMENT_EWMA_ALPHA = float(os.environ.get('SENTIMENT_EWMA_ALPHA', 0.3))
+
+    # Session Store Configuration ('memory', 'sqlite' or 'stateless')
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'memory')
+    MAX_SESSIONS = int(os.environ.get('MAX_SESSIONS', 10000))
+    SESSION_SWEEP_INTERVAL_SECONDS = int(os.environ.get('SESSION_SWEEP_INTERVAL_SECONDS', 60))
+    SESSION_LOCK_STRIPES = int(os.environ.get('SESSION_LOCK_STRIPES', 64))
+    SESSION_DB_PATH = os.environ.get('SESSION_DB_PATH', '/tmp/sentimentbot_sessions.db')
+
+    # Cold Tier and Journal Configuration (memory backend)
+    SESSION_COLD_PATH = os.environ.get('SESSION_COLD_PATH', '')
+    SESSION_SPILL_AFTER_SECONDS = int(os.environ.get('SESSION_SPILL_AFTER_SECONDS', 300))
+    SESSION_COLD_TTL_HOURS = int(os.environ.get('SESSION_COLD_TTL_HOURS', 24))
+    SESSION_JOURNAL_DIR = os.environ.get('SESSION_JOURNAL_DIR', '')
+    SESSION_JOURNAL_FLUSH_INTERVAL_MS = int(os.environ.get('SESSION_JOURNAL_FLUSH_INTERVAL_MS', 50))
+    SESSION_SNAPSHOT_INTERVAL_SECONDS = int(os.environ.get('SESSION_SNAPSHOT_INTERVAL_SECONDS', 300))
+
+    # Stateless Session Token Configuration
+    SESSION_TOKEN_MAX_BYTES = int(os.environ.get('SESSION_TOKEN_MAX_BYTES', 4096))
+    SESSION_TOKEN_MESSAGES = int(os.environ.get('SESSION_TOKEN_MESSAGES', 10))
+
+    # Batch and Import Configuration
+    CHAT_BATCH_MAX_MESSAGES = int(os.environ.get('CHAT_BATCH_MAX_MESSAGES', 50))
+    SESSION_IMPORT_MAX_MESSAGES = int(os.environ.get('SESSION_IMPORT_MAX_MESSAGES', 10000))
+
+    # Idempotency Key Configuration
+    IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 600))
+    IDEMPOTENCY_MAX_KEYS = int(os.environ.get('IDEMPOTENCY_MAX_KEYS', 10000))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', 30))
+
+    # Admission Control Configuration (0 disables a limit)
+    ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', 0))
+    ADMISSION_MAX_QUEUE_DELAY_MS = float(os.environ.get('ADMISSION_MAX_QUEUE_DELAY_MS', 0))
+    ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get('ADMISSION_RETRY_AFTER_SECONDS', 1))
+
+    # Session Router Configuration
+    ROUTER_WORKERS = int(os.environ.get('ROUTER_WORKERS', 0))
+    ROUTER_VIRTUAL_NODES = int(os.environ.get('ROUTER_VIRTUAL_NODES', 128))
+    # Set by session_router.py for the workers it starts
+    SESSION_ROUTER_TOKEN = os.environ.get('SESSION_ROUTER_TOKEN', '')
+    SESSION_ROUTER_WORKER = os.environ.get('SESSION_ROUTER_WORKER', '')
     
     # Topic Detection Configuration
     TOPIC_DETECTION_CONFIDENCE = float(os.environ.get('TOPIC_DETECTION_CONFIDENCE', 0.6))
     MAX_TOPICS_PER_MESSAGE = int(os.environ.get('MAX_TOPICS_PER_MESSAGE', 3))
     
     # NLTK Configuration
-    NLTK_DATA_PATH = os.environ.get('NLTK_DATA_PATH', './nltk_data')
+    NLTK_DATA_PATH = os.environ.get('NLTK_DATA_PATH', '/tmp/nltk_data')
     
     # Logging Configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+    # Admin Configuration (admin/debug endpoints are disabled while no token is set)
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+    # Slow Request Tracing Configuration
+    SLOW_REQUEST_THRESHOLD_MS = float(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 250))
+    SLOW_TRACE_BUFFER_SIZE = int(os.environ.get('SLOW_TRACE_BUFFER_SIZE', 100))
+
+    # On-demand Profiling Configuration (admin requests with an X-Profile header)
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/sentimentbot_profiles')
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', 1))
+    PROFILE_TOP_FUNCTIONS = int(os.environ.get('PROFILE_TOP_FUNCTIONS', 40))
     
     # Sentiment Keywords
     POSITIVE_WORDS = {
@@ -0,0 +1,119 @@
+# SentimentBot Pro - Running per-session conversation statistics
+#
+# Aggregates are updated once per message at ingest, so summaries, trends and
+# insights cost the same no matter how long the conversation has been going.
+from array import array
+
+from config import Config
+
+
+class SentimentStats:
+    """Running sentiment aggregates plus a fixed-size ring of the latest scores"""
+
+    __slots__ = ('capacity', 'alpha', '_recent', '_next', 'count', 'total', 'ewma',
+                 'positive', 'negative', 'last')
+
+    def __init__(self, capacity=Config.SENTIMENT_HISTORY_SIZE, alpha=Config.SENTIMENT_EWMA_ALPHA):
+        self.capacity = capacity
+        self.alpha = alpha
+        self._recent = array('d', bytes(8 * capacity))
+        self._next = 0
+        self.count = 0
+        self.total = 0.0
+        self.ewma = 0.0
+        self.positive = 0
+        self.negative = 0
+        self.last = None
+
+    def append(self, score):
+        """Fold one message's combined score into the aggregates"""
+        if self.capacity:
+            self._recent[self._next] = score
+            self._next = (self._next + 1) % self.capacity
+        self.ewma = score if self.count == 0 else self.alpha * score + (1 - self.alpha) * self.ewma
+        self.count += 1
+        self.total += score
+        if score > 0:
+            self.positive += 1
+        elif score < 0:
+            self.negative += 1
+        self.last = score
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def recent(self, n=None):
+        """The latest ``n`` scores (at most ``capacity``), oldest first"""
+        size = min(self.count, self.capacity)
+        n = size if n is None else min(n, size)
+        return [self._recent[(self._next - n + i) % self.capacity] for i in range(n)]
+
+    def to_state(self):
+        """Plain-data form for snapshots"""
+        return [self.count, self.total, self.ewma, self.positive, self.negative, self.last, self.recent()]
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls()
+        stats.count, stats.total, stats.ewma, stats.positive, stats.negative, stats.last, recent = state
+        recent = recent[-stats.capacity:] if stats.capacity else []
+        for i, score in enumerate(recent):
+            stats._recent[i] = score
+        stats._next = len(recent) % stats.capacity if stats.capacity else 0
+        return stats
+
+    def trend(self, window=5):
+        """'improving', 'declining' or 'stable' from the signs of the latest ``window`` scores"""
+        if self.count < 2:
+            return "stable"
+        recent = self.recent(window)
+        positive_count = sum(1 for s in recent if s > 0)
+        negative_count = sum(1 for s in recent if s < 0)
+        if positive_count > negative_count:
+            return "improving"
+        elif negative_count > positive_count:
+            return "declining"
+        return "stable"
+
+
+class MessageStats:
+    """Topic frequencies and message lengths over the messages a session retains"""
+
+    __slots__ = ('topic_counts', 'length_total', 'count')
+
+    def __init__(self):
+        self.topic_counts = {}
+        self.length_total = 0
+        self.count = 0
+
+    def add(self, record):
+        """Count a message entering the history"""
+        self.count += 1
+        self.length_total += len(record.message)
+        counts = self.topic_counts
+        for topic in record.topics:
+            counts[topic] = counts.get(topic, 0) + 1
+
+    def remove(self, record):
+        """Forget a message dropped from the history"""
+        self.count -= 1
+        self.length_total -= len(record.message)
+        counts = self.topic_counts
+        for topic in record.topics:
+            remaining = counts[topic] - 1
+            if remaining:
+                counts[topic] = remaining
+            else:
+                del counts[topic]
+
+    @property
+    def mean_length(self):
+        return self.length_total / self.count if self.count else 0.0
+
+    def frequency(self, topic):
+        """Retained messages mentioning ``topic``"""
+        return self.topic_counts.get(topic, 0)
@@ -0,0 +1,167 @@
+# SentimentBot Pro - Idempotency keys for retried requests
+#
+# Clients that retry after a timeout send the same Idempotency-Key header with
+# each attempt. The first request with a key runs normally and its response is
+# kept for IDEMPOTENCY_TTL_SECONDS (at most IDEMPOTENCY_MAX_KEYS responses,
+# least recently used first out). A retry gets the stored response back without
+# touching the session again, and a retry that arrives while the original is
+# still running waits for it. Reusing a key for a different request body is
+# rejected with 422. Server errors are not stored, so they can be retried.
+#
+# Responses are kept per worker process; the session router sends every
+# request of a session to the same worker.
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, g, jsonify, request
+
+from config import Config
+from metrics import record_cache, registry
+
+KEY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyCache:
+    """Bounded, expiring store of completed responses plus the requests still in progress"""
+
+    def __init__(self, max_entries=Config.IDEMPOTENCY_MAX_KEYS, ttl=Config.IDEMPOTENCY_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires, fingerprint, status, content_type, body)
+        self._done = OrderedDict()
+        # key -> (fingerprint, threading.Event set when the original finishes)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'stored': 0,
+            'replayed': 0,
+            'waited': 0,
+            'conflicts': 0,
+            'expired': 0,
+            'evicted': 0,
+        }
+
+    def __len__(self):
+        return len(self._done)
+
+    def begin(self, key, fingerprint, timeout):
+        """Claim ``key`` or find its response
+
+        Returns ('run', None) when the caller should process the request and then
+        call finish(), ('replay', entry) for a stored response, ('conflict', None)
+        when the key belongs to another request and ('busy', None) when the
+        original did not finish within ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            with self._lock:
+                entry = self._done.get(key)
+                if entry is not None and entry[0] <= time.time():
+                    del self._done[key]
+                    self.stats['expired'] += 1
+                    entry = None
+                if entry is not None:
+                    if entry[1] != fingerprint:
+                        self.stats['conflicts'] += 1
+                        return 'conflict', None
+                    self._done.move_to_end(key)
+                    self.stats['replayed'] += 1
+                    return 'replay', entry
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = (fingerprint, threading.Event())
+                    return 'run', None
+                if pending[0] != fingerprint:
+                    self.stats['conflicts'] += 1
+                    return 'conflict', None
+                if not waited:
+                    self.stats['waited'] += 1
+                    waited = True
+            # The original is still running: wait for it, then look again
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not pending[1].wait(remaining):
+                return 'busy', None
+
+    def finish(self, key, status=None, content_type=None, body=None):
+        """Store the response for a claimed key (or just release it when ``status`` is None)"""
+        with self._lock:
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                return
+            if status is not None:
+                self._done[key] = (time.time() + self.ttl, pending[0], status, content_type, body)
+                self._done.move_to_end(key)
+                self.stats['stored'] += 1
+                while len(self._done) > self.max_entries:
+                    self._done.popitem(last=False)
+                    self.stats['evicted'] += 1
+            pending[1].set()
+
+    def clear(self):
+        with self._lock:
+            self._done.clear()
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['entries'] = len(self._done)
+        stats['in_progress'] = len(self._pending)
+        return stats
+
+
+cache = IdempotencyCache()
+
+
+def init_app(app, endpoints):
+    """Honor Idempotency-Key on the given view endpoints"""
+    endpoints = frozenset(endpoints)
+    registry.register_gauge('sentimentbot_idempotency_entries', 'Completed responses kept for Idempotency-Key retries',
+                            lambda: len(cache))
+
+    @app.before_request
+    def _check_idempotency_key():
+        key = request.headers.get(KEY_HEADER)
+        if not key or request.endpoint not in endpoints:
+            return None
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{KEY_HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        scoped_key = (request.endpoint, key)
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        outcome, entry = cache.begin(scoped_key, fingerprint, Config.IDEMPOTENCY_WAIT_SECONDS)
+        if outcome == 'run':
+            record_cache('idempotency', False)
+            g._idempotency_key = scoped_key
+            return None
+        if outcome == 'replay':
+            record_cache('idempotency', True)
+            _, _, status, content_type, body = entry
+            response = Response(body, status=status, content_type=content_type)
+            response.headers[REPLAYED_HEADER] = 'true'
+            return response
+        if outcome == 'conflict':
+            return jsonify({'error': f'{KEY_HEADER} was already used for a different request'}), 422
+        return jsonify({'error': 'A request with this Idempotency-Key is still being processed'}), 409
+
+    @app.after_request
+    def _store_response(response):
+        key = g.pop('_idempotency_key', None)
+        if key is not None:
+            if response.status_code < 500 and not response.is_streamed:
+                cache.finish(key, response.status_code, response.content_type, response.get_data())
+            else:
+                cache.finish(key)
+        return response
+
+    @app.teardown_request
+    def _release_key(exc):
+        # An unhandled error skips after_request; let waiting retries run themselves
+        key = g.pop('_idempotency_key', None)
+        if key is not None:
+            cache.finish(key)
+
+    return app
@@ -1,134 +1,36 @@
-from flask import Flask, request, jsonify, render_template_string, send_from_directory
+from flask import Flask, request, jsonify, render_template_string
 from flask_cors import CORS
-import os
-import re
 import random
+import time
 from datetime import datetime
 
+from config import Config
+from sentiment_engine import get_engine
+import metrics
+import tracing
+import profiling
+import static_assets
+from session_store import create_session_store
+
 # Create Flask app
 app = Flask(__name__, static_folder='static', template_folder='templates')
 CORS(app)
+metrics.init_app(app)
+tracing.init_app(app)
+profiling.init_app(app)
+# Static files served from memory, fingerprinted and precompressed
+static_assets.init_app(app)
 
-# Sentiment keywords for enhanced analysis
-POSITIVE_WORDS = {
-    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'awesome',
-    'happy', 'joy', 'love', 'like', 'enjoy', 'pleased', 'satisfied', 'perfect',
-    'beautiful', 'nice', 'wonderful', 'brilliant', 'outstanding', 'superb'
-}
+# Initialize the sentiment engine ('lite' for fast serverless cold starts by default)
+engine = get_engine(Config.ENGINE_PROFILE or 'lite')
 
-NEGATIVE_WORDS = {
-    'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate', 'dislike',
-    'sad', 'angry', 'frustrated', 'disappointed', 'upset', 'worried', 'anxious',
-    'depressed', 'miserable', 'painful', 'suffering', 'terrible', 'dreadful'
-}
+# Every invocation may land on a fresh instance, so the session travels with
+# the client as a signed token instead of living in process memory
+conversation_contexts = create_session_store('stateless')
 
 def analyze_sentiment_comprehensive(text):
-    """Perform comprehensive sentiment analysis using multiple methods"""
-    
-    # Method 1: Keyword-based analysis
-    keyword_sentiment = analyze_keywords(text)
-    
-    # Method 2: Rule-based analysis
-    rule_based = rule_based_sentiment(text)
-    
-    # Method 3: Emoticon analysis
-    emoticon_sentiment = analyze_emoticons(text)
-    
-    # Method 4: Punctuation analysis
-    punctuation_sentiment = analyze_punctuation(text)
-    
-    # Combine results with weights
-    combined_score = (
-        keyword_sentiment * 0.4 +
-        rule_based * 0.3 +
-        emoticon_sentiment * 0.2 +
-        punctuation_sentiment * 0.1
-    )
-    
-    # Determine final sentiment
-    if combined_score > 0.1:
-        final_sentiment = 'positive'
-    elif combined_score < -0.1:
-        final_sentiment = 'negative'
-    else:
-        final_sentiment = 'neutral'
-    
-    return {
-        'final_sentiment': final_sentiment,
-        'combined_score': round(combined_score, 3),
-        'keyword_based': round(keyword_sentiment, 3),
-        'rule_based': round(rule_based, 3),
-        'emoticon_based': round(emoticon_sentiment, 3),
-        'punctuation_based': round(punctuation_sentiment, 3),
-        'confidence': round(abs(combined_score), 3)
-    }
-
-def analyze_keywords(text):
-    """Analyze sentiment based on keyword presence"""
-    text_lower = text.lower()
-    words = text_lower.split()
-    
-    positive_count = sum(1 for word in words if word in POSITIVE_WORDS)
-    negative_count = sum(1 for word in words if word in NEGATIVE_WORDS)
-    
-    if positive_count > negative_count:
-        return 0.6
-    elif negative_count > positive_count:
-        return -0.6
-    else:
-        return 0.0
-
-def rule_based_sentiment(text):
-    """Simple rule-based sentiment analysis"""
-    text_lower = text.lower()
-    
-    # Exclamation marks
-    exclamation_count = text.count('!')
-    
-    # Question marks
-    question_count = text.count('?')
-    
-    # Capital letters (shouting)
-    capital_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
-    
-    score = 0
-    score += exclamation_count * 0.1
-    score += capital_ratio * 0.2
-    
-    return max(-1.0, min(1.0, score))
-
-def analyze_emoticons(text):
-    """Analyze sentiment based on emoticons"""
-    positive_emoticons = [':)', ':-)', '😊', '😄', '😃', '😀', '😁', '😆', '😅', '🤗', '❤️', '💕', '💖', '💝']
-    negative_emoticons = [':(', ':-(', '😢', '😭', '😞', '😔', '😟', '😕', '😣', '😖', '💔', '😡', '😠', '😤']
-    
-    positive_count = sum(text.count(emoticon) for emoticon in positive_emoticons)
-    negative_count = sum(text.count(emoticon) for emoticon in negative_emoticons)
-    
-    if positive_count > negative_count:
-        return 0.5
-    elif negative_count > positive_count:
-        return -0.5
-    else:
-        return 0.0
-
-def analyze_punctuation(text):
-    """Analyze sentiment based on punctuation patterns"""
-    score = 0
-    
-    # Multiple exclamation marks
-    if '!!!' in text or '!!' in text:
-        score += 0.3
-    
-    # Multiple question marks
-    if '???' in text or '??' in text:
-        score += 0.1
-    
-    # Ellipsis (can indicate thoughtfulness or uncertainty)
-    if '...' in text:
-        score += 0.05
-    
-    return max(-1.0, min(1.0, score))
+    """Perform comprehensive sentiment analysis using the configured engine profile"""
+    return engine.analyze(text)
 
 def generate_contextual_response(sentiment_results, user_input):
     """Generate contextual response based on sentiment analysis"""
@@ -170,12 +72,8 @@ def generate_contextual_response(sentiment_results, user_input):
     
     return random.choice(responses)
 
-# Serve static files
-@app.route('/static/<path:filename>')
-def static_files(filename):
-    return send_from_directory('static', filename)
-
 @app.route('/')
+@static_assets.cached_page
 def home():
     return render_template_string("""
     <!DOCTYPE html>
@@ -184,7 +82,7 @@ def home():
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>SentimentBot Pro - AI-Powered Sentiment Analysis & Long Conversation Chatbot</title>
-        <link rel="stylesheet" href="/static/styles.css">
+        <link rel="stylesheet" href="{{ url_for('static', filename='styles.css') }}">
         <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
         <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
     </head>
@@ -359,7 +257,7 @@ def home():
             </main>
         </div>
 
-        <script src="/static/script.js"></script>
+        <script src="{{ url_for('static', filename='script.js') }}"></script>
     </body>
     </html>
     """)
@@ -370,6 +268,7 @@ def health():
         "status": "healthy",
         "message": "SentimentBot Pro is running successfully with full sentiment analysis",
         "deployment": "successful",
+        "engine_profile": engine.profile,
         "endpoints": ["/", "/health", "/chat"],
         "features": [
             "AI Sentiment Analysis",
@@ -379,6 +278,16 @@ def health():
         ]
     })
 
+def get_conversation_summary(context):
+    """Running totals for the session carried by this request"""
+    sentiment = context['sentiment_history']
+    return {
+        'total_messages': context['conversation_length'],
+        'average_sentiment': round(sentiment.mean, 3),
+        'sentiment_trend': sentiment.trend(),
+        'conversation_duration': round(time.time() - context['created_at'], 1)
+    }
+
 @app.route('/chat', methods=['POST'])
 def chat():
     try:
@@ -387,6 +296,7 @@ def chat():
             return jsonify({'error': 'No message provided'}), 400
         
         user_input = data['message'].strip()
+        session_id = data.get('session_id', 'default')
         
         if not user_input:
             return jsonify({'error': 'Empty message'}), 400
@@ -396,12 +306,19 @@ def chat():
         
         # Generate contextual response
         response = generate_contextual_response(sentiment_results, user_input)
+
+        # Fold the message into the client-carried session
+        context = conversation_contexts.record_message(session_id, user_input,
+                                                       sentiment_score=sentiment_results['combined_score'])
         
         return jsonify({
             'user_message': user_input,
             'bot_response': response,
             'sentiment_analysis': sentiment_results,
             'timestamp': datetime.now().strftime("%I:%M %p"),
+            'conversation_summary': get_conversation_summary(context),
+            'session_id': session_id,
+            'session_state': conversation_contexts.client_state(session_id),
             'status': 'success'
         })
     
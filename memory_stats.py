@@ -0,0 +1,102 @@
+# SentimentBot Pro - Memory accounting helpers for the session store
+import os
+import sys
+import random
+from array import array
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Objects that are shared process-wide and should not be charged to a session
+_SHARED_TYPES = (type, type(None), bool)
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate the total size in bytes of an object and everything it references"""
+    if seen is None:
+        seen = set()
+
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, _SHARED_TYPES) or id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, bytearray, int, float, array)):
+            continue
+        else:
+            if hasattr(current, '__dict__'):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+
+    return total
+
+
+def process_memory():
+    """Current and peak resident set size of this process, in bytes"""
+    stats = {}
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        stats['rss_bytes'] = pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        stats['peak_rss_bytes'] = peak if sys.platform == 'darwin' else peak * 1024
+
+    return stats
+
+
+def estimate_store_size(sessions, count_messages, sample_size=200, seed=None):
+    """
+    Estimate the memory held by a session store without walking every session.
+
+    ``sessions`` maps session ids to session state and ``count_messages`` returns
+    the number of stored messages for one session state. Up to ``sample_size``
+    sessions are deep-sized and the result is extrapolated to the whole store.
+    """
+    session_ids = list(sessions.keys())
+    session_count = len(session_ids)
+    message_count = sum(count_messages(state) for state in list(sessions.values()))
+
+    if session_count > sample_size:
+        sampled_ids = random.Random(seed).sample(session_ids, sample_size)
+    else:
+        sampled_ids = session_ids
+
+    # Share ``seen`` across the sample so interned keys and shared constants count once
+    seen = set()
+    sampled_bytes = 0
+    sampled_messages = 0
+    for session_id in sampled_ids:
+        state = sessions.get(session_id)
+        if state is None:
+            continue
+        sampled_bytes += deep_sizeof(session_id, seen) + deep_sizeof(state, seen)
+        sampled_messages += count_messages(state)
+
+    bytes_per_session = sampled_bytes / len(sampled_ids) if sampled_ids else 0
+    return {
+        'sessions': session_count,
+        'messages': message_count,
+        'sampled_sessions': len(sampled_ids),
+        'bytes_per_session': round(bytes_per_session),
+        'bytes_per_message': round(sampled_bytes / sampled_messages) if sampled_messages else 0,
+        'estimated_total_bytes': round(bytes_per_session * session_count),
+    }
@@ -0,0 +1,78 @@
+# SentimentBot Pro - Compact per-session message history
+#
+# Each session keeps its last MAX_CONVERSATION_MEMORY messages in a
+# fixed-capacity ring buffer of slotted records (text, float epoch timestamp,
+# enum type and the topics detected at ingest). Appending overwrites the
+# oldest slot in place instead of slicing and copying the list once the
+# session is full.
+from datetime import datetime
+from enum import IntEnum
+
+from config import Config
+
+
+class MessageType(IntEnum):
+    USER = 0
+    BOT = 1
+
+
+class MessageRecord:
+    """One stored message"""
+
+    __slots__ = ('message', 'timestamp', 'type', 'topics')
+
+    def __init__(self, message, timestamp, type=MessageType.USER, topics=()):
+        self.message = message
+        self.timestamp = timestamp
+        self.type = type
+        self.topics = topics
+
+    @property
+    def created_at(self):
+        return datetime.fromtimestamp(self.timestamp)
+
+    def __repr__(self):
+        return f'MessageRecord({self.message!r}, {self.timestamp!r}, {self.type.name})'
+
+
+class MessageHistory:
+    """Fixed-capacity ring buffer of MessageRecords, oldest first"""
+
+    __slots__ = ('capacity', '_slots', '_start', '_size')
+
+    def __init__(self, capacity=Config.MAX_CONVERSATION_MEMORY):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def append(self, record):
+        """Add a record, overwriting the oldest one when full; returns the dropped record or None"""
+        if self._size < self.capacity:
+            self._slots[(self._start + self._size) % self.capacity] = record
+            self._size += 1
+            return None
+        evicted = self._slots[self._start]
+        self._slots[self._start] = record
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('message index out of range')
+        return self._slots[(self._start + index) % self.capacity]
+
+    def __iter__(self):
+        slots, start, capacity = self._slots, self._start, self.capacity
+        for offset in range(self._size):
+            yield slots[(start + offset) % capacity]
+
+    def clear(self):
+        self._slots = [None] * self.capacity
+        self._start = 0
+        self._size = 0
@@ -0,0 +1,264 @@
+# SentimentBot Pro - Prometheus-style metrics
+#
+# Counters and histograms are recorded into per-thread shards, so the request
+# path never takes a lock; shards are only merged when /metrics is scraped.
+# Shards of threads that have exited are folded into a retired total, so
+# thread-per-connection servers do not accumulate one shard per request.
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+from memory_stats import process_memory
+from tracing import tracer
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_COUNTER = 'counter'
+_HISTOGRAM = 'histogram'
+
+
+class MetricsRegistry:
+    """Lock-light registry of counters, histograms and scrape-time gauges"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        # (weakref to the owning thread, shard) pairs for live threads
+        self._shards = []
+        self._retired = {}
+        self._shards_lock = threading.Lock()
+        self._help = {}
+        self._gauges = {}
+        self.started_at = time.time()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._retire_dead_locked()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def _retire_dead_locked(self):
+        # A dead thread no longer writes to its shard, so it can be folded safely
+        live = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, shard))
+            else:
+                _merge_into(self._retired, shard)
+        self._shards = live
+
+    def describe(self, name, kind, help_text):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name, labels=(), amount=1):
+        """Increment a counter; ``labels`` is a tuple of (label, value) pairs"""
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        """Record one histogram observation"""
+        shard = self._shard()
+        key = (name, labels)
+        series = shard.get(key)
+        if series is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            series = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def register_gauge(self, name, help_text, callback):
+        """Register a gauge whose value(s) are computed at scrape time
+
+        ``callback`` returns a number or a dict of labels tuple -> number.
+        """
+        self._gauges[name] = (help_text, callback)
+
+    def _merged(self):
+        merged = {}
+        with self._shards_lock:
+            self._retire_dead_locked()
+            _merge_into(merged, self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            _merge_into(merged, shard)
+        return merged
+
+    def snapshot(self):
+        """Merged counter and histogram values keyed by (name, labels)"""
+        return self._merged()
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        by_name = {}
+        for (name, labels), value in self._merged().items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            kind, help_text = self._help.get(name, (_COUNTER, name))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in sorted(by_name[name]):
+                if kind == _HISTOGRAM:
+                    lines.extend(self._render_histogram(name, labels, value))
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for name, (help_text, callback) in sorted(self._gauges.items()):
+            try:
+                value = callback()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            if isinstance(value, dict):
+                for labels, item in sorted(value.items()):
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(item)}')
+            else:
+                lines.append(f'{name} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, name, labels, series):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, series):
+            cumulative += count
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", _format_value(bound)),))} {cumulative}')
+        cumulative += series[len(self.buckets)]
+        lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(series[-1])}')
+        lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+def _merge_into(total, shard):
+    """Add a shard's counters and histogram series into ``total``"""
+    for key, value in list(shard.items()):
+        if isinstance(value, list):
+            series = total.get(key)
+            if series is None:
+                total[key] = list(value)
+            else:
+                for i, count in enumerate(value):
+                    series[i] += count
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+registry = MetricsRegistry()
+
+registry.describe('sentimentbot_http_requests_total', _COUNTER, 'HTTP requests by route, method and status')
+registry.describe('sentimentbot_http_request_duration_seconds', _HISTOGRAM, 'HTTP request latency by route')
+registry.describe('sentimentbot_stage_duration_seconds', _HISTOGRAM, 'Latency of pipeline stages inside a route')
+registry.describe('sentimentbot_cache_requests_total', _COUNTER, 'Cache lookups by cache and result (hit/miss)')
+registry.describe('sentimentbot_stream_event_seconds', _HISTOGRAM,
+                  'Time from the start of a streamed request until each event was sent')
+
+
+class observe_stage:
+    """Context manager timing one pipeline stage of a route (metrics and slow-request trace)"""
+
+    __slots__ = ('labels', 'start')
+
+    def __init__(self, stage, route='/chat'):
+        self.labels = (('route', route), ('stage', stage))
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        registry.observe('sentimentbot_stage_duration_seconds', elapsed, self.labels)
+        tracer.add_span(self.labels[1][1], elapsed)
+        return False
+
+
+def stage_recorder(route='/chat', prefix=''):
+    """Callback for ``engine.analyze(text, timer=...)`` recording per-analyzer stages"""
+    def record(name, seconds):
+        stage = prefix + name
+        registry.observe('sentimentbot_stage_duration_seconds', seconds, (('route', route), ('stage', stage)))
+        tracer.add_span(stage, seconds)
+    return record
+
+
+def record_cache(cache, hit):
+    """Count one cache lookup so hit rates can be derived"""
+    registry.inc('sentimentbot_cache_requests_total', (('cache', cache), ('result', 'hit' if hit else 'miss')))
+
+
+def record_stream_event(route, event, seconds):
+    """Time from request start to one server-sent event (the first one is time-to-first-event)"""
+    registry.observe('sentimentbot_stream_event_seconds', seconds, (('route', route), ('event', event)))
+
+
+def _process_gauges():
+    stats = process_memory()
+    if 'rss_bytes' in stats:
+        registry.register_gauge('process_resident_memory_bytes', 'Resident memory size in bytes',
+                                lambda: process_memory().get('rss_bytes'))
+    registry.register_gauge('process_cpu_seconds_total', 'Total user and system CPU time in seconds',
+                            lambda: sum(os.times()[:2]))
+    registry.register_gauge('process_start_time_seconds', 'Start time of the process since the epoch',
+                            lambda: registry.started_at)
+
+
+_process_gauges()
+
+
+def init_app(app):
+    """Record per-route request counts and latency, and serve /metrics"""
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            registry.observe('sentimentbot_http_request_duration_seconds', time.perf_counter() - start,
+                             (('route', route), ('method', request.method)))
+            registry.inc('sentimentbot_http_requests_total',
+                         (('route', route), ('method', request.method), ('status', str(response.status_code))))
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        """Prometheus metrics for this worker process"""
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    return app
@@ -0,0 +1,132 @@
+# SentimentBot Pro - On-demand per-request profiling
+#
+# An admin request carrying "X-Profile: cprofile" or "X-Profile: sample" is
+# profiled. With "X-Profile-Output: inline" (default) the response body is
+# replaced by the profile (pstats text or collapsed stacks); with
+# "X-Profile-Output: file" the profile is written to PROFILE_DIR and the
+# normal response is returned with an X-Profile-File header. Requests without
+# the header only pay for one header lookup.
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import Response, g, request
+
+from config import Config
+from admin import is_admin_request
+
+PROFILE_HEADER = 'X-Profile'
+OUTPUT_HEADER = 'X-Profile-Output'
+MODES = ('cprofile', 'sample')
+
+
+class StackSampler:
+    """Sample one thread's stack at a fixed interval and count collapsed stacks"""
+
+    def __init__(self, thread_id, interval=Config.PROFILE_SAMPLE_INTERVAL_MS / 1000.0):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[';'.join(stack)] += 1
+
+    def collapsed(self):
+        """Stacks in the collapsed format understood by flamegraph tools"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _begin():
+    mode = request.headers.get(PROFILE_HEADER)
+    if mode is None:
+        return
+    mode = mode.lower()
+    if mode not in MODES or not is_admin_request():
+        return
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = StackSampler(threading.get_ident())
+        profiler.start()
+    g._profile = (mode, profiler, time.perf_counter())
+
+
+def _finish(response):
+    active = g.pop('_profile', None)
+    if active is None:
+        return response
+
+    mode, profiler, start = active
+    if mode == 'cprofile':
+        profiler.disable()
+    else:
+        profiler.stop()
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    output = request.headers.get(OUTPUT_HEADER, 'inline').lower()
+    if output == 'file':
+        path = _save(mode, profiler)
+        response.headers['X-Profile-File'] = path
+        response.headers['X-Profile-Duration-Ms'] = str(elapsed_ms)
+        return response
+
+    if mode == 'cprofile':
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(Config.PROFILE_TOP_FUNCTIONS)
+        body = stream.getvalue()
+    else:
+        body = profiler.collapsed()
+
+    profiled = Response(body, content_type='text/plain; charset=utf-8')
+    profiled.headers['X-Profile-Original-Status'] = str(response.status_code)
+    profiled.headers['X-Profile-Duration-Ms'] = str(elapsed_ms)
+    return profiled
+
+
+def _save(mode, profiler):
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    route = (request.url_rule.rule if request.url_rule is not None else 'unmatched').strip('/') or 'root'
+    route = route.replace('/', '_').replace('<', '').replace('>', '')
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    if mode == 'cprofile':
+        path = os.path.join(Config.PROFILE_DIR, f'{route}-{stamp}.prof')
+        profiler.dump_stats(path)
+    else:
+        path = os.path.join(Config.PROFILE_DIR, f'{route}-{stamp}.collapsed')
+        with open(path, 'w') as f:
+            f.write(profiler.collapsed())
+    return path
+
+
+def init_app(app):
+    """Enable header-triggered profiling on every route of ``app``"""
+    app.before_request(_begin)
+    app.after_request(_finish)
+    return app
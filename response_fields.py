@@ -0,0 +1,32 @@
+# SentimentBot Pro - Response field selection
+#
+# API clients often need only part of a /chat response (say the bot reply and
+# the sentiment label). They can ask for exactly those parts with `fields`
+# (a JSON list or a comma-separated string, in the body or the query string)
+# or pick a named `profile`. Handlers run only the stages whose outputs were
+# requested; without either parameter the response is unchanged.
+
+
+def requested_fields(data, args, fields, profiles, default='full'):
+    """Response fields a request asked for, as a frozenset
+
+    Raises ValueError naming the unknown field or profile.
+    """
+    data = data if isinstance(data, dict) else {}
+    selected = data.get('fields') or args.get('fields')
+    if selected:
+        if isinstance(selected, str):
+            selected = selected.split(',')
+        if not isinstance(selected, list) or not all(isinstance(name, str) for name in selected):
+            raise ValueError('fields must be a list of names or a comma-separated string')
+        names = frozenset(name.strip() for name in selected if name.strip())
+        unknown = names.difference(fields)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))} "
+                             f"(expected any of {', '.join(fields)})")
+        return names
+
+    profile = data.get('profile') or args.get('profile') or default
+    if profile not in profiles:
+        raise ValueError(f"Unknown profile '{profile}' (expected one of {', '.join(profiles)})")
+    return profiles[profile]
@@ -0,0 +1,40 @@
+"""
+Shared sentiment engine for SentimentBot Pro.
+
+Two runtime profiles are available:
+
+- ``full``: TextBlob + VADER + keyword + rule-based ensemble (needs NLTK data)
+- ``lite``: dependency-free keyword / rule / emoticon / punctuation engine
+
+Entry points pick a profile with ``get_engine(Config.ENGINE_PROFILE or default)``.
+"""
+
+from .lite import LiteEngine
+from .topics import detect_topics
+
+PROFILES = ('full', 'lite')
+
+_engines = {}
+
+
+def get_engine(profile='full'):
+    """Return the (cached) engine for a profile, falling back to lite if full can't load"""
+    profile = (profile or 'full').lower()
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown engine profile '{profile}', expected one of {PROFILES}")
+
+    if profile not in _engines:
+        if profile == 'full':
+            try:
+                from .full import FullEngine
+                _engines[profile] = FullEngine()
+            except (ImportError, LookupError) as e:
+                print(f"Warning: full sentiment engine unavailable ({type(e).__name__}), using lite profile")
+                _engines[profile] = get_engine('lite')
+        else:
+            _engines[profile] = LiteEngine()
+
+    return _engines[profile]
+
+
+__all__ = ['get_engine', 'PROFILES', 'LiteEngine', 'detect_topics']
@@ -0,0 +1,96 @@
+"""TextBlob + VADER ensemble engine (needs NLTK data)"""
+
+from config import Config
+from .lite import LiteEngine
+
+
+def ensure_nltk_data(data_path):
+    """Make sure the NLTK corpora used by the full profile are available"""
+    import nltk
+
+    if data_path not in nltk.data.path:
+        nltk.data.path.append(data_path)
+
+    try:
+        nltk.data.find('tokenizers/punkt')
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        print(f"Downloading NLTK data to {data_path}...")
+        nltk.download('punkt', download_dir=data_path)
+        nltk.download('vader_lexicon', download_dir=data_path)
+        print("NLTK data download complete.")
+
+
+class FullEngine(LiteEngine):
+    """Accurate engine combining TextBlob, VADER, keywords and rules"""
+
+    profile = 'full'
+    KEYWORD_SCORE = 0.5
+    # TextBlob and VADER are left for the full analysis
+    QUICK_ANALYZERS = ('keyword_based', 'rule_based')
+    ROUND_DIGITS = None
+
+    def __init__(self, config=Config):
+        super().__init__(config)
+
+        ensure_nltk_data(config.NLTK_DATA_PATH)
+
+        from textblob import TextBlob
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        from nltk.tokenize import word_tokenize
+
+        self._textblob = TextBlob
+        self._word_tokenize = word_tokenize
+        self.vader_analyzer = SentimentIntensityAnalyzer()
+        # Fail at start-up rather than on the first request if punkt is missing
+        word_tokenize('ready')
+
+        self.analyzers = {
+            'textblob': (self.analyze_textblob, config.TEXTBLOB_WEIGHT),
+            'vader': (self.analyze_vader, config.VADER_WEIGHT),
+            'keyword_based': (self.analyze_keywords, config.KEYWORD_WEIGHT),
+            'rule_based': (self.rule_based_sentiment, config.RULE_BASED_WEIGHT),
+        }
+
+    def tokenize(self, text):
+        """Tokenize lowercased text with NLTK"""
+        return self._word_tokenize(text.lower())
+
+    def analyze_textblob(self, text):
+        """Polarity and subjectivity from TextBlob"""
+        sentiment = self._textblob(text).sentiment
+        return {
+            'polarity': sentiment.polarity,
+            'subjectivity': sentiment.subjectivity
+        }
+
+    def analyze_vader(self, text):
+        """VADER polarity scores"""
+        return self.vader_analyzer.polarity_scores(text)
+
+    def rule_based_sentiment(self, text):
+        """Rule-based sentiment analysis including emoticons"""
+        # Exclamation marks
+        exclamation_count = text.count('!')
+
+        # Capital letters (shouting)
+        capital_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+
+        # Emoticons
+        positive_emoticon_count = sum(text.count(emoticon) for emoticon in self.positive_emoticons)
+        negative_emoticon_count = sum(text.count(emoticon) for emoticon in self.negative_emoticons)
+
+        score = 0
+        score += exclamation_count * 0.1
+        score += (positive_emoticon_count - negative_emoticon_count) * 0.3
+        score += capital_ratio * 0.2
+
+        return max(-1.0, min(1.0, score))
+
+    def component_score(self, name, value):
+        """Numeric contribution of one analyzer's output"""
+        if name == 'textblob':
+            return value['polarity']
+        if name == 'vader':
+            return value['compound']
+        return value
@@ -0,0 +1,188 @@
+"""Dependency-free sentiment engine (keywords, rules, emoticons, punctuation)"""
+
+import time
+
+from config import Config
+from .topics import detect_topics
+
+
+class LiteEngine:
+    """Fast cold-start engine that needs nothing beyond the standard library"""
+
+    profile = 'lite'
+    KEYWORD_SCORE = 0.6
+    ROUND_DIGITS = 3
+    # Analyzers cheap enough for a preliminary label (see quick_analyze)
+    QUICK_ANALYZERS = ('keyword_based', 'rule_based', 'emoticon_based', 'punctuation_based')
+
+    def __init__(self, config=Config):
+        self.config = config
+        self.positive_words = frozenset(config.POSITIVE_WORDS)
+        self.negative_words = frozenset(config.NEGATIVE_WORDS)
+        self.positive_emoticons = tuple(config.POSITIVE_EMOTICONS)
+        self.negative_emoticons = tuple(config.NEGATIVE_EMOTICONS)
+        self.topic_keywords = config.TOPIC_KEYWORDS
+        self.threshold = config.SENTIMENT_CONFIDENCE_THRESHOLD
+
+        # Analyzer name -> (callable, weight); order is the order they run in
+        self.analyzers = {
+            'keyword_based': (self.analyze_keywords, config.LITE_KEYWORD_WEIGHT),
+            'rule_based': (self.rule_based_sentiment, config.LITE_RULE_BASED_WEIGHT),
+            'emoticon_based': (self.analyze_emoticons, config.LITE_EMOTICON_WEIGHT),
+            'punctuation_based': (self.analyze_punctuation, config.LITE_PUNCTUATION_WEIGHT),
+        }
+
+    def tokenize(self, text):
+        """Split lowercased text into words"""
+        return text.lower().split()
+
+    def analyze_keywords(self, text):
+        """Analyze sentiment based on keyword presence"""
+        words = self.tokenize(text)
+
+        positive_count = sum(1 for word in words if word in self.positive_words)
+        negative_count = sum(1 for word in words if word in self.negative_words)
+
+        if positive_count > negative_count:
+            return self.KEYWORD_SCORE
+        elif negative_count > positive_count:
+            return -self.KEYWORD_SCORE
+        else:
+            return 0.0
+
+    def rule_based_sentiment(self, text):
+        """Simple rule-based sentiment analysis"""
+        # Exclamation marks
+        exclamation_count = text.count('!')
+
+        # Capital letters (shouting)
+        capital_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+
+        score = 0
+        score += exclamation_count * 0.1
+        score += capital_ratio * 0.2
+
+        return max(-1.0, min(1.0, score))
+
+    def analyze_emoticons(self, text):
+        """Analyze sentiment based on emoticons"""
+        positive_count = sum(text.count(emoticon) for emoticon in self.positive_emoticons)
+        negative_count = sum(text.count(emoticon) for emoticon in self.negative_emoticons)
+
+        if positive_count > negative_count:
+            return 0.5
+        elif negative_count > positive_count:
+            return -0.5
+        else:
+            return 0.0
+
+    def analyze_punctuation(self, text):
+        """Analyze sentiment based on punctuation patterns"""
+        score = 0
+
+        # Multiple exclamation marks
+        if '!!' in text:
+            score += 0.3
+
+        # Multiple question marks
+        if '??' in text:
+            score += 0.1
+
+        # Ellipsis (can indicate thoughtfulness or uncertainty)
+        if '...' in text:
+            score += 0.05
+
+        return max(-1.0, min(1.0, score))
+
+    def classify(self, combined_score):
+        """Map a combined score onto a sentiment label"""
+        if combined_score > self.threshold:
+            return 'positive'
+        elif combined_score < -self.threshold:
+            return 'negative'
+        else:
+            return 'neutral'
+
+    def analyze(self, text, timer=None, scores=None):
+        """Perform comprehensive sentiment analysis using every analyzer of the profile
+
+        ``timer(name, seconds)``, when given, is called with the duration of each analyzer.
+        ``scores`` holds analyzer outputs already computed (by quick_analyze), which are not rerun.
+        """
+        scores = dict(scores) if scores else {}
+        if timer is None:
+            for name, (analyzer, _) in self.analyzers.items():
+                if name not in scores:
+                    scores[name] = analyzer(text)
+        else:
+            for name, (analyzer, _) in self.analyzers.items():
+                if name in scores:
+                    continue
+                start = time.perf_counter()
+                scores[name] = analyzer(text)
+                timer(name, time.perf_counter() - start)
+        return self.combine(scores)
+
+    def analyze_batch(self, texts, timer=None):
+        """analyze() for several texts at once, one analyzer at a time over the whole batch
+
+        ``timer(name, seconds)`` is called once per analyzer with its time for the batch.
+        """
+        texts = list(texts)
+        batch_scores = [{} for _ in texts]
+        for name, (analyzer, _) in self.analyzers.items():
+            start = time.perf_counter()
+            for text, scores in zip(texts, batch_scores):
+                scores[name] = analyzer(text)
+            if timer is not None:
+                timer(name, time.perf_counter() - start)
+        return [self.combine(scores) for scores in batch_scores]
+
+    def quick_analyze(self, text):
+        """Preliminary label from the QUICK_ANALYZERS alone; returns (result, scores)
+
+        When they are only a subset of the analyzers their weights are rescaled to
+        sum to one. Pass ``scores`` on to analyze() so they do not run twice.
+        """
+        scores = {}
+        combined_score = total_weight = 0.0
+        for name in self.QUICK_ANALYZERS:
+            analyzer, weight = self.analyzers[name]
+            scores[name] = analyzer(text)
+            combined_score += self.component_score(name, scores[name]) * weight
+            total_weight += weight
+        if total_weight and len(scores) < len(self.analyzers):
+            combined_score /= total_weight
+        return {
+            'final_sentiment': self.classify(combined_score),
+            'combined_score': self._round(combined_score),
+        }, scores
+
+    def component_score(self, name, value):
+        """Numeric contribution of one analyzer's output"""
+        return value
+
+    def _round(self, value):
+        if self.ROUND_DIGITS is None or not isinstance(value, float):
+            return value
+        return round(value, self.ROUND_DIGITS)
+
+    def combine(self, scores):
+        """Weight the per-analyzer scores into the final result"""
+        combined_score = sum(
+            self.component_score(name, scores[name]) * weight
+            for name, (_, weight) in self.analyzers.items()
+        )
+
+        result = {
+            'final_sentiment': self.classify(combined_score),
+            'combined_score': self._round(combined_score),
+        }
+        for name, value in scores.items():
+            result[name] = self._round(value)
+        result['confidence'] = self._round(abs(combined_score))
+        return result
+
+    def detect_topics(self, text):
+        """Detect topics from user input text"""
+        return detect_topics(text, self.topic_keywords)
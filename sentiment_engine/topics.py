@@ -0,0 +1,15 @@
+"""Topic detection shared by every engine profile"""
+
+
+def detect_topics(text, topic_keywords):
+    """Detect topics from user input text"""
+    text_lower = text.lower()
+    detected_topics = set()
+
+    for topic, keywords in topic_keywords.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                detected_topics.add(topic)
+                break
+
+    return detected_topics
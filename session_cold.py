@@ -0,0 +1,138 @@
+# SentimentBot Pro - Cold tier for idle sessions
+#
+# The in-memory store spills sessions idle for longer than
+# SESSION_SPILL_AFTER_SECONDS into this tier: a zlib-compressed snapshot per
+# session in a local SQLite file (SESSION_COLD_PATH). The next /chat or
+# /conversation_summary for the session takes it back out and rehydrates it.
+# Cold sessions expire after SESSION_COLD_TTL_HOURS.
+import json
+import os
+import threading
+import time
+import zlib
+
+from config import Config
+from session_sqlite import connect
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cold_sessions (
+    session_id TEXT PRIMARY KEY,
+    state BLOB NOT NULL,
+    ram_bytes INTEGER NOT NULL,
+    spilled_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cold_sessions_spilled_at ON cold_sessions (spilled_at);
+"""
+
+
+class ColdSessionTier:
+    """Compressed on-disk storage for sessions spilled from memory"""
+
+    def __init__(self, path, ttl=Config.SESSION_COLD_TTL_HOURS * 3600, compression_level=6):
+        self.path = path
+        self.ttl = ttl
+        self.compression_level = compression_level
+        self._local = threading.local()
+        self.stats = {
+            'spills': 0,
+            'rehydrations': 0,
+            'expired': 0,
+            'spill_seconds_total': 0.0,
+            'rehydrate_seconds_total': 0.0,
+            'last_spill_ms': 0.0,
+            'last_rehydrate_ms': 0.0,
+        }
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        # One connection per thread, reopened after fork
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.pid != os.getpid():
+            conn = local.conn = connect(self.path)
+            local.pid = os.getpid()
+        return conn
+
+    def put(self, session_id, state, ram_bytes):
+        """Store a session's dump_context() state"""
+        blob = zlib.compress(json.dumps(state, separators=(',', ':')).encode('utf-8'), self.compression_level)
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cold_sessions (session_id, state, ram_bytes, spilled_at) VALUES (?, ?, ?, ?)',
+            (session_id, blob, ram_bytes, time.time()))
+        return len(blob)
+
+    def load(self, session_id):
+        """Return a session's state without removing it, or None"""
+        row = self._connection().execute(
+            'SELECT state FROM cold_sessions WHERE session_id = ?', (session_id,)).fetchone()
+        return None if row is None else json.loads(zlib.decompress(row[0]))
+
+    def take(self, session_id):
+        """Remove a session from the tier and return its state, or None"""
+        conn = self._connection()
+        # Most misses are for sessions that were never spilled; answer those without the write lock
+        if conn.execute('SELECT 1 FROM cold_sessions WHERE session_id = ?', (session_id,)).fetchone() is None:
+            return None
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT state FROM cold_sessions WHERE session_id = ?', (session_id,)).fetchone()
+            if row is not None:
+                conn.execute('DELETE FROM cold_sessions WHERE session_id = ?', (session_id,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def discard(self, session_id):
+        self._connection().execute('DELETE FROM cold_sessions WHERE session_id = ?', (session_id,))
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cold_sessions')
+
+    def keys(self):
+        return [session_id for (session_id,) in self._connection().execute('SELECT session_id FROM cold_sessions')]
+
+    def __contains__(self, session_id):
+        row = self._connection().execute(
+            'SELECT 1 FROM cold_sessions WHERE session_id = ?', (session_id,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM cold_sessions').fetchone()[0]
+
+    def record_spill(self, seconds):
+        self.stats['spills'] += 1
+        self.stats['spill_seconds_total'] += seconds
+        self.stats['last_spill_ms'] = round(seconds * 1000, 3)
+
+    def record_rehydrate(self, seconds):
+        self.stats['rehydrations'] += 1
+        self.stats['rehydrate_seconds_total'] += seconds
+        self.stats['last_rehydrate_ms'] = round(seconds * 1000, 3)
+
+    def sweep(self, now=None):
+        """Delete cold sessions older than the TTL; returns how many"""
+        if not self.ttl:
+            return 0
+        now = time.time() if now is None else now
+        expired = self._connection().execute(
+            'DELETE FROM cold_sessions WHERE spilled_at <= ?', (now - self.ttl,)).rowcount
+        self.stats['expired'] += expired
+        return expired
+
+    def get_stats(self):
+        """Cold counts, spill/rehydrate latency and the RAM the spilled sessions would use"""
+        sessions, ram_bytes, disk_bytes = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(ram_bytes), 0), COALESCE(SUM(LENGTH(state)), 0) FROM cold_sessions').fetchone()
+        stats = dict(self.stats)
+        stats['avg_spill_ms'] = round(stats['spill_seconds_total'] / stats['spills'] * 1000, 3) if stats['spills'] else 0.0
+        stats['avg_rehydrate_ms'] = (round(stats['rehydrate_seconds_total'] / stats['rehydrations'] * 1000, 3)
+                                     if stats['rehydrations'] else 0.0)
+        stats['cold_sessions'] = sessions
+        stats['ram_saved_bytes'] = ram_bytes
+        stats['disk_bytes'] = disk_bytes
+        stats['path'] = self.path
+        return stats
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# SentimentBot Pro - Bulk session import
+#
+# Seeds a session with a transcript carried over from another channel:
+#
+#     python session_import.py transcript.json --url http://127.0.0.1:5000
+#
+# posts each transcript to POST /admin/sessions/import (send ADMIN_TOKEN). The
+# server scores every message in one engine batch, builds the session's
+# aggregates and topics directly in the store, replacing any previous session
+# with that id, and answers with one conversation summary and the import
+# throughput. Only the customer's side of the transcript is recorded, as /chat
+# would have recorded it.
+import argparse
+import json
+import math
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from flask import jsonify, request
+
+from admin import ADMIN_HEADER, admin_required
+from config import Config
+from metrics import observe_stage
+
+IMPORT_ROUTE = '/admin/sessions/import'
+
+# Transcript roles recorded as user messages; anything else (bot, agent, system) is skipped
+USER_ROLES = ('user', 'customer', 'human')
+
+
+def _timestamp(value, default):
+    if value is None:
+        return default
+    timestamp = None
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            timestamp = float(value)
+        elif isinstance(value, str):
+            timestamp = datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        # Sessions turn timestamps back into datetimes; reject what datetime cannot represent
+        if timestamp is not None and math.isfinite(timestamp):
+            datetime.fromtimestamp(timestamp)
+            return timestamp
+    except (ValueError, OverflowError, OSError):
+        pass
+    raise ValueError(f'Invalid timestamp {value!r} (expected epoch seconds or ISO 8601)')
+
+
+def parse_transcript(messages, now=None):
+    """User messages of a transcript as (text, timestamp) pairs, oldest first; also returns the skipped count
+
+    Messages are strings or objects with ``message`` (or ``text``) and optional
+    ``timestamp`` and ``role``. Raises ValueError naming the first bad message.
+    """
+    if not isinstance(messages, list) or not messages:
+        raise ValueError('No messages provided')
+    if len(messages) > Config.SESSION_IMPORT_MAX_MESSAGES:
+        raise ValueError(f'At most {Config.SESSION_IMPORT_MAX_MESSAGES} messages per import')
+
+    now = time.time() if now is None else now
+    parsed = []
+    skipped = 0
+    for index, message in enumerate(messages):
+        timestamp = None
+        if isinstance(message, dict):
+            if str(message.get('role', 'user')).lower() not in USER_ROLES:
+                skipped += 1
+                continue
+            timestamp = message.get('timestamp')
+            message = message.get('message', message.get('text'))
+        if not isinstance(message, str) or not message.strip():
+            raise ValueError(f'Empty or invalid message at index {index}')
+        try:
+            timestamp = _timestamp(timestamp, parsed[-1][1] if parsed else now)
+        except ValueError as e:
+            raise ValueError(f'{e} at index {index}') from None
+        parsed.append((message.strip(), timestamp))
+    if not parsed:
+        raise ValueError('Transcript has no user messages')
+    # Transcripts exported out of order are replayed in time order
+    parsed.sort(key=lambda item: item[1])
+    return parsed, skipped
+
+
+def score_transcript(engine, messages):
+    """Score a parsed transcript in one batch; returns store.import_messages() entries
+
+    Needs no session state, so it runs before the session lock is taken.
+    """
+    texts = [text for text, _ in messages]
+    with observe_stage('import_scoring', IMPORT_ROUTE):
+        results = engine.analyze_batch(texts)
+    with observe_stage('import_topics', IMPORT_ROUTE):
+        topics = [engine.detect_topics(text) for text in texts]
+    return [
+        (text, timestamp, message_topics, result['combined_score'])
+        for (text, timestamp), message_topics, result in zip(messages, topics, results)
+    ]
+
+
+def import_stats(count, seconds):
+    return {
+        'messages': count,
+        'seconds': round(seconds, 4),
+        'messages_per_second': round(count / seconds, 1) if seconds else 0.0,
+    }
+
+
+def init_app(app, store, engine, summarize):
+    """Register the admin import endpoint; ``summarize(session_id)`` builds the returned summary"""
+
+    @app.route(IMPORT_ROUTE, methods=['POST'])
+    @admin_required
+    def import_session():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not data.get('session_id'):
+            return jsonify({'error': 'No session_id provided'}), 400
+        session_id = data['session_id']
+        try:
+            messages, skipped = parse_transcript(data.get('messages'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        start = time.perf_counter()
+        entries = score_transcript(engine, messages)
+        # Only storing the session and summarizing it hold the session's lock
+        with store.session_lock(session_id):
+            with observe_stage('import_build', IMPORT_ROUTE):
+                store.import_messages(session_id, entries)
+            stats = import_stats(len(entries), time.perf_counter() - start)
+            with observe_stage('summary', IMPORT_ROUTE):
+                response_data = {
+                    'session_id': session_id,
+                    'imported': len(messages),
+                    'skipped': skipped,
+                    'conversation_summary': summarize(session_id),
+                    'import_stats': stats
+                }
+        if store.backend == 'stateless':
+            response_data['session_state'] = store.client_state(session_id)
+        return jsonify(response_data)
+
+
+def load_transcripts(path):
+    """Transcripts in a file: {"session_id", "messages"} objects (alone, in a list or as JSON lines)
+    or a bare list of messages"""
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        return [data]
+    if data and all(isinstance(item, dict) and 'messages' in item for item in data):
+        return data
+    return [{'messages': data}]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import conversation transcripts as sessions')
+    parser.add_argument('files', nargs='+', help='transcript files (JSON or JSON lines)')
+    parser.add_argument('--url', default=f'http://127.0.0.1:{Config.PORT}', help='server to import into')
+    parser.add_argument('--session-id', help='session id for a single transcript without one')
+    parser.add_argument('--token', default=Config.ADMIN_TOKEN, help='admin token (default: ADMIN_TOKEN)')
+    args = parser.parse_args(argv)
+
+    transcripts = [transcript for path in args.files for transcript in load_transcripts(path)]
+    if args.session_id:
+        if len(transcripts) != 1:
+            parser.error('--session-id needs exactly one transcript')
+        transcripts[0]['session_id'] = args.session_id
+
+    total_messages = 0
+    start = time.perf_counter()
+    for transcript in transcripts:
+        body = json.dumps({'session_id': transcript.get('session_id'),
+                           'messages': transcript.get('messages')}).encode()
+        req = urllib.request.Request(args.url.rstrip('/') + IMPORT_ROUTE, data=body, method='POST',
+                                     headers={'Content-Type': 'application/json', ADMIN_HEADER: args.token or ''})
+        try:
+            with urllib.request.urlopen(req) as response:
+                result = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            error = json.loads(e.read() or b'{}').get('error', e.reason)
+            print(f"❌ {transcript.get('session_id')}: {e.code} {error}")
+            continue
+        stats = result['import_stats']
+        total_messages += result['imported']
+        print(f"✅ {result['session_id']}: {result['imported']} messages ({result['skipped']} skipped), "
+              f"{stats['messages_per_second']:.0f} messages/s on the server")
+
+    seconds = time.perf_counter() - start
+    if total_messages:
+        print(f"\nImported {total_messages} messages in {seconds:.2f} s "
+              f"({total_messages / seconds:.0f} messages/s end to end)")
+    return 0 if total_messages else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+# SentimentBot Pro - Write-behind session journal
+#
+# Makes the in-memory session store survive restarts and deploys. /chat only
+# queues each mutation (message, timestamp, topics, score); a background
+# thread appends queued entries to the current journal segment and fsyncs
+# once per batch. Every SESSION_SNAPSHOT_INTERVAL_SECONDS the writer starts a
+# new segment, writes a compact snapshot of every session and deletes the
+# segments the snapshot covers. On start-up the latest snapshot is loaded and
+# the remaining segments are replayed; per-session versions make replaying an
+# entry the snapshot already contains a no-op. An imported session is journaled
+# as one record holding its whole state, as in a snapshot, so it keeps the
+# import time as its last activity instead of the transcript's last message.
+# Sessions deleted or evicted from the store are journaled as tombstones, so a
+# restart before the next snapshot does not bring them back.
+#
+# The journal directory belongs to one process: use SESSION_BACKEND=sqlite to
+# share sessions between several workers.
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+from config import Config
+from session_store import apply_message, dump_context, load_context
+
+SNAPSHOT_FILE = 'snapshot.jsonl'
+SEGMENT_PREFIX = 'journal-'
+SEGMENT_SUFFIX = '.log'
+
+
+def _entry_time(entry):
+    # Message entries are lists; whole-session records and tombstones are objects
+    return entry['at'] if isinstance(entry, dict) else entry[3]
+
+
+class SessionJournal:
+    """Append-only journal plus periodic snapshots of a SessionStore"""
+
+    def __init__(self, directory, flush_interval=Config.SESSION_JOURNAL_FLUSH_INTERVAL_MS / 1000.0,
+                 snapshot_interval=Config.SESSION_SNAPSHOT_INTERVAL_SECONDS):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.store = None
+        self._queue = queue.SimpleQueue()
+        self._write_lock = threading.RLock()
+        self._start_lock = threading.Lock()
+        self._writer_pid = None
+        self._segment = 0
+        self._file = None
+        self._last_snapshot = time.monotonic()
+        self.stats = {
+            'entries_written': 0,
+            'batches': 0,
+            'last_batch_size': 0,
+            'last_flush_lag_ms': 0.0,
+            'snapshots': 0,
+            'last_snapshot_sessions': 0,
+            'last_snapshot_ms': 0.0,
+            'write_errors': 0,
+        }
+        self.restore_stats = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f'{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}')
+
+    def _segments(self):
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                segments.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(segments)
+
+    def attach(self, store):
+        """Restore ``store`` from disk, then journal its future mutations"""
+        self.restore(store)
+        self.store = store
+        store.journal = self
+        atexit.register(self.flush)
+        return store
+
+    def restore(self, store):
+        """Load the latest snapshot and replay the journal segments after it"""
+        start = time.perf_counter()
+        now = time.time()
+        sessions = {}
+        first_segment = 0
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path) as f:
+                header = json.loads(f.readline())
+                first_segment = header['segment']
+                for line in f:
+                    session_id, state = json.loads(line)
+                    sessions[session_id] = load_context(state, store.factory)
+        restored = len(sessions)
+
+        replayed = skipped = 0
+        segments = [segment for segment in self._segments() if segment >= first_segment]
+        for segment in segments:
+            with open(self._segment_path(segment)) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-write
+                        break
+                    if isinstance(entry, dict):
+                        if entry['op'] == 'put':
+                            sessions[entry['id']] = load_context(entry['state'], store.factory)
+                        elif entry['op'] == 'delete':
+                            sessions.pop(entry['id'], None)
+                        elif entry['op'] == 'clear':
+                            sessions.clear()
+                        replayed += 1
+                        continue
+                    session_id, created_at, version, timestamp, text, topics, score = entry
+                    context = sessions.get(session_id)
+                    if (context is None or context['created_at'] != created_at) and version != 1:
+                        # Spilled to the cold tier before the snapshot was taken
+                        context = self._from_cold(store, session_id, created_at) or context
+                        if context is not None:
+                            sessions[session_id] = context
+                    if context is None or context['created_at'] != created_at:
+                        if version != 1:
+                            skipped += 1
+                            continue
+                        context = sessions[session_id] = store.factory()
+                        context['created_at'] = created_at
+                    if version != context['version'] + 1:
+                        skipped += 1
+                        continue
+                    apply_message(context, text, timestamp, topics, score)
+                    replayed += 1
+
+        for session_id, context in sorted(sessions.items(), key=lambda item: item[1]['last_activity']):
+            store.put(session_id, context, idle_seconds=max(0.0, now - context['last_activity'].timestamp()))
+
+        # Continue in a fresh segment so a torn tail is never appended to
+        self._segment = (segments[-1] + 1) if segments else first_segment
+        self.restore_stats = {
+            'snapshot_sessions': restored,
+            'sessions': len(store),
+            'entries_replayed': replayed,
+            'entries_skipped': skipped,
+            'segments_replayed': len(segments),
+            'seconds': round(time.perf_counter() - start, 4),
+        }
+        if restored or replayed:
+            print(f"Restored {len(store)} sessions ({replayed} journal entries) "
+                  f"in {self.restore_stats['seconds'] * 1000:.1f} ms")
+        return self.restore_stats
+
+    def _from_cold(self, store, session_id, created_at):
+        cold = getattr(store, 'cold', None)
+        if cold is None:
+            return None
+        state = cold.load(session_id)
+        if state is None or state['c'] != created_at:
+            return None
+        cold.discard(session_id)
+        return load_context(state, store.factory)
+
+    def append(self, session_id, context, text, timestamp, topics, sentiment_score):
+        """Queue one mutation; never touches the disk"""
+        self._ensure_writer()
+        self._queue.put((session_id, context['created_at'], context['version'], timestamp, text,
+                         list(topics), sentiment_score))
+
+    def put(self, session_id, context):
+        """Queue a whole session (an import) replacing any previous one"""
+        self._ensure_writer()
+        self._queue.put({'op': 'put', 'id': session_id, 'state': dump_context(context), 'at': time.time()})
+
+    def delete(self, session_id):
+        """Queue a tombstone for a session deleted or evicted from the store"""
+        self._ensure_writer()
+        self._queue.put({'op': 'delete', 'id': session_id, 'at': time.time()})
+
+    def clear(self):
+        self._ensure_writer()
+        self._queue.put({'op': 'clear', 'at': time.time()})
+
+    def _ensure_writer(self):
+        if self._writer_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+        thread = threading.Thread(target=self._write_forever, name='session-journal', daemon=True)
+        thread.start()
+
+    def _write_forever(self):
+        while True:
+            try:
+                # The entry taken off the queue is held under the write lock until it is
+                # written, so a flush() from another thread cannot write later entries first
+                with self._write_lock:
+                    try:
+                        entry = self._queue.get(timeout=self.flush_interval)
+                    except queue.Empty:
+                        entry = None
+                    else:
+                        # Let the group fill up a little before paying for the fsync
+                        time.sleep(self.flush_interval)
+                    self.flush(entry)
+                if self.snapshot_interval and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+                    self.snapshot()
+            except OSError as e:
+                self.stats['write_errors'] += 1
+                print(f"Warning: session journal write failed ({e})")
+
+    def flush(self, first=None):
+        """Write every queued entry to the current segment with a single fsync"""
+        with self._write_lock:
+            batch = [] if first is None else [first]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return 0
+            if self._file is None:
+                self._file = open(self._segment_path(self._segment), 'a')
+            self._file.write(''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.stats['entries_written'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['last_batch_size'] = len(batch)
+            self.stats['last_flush_lag_ms'] = round((time.time() - _entry_time(batch[0])) * 1000, 3)
+            return len(batch)
+
+    def snapshot(self):
+        """Write a snapshot of every session and drop the segments it covers"""
+        start = time.perf_counter()
+        with self._write_lock:
+            covered = self._segment
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._segment += 1
+            next_segment = self._segment
+        # Entries queued from now on go to the new segment; the snapshot may
+        # include some of them, which replay skips by version.
+        self.flush()
+
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp_path = path + '.tmp'
+        count = 0
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({'segment': next_segment, 'created_at': time.time()}) + '\n')
+            for session_id, state in self.store.export_sessions(dump_context):
+                f.write(json.dumps([session_id, state], separators=(',', ':')) + '\n')
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        directory_fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+        for segment in self._segments():
+            if segment <= covered:
+                os.remove(self._segment_path(segment))
+
+        self._last_snapshot = time.monotonic()
+        self.stats['snapshots'] += 1
+        self.stats['last_snapshot_sessions'] = count
+        self.stats['last_snapshot_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return count
+
+    def pending(self):
+        """Entries queued but not yet written"""
+        return self._queue.qsize()
+
+    def get_stats(self):
+        """Journal lag, throughput, snapshot and restore figures"""
+        stats = dict(self.stats)
+        stats['pending_entries'] = self.pending()
+        stats['segment'] = self._segment
+        stats['directory'] = self.directory
+        stats['restore'] = self.restore_stats
+        return stats
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+# SentimentBot Pro - Session-affinity router over a local worker pool
+#
+# An alternative to sharing sessions through SQLite on one box:
+#
+#     python session_router.py --workers 4 --port 5000
+#
+# starts N single-threaded app workers (gunicorn sync, one process each) on
+# loopback ports and a front process that hashes each request's session_id
+# onto one of them. A session therefore always lands on the same process,
+# which keeps it in its own in-memory store with a single writer, and more
+# cores simply means more workers.
+#
+# Workers sit on a consistent hash ring with ROUTER_VIRTUAL_NODES points each,
+# so adding or removing a worker only remaps the sessions on the arcs it
+# gains or loses. Those sessions are handed over to their new owner through
+# loopback-only endpoints authenticated with a per-router token; traffic is
+# paused for the duration of the handoff. Per-worker load and session
+# distribution are reported at /admin/router.
+#
+# SESSION_JOURNAL_DIR and SESSION_COLD_PATH are given to each worker as its
+# own subdirectory (<dir>/<worker name>) and file (<name>-<worker name>.<ext>),
+# so workers never write to one journal or cold tier; a restarted pool gets the
+# same worker names and so finds its journals again.
+import argparse
+import atexit
+import bisect
+import contextlib
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from itertools import count
+
+from flask import Flask, Response, jsonify, request
+
+from config import Config
+
+ROUTER_HEADER = 'X-Router-Token'
+SESSION_HEADER = 'X-Session-ID'
+# Not forwarded between client, router and worker
+HOP_BY_HOP = frozenset(('connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te',
+                        'trailers', 'transfer-encoding', 'upgrade', 'host', 'content-length'))
+
+
+def _point(key):
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hash ring mapping session ids to worker names"""
+
+    def __init__(self, nodes=(), virtual_nodes=Config.ROUTER_VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self._points = []
+        self._owners = []
+        self.nodes = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        for i in range(self.virtual_nodes):
+            point = _point(f'{node}#{i}')
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+        self.nodes.append(node)
+
+    def remove(self, node):
+        keep = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in keep]
+        self._owners = [owner for _, owner in keep]
+        self.nodes.remove(node)
+
+    def node_for(self, key):
+        """Owner of ``key``: the first point clockwise from its hash"""
+        if not self._points:
+            raise LookupError('hash ring is empty')
+        index = bisect.bisect(self._points, _point(key)) % len(self._points)
+        return self._owners[index]
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+# ---------------------------------------------------------------------------
+# Worker side: session handoff endpoints, registered by app.py
+
+def init_worker(app, store):
+    """Expose the handoff endpoints the router uses when the pool changes"""
+    from session_store import dump_context, load_context
+
+    def authorized():
+        token = request.headers.get(ROUTER_HEADER)
+        return bool(Config.SESSION_ROUTER_TOKEN and token
+                    and hmac.compare_digest(token, Config.SESSION_ROUTER_TOKEN))
+
+    @app.route('/_router/stats', methods=['GET'])
+    def router_worker_stats():
+        if not authorized():
+            return jsonify({'error': 'Not found'}), 404
+        return jsonify({
+            'worker': Config.SESSION_ROUTER_WORKER,
+            'pid': os.getpid(),
+            'sessions': len(store),
+            'messages': store.message_count(),
+        })
+
+    @app.route('/_router/release', methods=['POST'])
+    def router_worker_release():
+        """Give up (and return) every session the new ring assigns to another worker"""
+        if not authorized():
+            return jsonify({'error': 'Not found'}), 404
+        data = request.get_json()
+        ring = HashRing(data['workers'], data['virtual_nodes'])
+        released = {}
+        session_ids = store.keys()
+        if getattr(store, 'cold', None) is not None:
+            # Spilled sessions follow the ring too; get() below rehydrates them
+            session_ids += store.cold.keys()
+        for session_id in session_ids:
+            if ring.node_for(session_id) == Config.SESSION_ROUTER_WORKER:
+                continue
+            with store.session_lock(session_id):
+                context = store.get(session_id, touch=False)
+                if context is None:
+                    continue
+                released[session_id] = dump_context(context)
+                # Journaled as a tombstone, so a restart of this worker does not bring it back
+                store.delete(session_id)
+        return jsonify({'sessions': released})
+
+    @app.route('/_router/adopt', methods=['POST'])
+    def router_worker_adopt():
+        """Take over sessions released by other workers"""
+        if not authorized():
+            return jsonify({'error': 'Not found'}), 404
+        now = time.time()
+        sessions = request.get_json()['sessions']
+        for session_id, state in sorted(sessions.items(), key=lambda item: item[1]['a']):
+            store.put(session_id, load_context(state, store.factory), idle_seconds=max(0.0, now - state['a']))
+        return jsonify({'adopted': len(sessions)})
+
+
+# ---------------------------------------------------------------------------
+# Router side
+
+def worker_env(name, token, environ=os.environ):
+    """Environment for the worker process ``name``, with its own journal directory and cold tier file"""
+    env = dict(environ, SESSION_BACKEND='memory', SESSION_ROUTER_TOKEN=token, SESSION_ROUTER_WORKER=name)
+    if env.get('SESSION_JOURNAL_DIR'):
+        env['SESSION_JOURNAL_DIR'] = os.path.join(env['SESSION_JOURNAL_DIR'], name)
+    if env.get('SESSION_COLD_PATH'):
+        root, ext = os.path.splitext(env['SESSION_COLD_PATH'])
+        env['SESSION_COLD_PATH'] = f'{root}-{name}{ext}'
+    return env
+
+
+class Worker:
+    """One app process owned by the pool"""
+
+    def __init__(self, name, port, process):
+        self.name = name
+        self.port = port
+        self.process = process
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'seconds_total': 0.0,
+            'sessions_received': 0,
+            'sessions_released': 0,
+        }
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class WorkerPool:
+    """Local worker processes behind a session-affinity hash ring"""
+
+    def __init__(self, size, app_spec='app:app', virtual_nodes=Config.ROUTER_VIRTUAL_NODES,
+                 start_timeout=60, request_timeout=120):
+        self.size = size
+        self.app_spec = app_spec
+        self.virtual_nodes = virtual_nodes
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+        self.token = secrets.token_hex(16)
+        self.workers = {}
+        self.ring = HashRing(virtual_nodes=virtual_nodes)
+        self._names = count()
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._rebalancing = False
+        self._round_robin = count()
+        self.stats = {
+            'requests': 0,
+            'unrouted_requests': 0,
+            'rebalances': 0,
+            'last_rebalance_ms': 0.0,
+        }
+
+    def start(self):
+        for _ in range(self.size):
+            self.add_worker()
+        atexit.register(self.stop)
+        return self
+
+    def _spawn(self, name):
+        port = _free_port()
+        env = worker_env(name, self.token)
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', '1',
+                   '--worker-class', 'sync', '--timeout', str(self.request_timeout), '--log-level', 'warning',
+                   self.app_spec]
+        worker = Worker(name, port, subprocess.Popen(command, env=env))
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            if not worker.alive:
+                raise RuntimeError(f'{name} exited during start-up')
+            try:
+                self._call(worker, 'GET', '/_router/stats')
+                return worker
+            except OSError:
+                if time.monotonic() > deadline:
+                    worker.process.terminate()
+                    raise RuntimeError(f'{name} did not start within {self.start_timeout}s')
+                time.sleep(0.1)
+
+    # -- connections ----------------------------------------------------
+
+    def _connection(self, worker):
+        # One keep-alive connection per (router thread, worker)
+        connections = self._local.__dict__.setdefault('connections', {})
+        conn = connections.get(worker.name)
+        if conn is None or conn.port != worker.port:
+            conn = http.client.HTTPConnection('127.0.0.1', worker.port, timeout=self.request_timeout)
+            connections[worker.name] = conn
+        return conn
+
+    def _send(self, worker, method, path, body=None, headers=None, stream=False):
+        """Returns (response, body); with ``stream`` the body of an event stream is left unread (None)"""
+        conn = self._connection(worker)
+        reused = conn.sock is not None
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                # The worker closed an idle keep-alive connection: retry once on a fresh one
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            if stream and (response.getheader('Content-Type') or '').startswith('text/event-stream'):
+                return response, None
+            return response, response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+
+    def _call(self, worker, method, path, payload=None):
+        """JSON call to a worker's /_router endpoint"""
+        headers = {ROUTER_HEADER: self.token, 'Content-Type': 'application/json'}
+        body = None if payload is None else json.dumps(payload, separators=(',', ':'))
+        response, data = self._send(worker, method, path, body, headers)
+        if response.status != 200:
+            raise RuntimeError(f'{worker.name} {path} returned {response.status}')
+        return json.loads(data)
+
+    # -- routing ----------------------------------------------------------
+
+    def worker_for(self, session_id):
+        if session_id is None:
+            # No session: spread across the pool
+            names = self.ring.nodes
+            self.stats['unrouted_requests'] += 1
+            return self.workers[names[next(self._round_robin) % len(names)]]
+        return self.workers[self.ring.node_for(session_id)]
+
+    def forward(self, session_id, method, path, body, headers):
+        """Send one request to the session's owner; returns (status, headers, body)"""
+        with self._cond:
+            while self._rebalancing:
+                self._cond.wait()
+            worker = self.worker_for(session_id)
+            self._in_flight += 1
+            self.stats['requests'] += 1
+            worker.stats['requests'] += 1
+            worker.stats['in_flight'] += 1
+        start = time.perf_counter()
+        failed = True
+        streaming = False
+        try:
+            response, data = self._send(worker, method, path, body, headers, stream=True)
+            failed = response.status >= 500
+            if data is None:
+                # Server-sent events are relayed as they arrive; the request ends with the stream
+                streaming = True
+                return response.status, response.getheaders(), _Relay(self, worker, response, start, failed)
+            return response.status, response.getheaders(), data
+        finally:
+            if not streaming:
+                self._finish(worker, start, failed)
+
+    def _finish(self, worker, start, failed):
+        with self._cond:
+            worker.stats['in_flight'] -= 1
+            worker.stats['seconds_total'] += time.perf_counter() - start
+            worker.stats['errors'] += failed
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._cond.notify_all()
+
+    # -- membership -------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _paused(self):
+        # Wait for in-flight requests to finish and hold new ones back
+        with self._cond:
+            while self._rebalancing:
+                self._cond.wait()
+            self._rebalancing = True
+            while self._in_flight:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._rebalancing = False
+                self._cond.notify_all()
+
+    def _rebalance(self, ring, sources):
+        """Move the sessions ``ring`` assigns elsewhere off ``sources`` onto their new owners"""
+        start = time.perf_counter()
+        payload = {'workers': ring.nodes, 'virtual_nodes': ring.virtual_nodes}
+        moved = {}
+        for worker in sources:
+            released = self._call(worker, 'POST', '/_router/release', payload)['sessions']
+            worker.stats['sessions_released'] += len(released)
+            for session_id, state in released.items():
+                moved.setdefault(ring.node_for(session_id), {})[session_id] = state
+        for name, sessions in moved.items():
+            self._call(self.workers[name], 'POST', '/_router/adopt', {'sessions': sessions})
+            self.workers[name].stats['sessions_received'] += len(sessions)
+        self.stats['rebalances'] += 1
+        self.stats['last_rebalance_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return sum(len(sessions) for sessions in moved.values())
+
+    def add_worker(self):
+        """Start a worker and hand it the sessions on its arcs of the ring; returns its name"""
+        name = f'worker-{next(self._names)}'
+        worker = self._spawn(name)
+        with self._paused():
+            self.workers[name] = worker
+            ring = HashRing(self.ring.nodes + [name], self.virtual_nodes)
+            sources = [w for w in self.workers.values() if w.name != name]
+            self._rebalance(ring, sources)
+            self.ring = ring
+        return name
+
+    def remove_worker(self, name):
+        """Hand a worker's sessions to the remaining workers and stop it"""
+        worker = self.workers[name]
+        if len(self.workers) == 1:
+            raise ValueError('cannot remove the last worker')
+        with self._paused():
+            ring = HashRing([node for node in self.ring.nodes if node != name], self.virtual_nodes)
+            if worker.alive:
+                self._rebalance(ring, [worker])
+            self.ring = ring
+            del self.workers[name]
+        worker.process.terminate()
+        worker.process.wait()
+
+    def stop(self):
+        for worker in list(self.workers.values()):
+            if worker.alive:
+                worker.process.terminate()
+        for worker in list(self.workers.values()):
+            worker.process.wait()
+
+    def get_stats(self):
+        """Per-worker load and session distribution"""
+        total_requests = self.stats['requests'] or 1
+        workers = {}
+        for name in self.ring.nodes:
+            worker = self.workers[name]
+            stats = dict(worker.stats)
+            stats['port'] = worker.port
+            stats['alive'] = worker.alive
+            stats['share_of_requests'] = round(worker.stats['requests'] / total_requests, 4)
+            stats['avg_latency_ms'] = (round(worker.stats['seconds_total'] / worker.stats['requests'] * 1000, 3)
+                                       if worker.stats['requests'] else 0.0)
+            try:
+                stats.update(self._call(worker, 'GET', '/_router/stats'))
+            except (RuntimeError, OSError, http.client.HTTPException, ValueError):
+                stats['sessions'] = None
+            workers[name] = stats
+        sessions = [stats['sessions'] for stats in workers.values() if stats.get('sessions') is not None]
+        mean = sum(sessions) / len(sessions) if sessions else 0
+        return {
+            **self.stats,
+            'workers': workers,
+            'virtual_nodes': self.virtual_nodes,
+            'sessions': sum(sessions),
+            # 1.0 is a perfectly even spread
+            'session_imbalance': round(max(sessions) / mean, 3) if mean else 0.0,
+        }
+
+
+class _Relay:
+    """Response body relaying a worker's event stream chunk by chunk"""
+
+    def __init__(self, pool, worker, response, start, failed):
+        self.pool = pool
+        self.worker = worker
+        self.response = response
+        self.start = start
+        self.failed = failed
+        self.complete = False
+        self.closed = False
+
+    def __iter__(self):
+        while True:
+            chunk = self.response.read1(65536)
+            if not chunk:
+                break
+            yield chunk
+        self.complete = True
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if not self.complete:
+            # Abandoned mid-stream: the connection still holds unread data
+            self.response.close()
+            self.pool._connection(self.worker).close()
+        self.pool._finish(self.worker, self.start, self.failed)
+
+
+# POST routes naming their session in the JSON body
+SESSION_BODY_ROUTES = ('/chat', '/chat/stream', '/chat/batch', '/long_conversation', '/admin/sessions/import')
+
+
+def session_id_for(flask_request):
+    """Session a request belongs to, or None for session-less routes"""
+    session_id = flask_request.headers.get(SESSION_HEADER)
+    if session_id:
+        return session_id
+    if flask_request.path.startswith('/conversation_summary/'):
+        return flask_request.path[len('/conversation_summary/'):]
+    if flask_request.path in SESSION_BODY_ROUTES and flask_request.method == 'POST':
+        data = flask_request.get_json(silent=True)
+        if isinstance(data, dict):
+            # /chat falls back to the 'default' session, like the app does
+            return data.get('session_id', None if flask_request.path == '/long_conversation' else 'default')
+    return None
+
+
+def create_router_app(pool):
+    """Front app: /admin/router plus a proxy for everything else"""
+    from admin import admin_required
+
+    router = Flask(__name__)
+
+    @router.route('/admin/router', methods=['GET'])
+    @admin_required
+    def router_stats():
+        return jsonify(pool.get_stats())
+
+    @router.route('/admin/router/workers', methods=['POST'])
+    @admin_required
+    def router_add_worker():
+        return jsonify({'added': pool.add_worker(), 'workers': pool.ring.nodes})
+
+    @router.route('/admin/router/workers/<name>', methods=['DELETE'])
+    @admin_required
+    def router_remove_worker(name):
+        if name not in pool.workers:
+            return jsonify({'error': 'Not found'}), 404
+        try:
+            pool.remove_worker(name)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'removed': name, 'workers': pool.ring.nodes})
+
+    @router.route('/', defaults={'path': ''}, methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
+    @router.route('/<path:path>', methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
+    def proxy(path):
+        session_id = session_id_for(request)
+        if session_id is not None and not isinstance(session_id, str):
+            return jsonify({'error': 'session_id must be a string'}), 400
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in HOP_BY_HOP}
+        try:
+            status, response_headers, body = pool.forward(
+                session_id, request.method, request.full_path if request.query_string else request.path,
+                request.get_data(), headers)
+        except (http.client.HTTPException, OSError):
+            return jsonify({'error': 'Worker unavailable'}), 502
+        return Response(body, status=status,
+                        headers=[(name, value) for name, value in response_headers if name.lower() not in HOP_BY_HOP])
+
+    return router
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Session-affinity router over local app workers')
+    parser.add_argument('--workers', type=int, default=Config.ROUTER_WORKERS or os.cpu_count() or 2,
+                        help='worker processes (default: ROUTER_WORKERS or one per core)')
+    parser.add_argument('--host', default=Config.HOST)
+    parser.add_argument('--port', type=int, default=Config.PORT)
+    parser.add_argument('--app', default='app:app', help='WSGI app each worker serves')
+    args = parser.parse_args(argv)
+
+    pool = WorkerPool(args.workers, args.app).start()
+    print(f"Routing sessions across {len(pool.workers)} workers on http://{args.host}:{args.port}")
+    create_router_app(pool).run(host=args.host, port=args.port, threaded=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
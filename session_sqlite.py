@@ -0,0 +1,336 @@
+# SentimentBot Pro - SQLite session backend
+#
+# One WAL-mode database shared by every worker process on the host, so all
+# workers see the same session. Each thread reuses its own connection. A /chat
+# message is one short write transaction: an insert into `messages`,
+# INSERT OR IGNORE into `session_topics` and an upsert of the per-session
+# aggregate row in `sessions`, which carries the running sentiment aggregates.
+# Messages older than the MAX_CONVERSATION_MEMORY window are pruned in the same
+# transaction, so loading a session costs the same however long it has run.
+# Each worker keeps a small LRU cache of materialized contexts. The aggregate
+# row's version is the id of the session's latest message; ids are never
+# reused, so a cached context is reloaded whenever another worker has written
+# to the session since, including when it was deleted, swept or re-imported and
+# has grown back to the same length.
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from config import Config
+from conversation_stats import MessageStats, SentimentStats
+from message_history import MessageHistory, MessageRecord
+from session_store import SessionStore, SweepingStore, append_record
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    conversation_length INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_activity REAL NOT NULL,
+    version INTEGER NOT NULL,
+    sentiment_state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    sentiment_score REAL,
+    topics TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id);
+CREATE TABLE IF NOT EXISTS session_topics (
+    session_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (session_id, topic)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_last_activity ON sessions (last_activity);
+"""
+
+
+def connect(path, busy_timeout_ms=5000):
+    """Autocommit connection in WAL mode, safe to share between processes"""
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+    return conn
+
+
+def _split_topics(value):
+    return tuple(value.split(',')) if value else ()
+
+
+class SQLiteSessionStore(SweepingStore):
+    """Session store backed by a SQLite database in WAL mode"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path, max_cached=Config.MAX_SESSIONS,
+                 idle_timeout=Config.SESSION_TIMEOUT_MINUTES * 60,
+                 sweep_interval=Config.SESSION_SWEEP_INTERVAL_SECONDS,
+                 max_messages=Config.MAX_CONVERSATION_MEMORY, busy_timeout_ms=5000):
+        super().__init__(idle_timeout, sweep_interval)
+        self.path = path
+        self.max_messages = max_messages
+        self.busy_timeout_ms = busy_timeout_ms
+        # Materialized contexts resident in this worker
+        self.cache = SessionStore(max_sessions=max_cached, idle_timeout=0)
+        self._local = threading.local()
+        self.stats = {
+            'created': 0,
+            'hits': 0,
+            'misses': 0,
+            'reloads': 0,
+            'evicted_idle': 0,
+        }
+        self._connection().executescript(SCHEMA)
+
+    @property
+    def max_sessions(self):
+        return self.cache.max_sessions
+
+    @max_sessions.setter
+    def max_sessions(self, value):
+        self.cache.max_sessions = value
+
+    def _connection(self):
+        # One connection per thread, reopened after fork
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.pid != os.getpid():
+            conn = connect(self.path, self.busy_timeout_ms)
+            local.conn = conn
+            local.pid = os.getpid()
+        return conn
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def __contains__(self, session_id):
+        row = self._connection().execute(
+            'SELECT 1 FROM sessions WHERE session_id = ?', (session_id,)).fetchone()
+        return row is not None
+
+    def _version(self, conn, session_id):
+        return conn.execute(
+            'SELECT conversation_length, created_at, last_activity, version, sentiment_state '
+            'FROM sessions WHERE session_id = ?',
+            (session_id,)).fetchone()
+
+    def _load(self, conn, session_id, row):
+        length, created_at, last_activity, version, sentiment_state = row
+        context = {
+            'messages': MessageHistory(self.max_messages),
+            'topics': set(),
+            'sentiment_history': SentimentStats.from_state(json.loads(sentiment_state)),
+            'message_stats': MessageStats(),
+            'conversation_length': length,
+            'last_activity': datetime.fromtimestamp(last_activity),
+            'user_interests': set(),
+            'suggested_topics': [],
+            'version': version,
+            'created_at': created_at,
+            'derived': {}
+        }
+        recent = conn.execute(
+            'SELECT message, timestamp, topics FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?',
+            (session_id, self.max_messages)).fetchall()
+        for message, timestamp, topics in reversed(recent):
+            append_record(context, MessageRecord(message, timestamp, topics=_split_topics(topics)))
+        context['topics'] = {topic for (topic,) in conn.execute(
+            'SELECT topic FROM session_topics WHERE session_id = ?', (session_id,))}
+        self.stats['reloads'] += 1
+        self.cache.put(session_id, context)
+        return context
+
+    def _prune(self, conn, session_id):
+        # Only the latest max_messages are ever loaded; the aggregates cover the rest
+        conn.execute(
+            'DELETE FROM messages WHERE session_id = ? AND id <= '
+            '(SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)',
+            (session_id, session_id, self.max_messages))
+
+    def get(self, session_id, touch=True):
+        """Return the session or None; never creates a session
+
+        Reads do not write to the database, so ``touch`` only refreshes the
+        local cache and idleness is measured from the last message.
+        """
+        conn = self._connection()
+        row = self._version(conn, session_id)
+        if row is None:
+            self.stats['misses'] += 1
+            self.cache.delete(session_id)
+            return None
+        self.stats['hits'] += 1
+        with self.session_lock(session_id):
+            context = self.cache.get(session_id, touch=touch)
+            if context is not None and context['version'] == row[3]:
+                return context
+            return self._load(conn, session_id, row)
+
+    def record_message(self, session_id, text, topics=(), sentiment_score=None):
+        """Append one user message (and its topics and score) in a single transaction; returns the context"""
+        self._ensure_sweeper()
+        with self.session_lock(session_id):
+            conn = self._connection()
+            now = time.time()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                previous = self._version(conn, session_id)
+                sentiment = SentimentStats() if previous is None else SentimentStats.from_state(json.loads(previous[4]))
+                if sentiment_score is not None:
+                    sentiment.append(sentiment_score)
+                message_id = conn.execute(
+                    'INSERT INTO messages (session_id, message, timestamp, sentiment_score, topics) VALUES (?, ?, ?, ?, ?)',
+                    (session_id, text, now, sentiment_score, ','.join(topics))).lastrowid
+                if topics:
+                    conn.executemany(
+                        'INSERT OR IGNORE INTO session_topics (session_id, topic) VALUES (?, ?)',
+                        [(session_id, topic) for topic in topics])
+                conn.execute(
+                    'INSERT INTO sessions (session_id, conversation_length, created_at, last_activity, version, '
+                    'sentiment_state) VALUES (?, 1, ?, ?, ?, ?) ON CONFLICT (session_id) DO UPDATE SET '
+                    'conversation_length = conversation_length + 1, last_activity = excluded.last_activity, '
+                    'version = excluded.version, sentiment_state = excluded.sentiment_state',
+                    (session_id, now, now, message_id, json.dumps(sentiment.to_state())))
+                row = self._version(conn, session_id)
+                if row[0] > self.max_messages:
+                    self._prune(conn, session_id)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+            length = row[0]
+            if length == 1:
+                self.stats['created'] += 1
+            context = self.cache.get(session_id)
+            if context is None or previous is None or context['version'] != previous[3]:
+                # Another worker wrote in between (or nothing is cached): reload
+                return self._load(conn, session_id, row)
+
+            # Apply the same change to the cached copy instead of reloading it
+            append_record(context, MessageRecord(text, now, topics=tuple(topics)))
+            context['topics'].update(topics)
+            context['sentiment_history'] = sentiment
+            context['conversation_length'] = length
+            context['version'] = message_id
+            context['last_activity'] = datetime.fromtimestamp(now)
+            return context
+
+    def import_messages(self, session_id, entries):
+        """Replace a session with a transcript of (text, timestamp, topics, score) entries in one transaction"""
+        entries = list(entries)
+        self._ensure_sweeper()
+        with self.session_lock(session_id):
+            conn = self._connection()
+            # Idleness is measured from the import, not from the last historical message
+            now = time.time()
+            sentiment = SentimentStats()
+            for _, _, _, score in entries:
+                if score is not None:
+                    sentiment.append(score)
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+                conn.execute('DELETE FROM session_topics WHERE session_id = ?', (session_id,))
+                conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+                conn.executemany(
+                    'INSERT INTO messages (session_id, message, timestamp, sentiment_score, topics) VALUES (?, ?, ?, ?, ?)',
+                    [(session_id, text, timestamp, score, ','.join(topics))
+                     for text, timestamp, topics, score in entries[-self.max_messages:]])
+                conn.executemany(
+                    'INSERT OR IGNORE INTO session_topics (session_id, topic) VALUES (?, ?)',
+                    [(session_id, topic) for topic in {topic for _, _, topics, _ in entries for topic in topics}])
+                version = conn.execute('SELECT COALESCE(MAX(id), 0) FROM messages WHERE session_id = ?',
+                                       (session_id,)).fetchone()[0]
+                conn.execute(
+                    'INSERT INTO sessions (session_id, conversation_length, created_at, last_activity, version, '
+                    'sentiment_state) VALUES (?, ?, ?, ?, ?, ?)',
+                    (session_id, len(entries), entries[0][1] if entries else now, now, version,
+                     json.dumps(sentiment.to_state())))
+                row = self._version(conn, session_id)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            self.stats['created'] += 1
+            self.cache.delete(session_id)
+            return self._load(conn, session_id, row)
+
+    def delete(self, session_id):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+            conn.execute('DELETE FROM session_topics WHERE session_id = ?', (session_id,))
+            deleted = conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,)).rowcount
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self.cache.delete(session_id)
+        return deleted > 0
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM messages')
+            conn.execute('DELETE FROM session_topics')
+            conn.execute('DELETE FROM sessions')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self.cache.clear()
+
+    def keys(self):
+        return [session_id for (session_id,) in self._connection().execute('SELECT session_id FROM sessions')]
+
+    def values(self):
+        """Contexts resident in this worker's cache"""
+        return self.cache.values()
+
+    def items(self):
+        """(session_id, context) pairs resident in this worker's cache"""
+        return self.cache.items()
+
+    def message_count(self):
+        """Messages kept across all sessions (the latest max_messages of each)"""
+        return self._connection().execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+
+    def sweep(self, now=None):
+        """Delete every session idle for longer than the timeout; returns how many"""
+        if not self.idle_timeout:
+            return 0
+        now = time.time() if now is None else now
+        cutoff = now - self.idle_timeout
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            idle = 'SELECT session_id FROM sessions WHERE last_activity <= ?'
+            conn.execute(f'DELETE FROM messages WHERE session_id IN ({idle})', (cutoff,))
+            conn.execute(f'DELETE FROM session_topics WHERE session_id IN ({idle})', (cutoff,))
+            evicted = conn.execute('DELETE FROM sessions WHERE last_activity <= ?', (cutoff,)).rowcount
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self.stats['evicted_idle'] += evicted
+        return evicted
+
+    def get_stats(self):
+        """Database size, cache and eviction counters"""
+        stats = dict(self.stats)
+        stats['backend'] = self.backend
+        stats['path'] = self.path
+        stats['sessions'] = len(self)
+        stats['idle_timeout_seconds'] = self.idle_timeout
+        stats['cache'] = self.cache.get_stats()
+        return stats
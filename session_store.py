@@ -0,0 +1,459 @@
+# SentimentBot Pro - Bounded in-memory session store
+#
+# Sessions are kept in least-recently-used order. Creating a session beyond
+# MAX_SESSIONS evicts the least recently used one, and a background sweeper
+# drops sessions idle for longer than SESSION_TIMEOUT_MINUTES. Read paths
+# (get / __contains__) never create sessions.
+#
+# SESSION_BACKEND selects where sessions live: 'memory' (this module, one
+# store per worker process), 'sqlite' (session_sqlite.py, one database
+# shared by every worker on the host) or 'stateless' (session_token.py, a
+# signed token the client sends back with each message). All are mutated
+# only through record_message(), once per /chat.
+#
+# Under threaded workers each session is guarded by one of a fixed pool of
+# striped locks (session_lock()): a request holds its session's lock while it
+# records the message and reads the context back, so messages of one session
+# never interleave, while requests for other sessions run in parallel. The
+# store-wide lock only protects the session index itself.
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
+
+from config import Config
+from conversation_stats import MessageStats, SentimentStats
+from memory_stats import deep_sizeof
+from message_history import MessageHistory, MessageRecord
+
+BACKENDS = ('memory', 'sqlite', 'stateless')
+
+
+def new_conversation_context():
+    """Create the state tracked for a new conversation"""
+    return {
+        'messages': MessageHistory(Config.MAX_CONVERSATION_MEMORY),
+        'topics': set(),
+        'sentiment_history': SentimentStats(),
+        'message_stats': MessageStats(),
+        'conversation_length': 0,
+        'last_activity': datetime.now(),
+        'user_interests': set(),
+        'suggested_topics': [],
+        # Bumped on every mutation; results derived from the session are cached per version
+        'version': 0,
+        'created_at': time.time(),
+        'derived': {}
+    }
+
+
+# Read-only stand-in for unknown sessions, so read paths never create sessions
+EMPTY_CONTEXT = MappingProxyType({
+    'messages': (),
+    'topics': frozenset(),
+    'sentiment_history': SentimentStats(0),
+    'message_stats': MessageStats(),
+    'conversation_length': 0,
+    'last_activity': None,
+    'user_interests': frozenset(),
+    'suggested_topics': (),
+    'version': 0,
+    'created_at': 0.0,
+    'derived': None
+})
+
+
+def dump_context(context):
+    """Compact plain-data form of a session (journal snapshots and the cold tier)"""
+    return {
+        'c': context['created_at'],
+        'v': context['version'],
+        'n': context['conversation_length'],
+        'a': context['last_activity'].timestamp(),
+        't': sorted(context['topics']),
+        'm': [[record.message, record.timestamp, list(record.topics)] for record in context['messages']],
+        's': context['sentiment_history'].to_state(),
+    }
+
+
+def load_context(state, factory):
+    """Rebuild a session from dump_context() output"""
+    context = factory()
+    for message, timestamp, topics in state['m']:
+        append_record(context, MessageRecord(message, timestamp, topics=tuple(topics)))
+    context['created_at'] = state['c']
+    context['version'] = state['v']
+    context['conversation_length'] = state['n']
+    context['last_activity'] = datetime.fromtimestamp(state['a'])
+    context['topics'] = set(state['t'])
+    context['sentiment_history'] = SentimentStats.from_state(state['s'])
+    return context
+
+
+def append_record(context, record):
+    """Add a message to the history and keep the per-message aggregates in step"""
+    # The ring buffer keeps only the most recent MAX_CONVERSATION_MEMORY messages
+    evicted = context['messages'].append(record)
+    stats = context['message_stats']
+    stats.add(record)
+    if evicted is not None:
+        stats.remove(evicted)
+
+
+def apply_message(context, text, timestamp, topics=(), sentiment_score=None):
+    """Apply one user message to a context (live traffic and journal replay)"""
+    append_record(context, MessageRecord(text, timestamp, topics=tuple(topics)))
+    context['conversation_length'] += 1
+    context['last_activity'] = datetime.fromtimestamp(timestamp)
+    context['version'] += 1
+    context['topics'].update(topics)
+    if sentiment_score is not None:
+        context['sentiment_history'].append(sentiment_score)
+
+
+def build_context(entries, factory=new_conversation_context):
+    """Session built from a transcript of (text, timestamp, topics, score) entries, oldest first
+
+    The session counts as active from the time it is built.
+    """
+    context = factory()
+    for text, timestamp, topics, sentiment_score in entries:
+        if not context['conversation_length']:
+            context['created_at'] = timestamp
+        apply_message(context, text, timestamp, topics, sentiment_score)
+    context['last_activity'] = datetime.now()
+    return context
+
+
+class SessionLocks:
+    """Fixed pool of re-entrant locks striped by session id"""
+
+    __slots__ = ('_stripes',)
+
+    def __init__(self, stripes=Config.SESSION_LOCK_STRIPES):
+        self._stripes = tuple(threading.RLock() for _ in range(max(1, stripes)))
+
+    def __call__(self, session_id):
+        return self._stripes[hash(session_id) % len(self._stripes)]
+
+    def __len__(self):
+        return len(self._stripes)
+
+
+class SweepingStore:
+    """Background idle-session sweeper and per-session locks shared by the session backends"""
+
+    def __init__(self, idle_timeout, sweep_interval):
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._sweeper_pid = None
+        self.session_locks = SessionLocks()
+
+    def session_lock(self, session_id):
+        """Lock serializing work on one session; always taken before the store-wide lock"""
+        return self.session_locks(session_id)
+
+    def sweep(self, now=None):
+        raise NotImplementedError
+
+    def _ensure_sweeper(self):
+        # Threads do not survive fork, so each worker process starts its own sweeper
+        if self._sweeper_pid == os.getpid() or not self.idle_timeout or not self.sweep_interval:
+            return
+        with self._lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+        thread = threading.Thread(target=self._sweep_forever, name='session-sweeper', daemon=True)
+        thread.start()
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            self.sweep()
+
+
+class SessionStore(SweepingStore):
+    """Thread-safe LRU session store with idle-timeout eviction
+
+    With a cold tier attached, sessions idle for ``spill_after`` seconds are
+    moved to disk by the sweeper and rehydrated on their next access.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, factory=new_conversation_context, max_sessions=Config.MAX_SESSIONS,
+                 idle_timeout=Config.SESSION_TIMEOUT_MINUTES * 60,
+                 sweep_interval=Config.SESSION_SWEEP_INTERVAL_SECONDS,
+                 spill_after=Config.SESSION_SPILL_AFTER_SECONDS):
+        super().__init__(idle_timeout, sweep_interval)
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.spill_after = spill_after
+        self._sessions = OrderedDict()
+        self._last_access = {}
+        # Optional SessionJournal making the store survive restarts
+        self.journal = None
+        # Optional ColdSessionTier holding spilled idle sessions
+        self.cold = None
+        self.stats = {
+            'created': 0,
+            'hits': 0,
+            'misses': 0,
+            'evicted_lru': 0,
+            'evicted_idle': 0,
+        }
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions or (self.cold is not None and session_id in self.cold)
+
+    def get(self, session_id, touch=True):
+        """Return the session or None; never creates a session"""
+        if self.cold is not None and session_id not in self._sessions:
+            self._rehydrate(session_id)
+        with self._lock:
+            context = self._sessions.get(session_id)
+            if context is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            if touch:
+                self._sessions.move_to_end(session_id)
+                self._last_access[session_id] = time.monotonic()
+            return context
+
+    def get_or_create(self, session_id):
+        """Return the session, creating it (and evicting the LRU one if full) when missing"""
+        self._ensure_sweeper()
+        if self.cold is not None and session_id not in self._sessions:
+            self._rehydrate(session_id)
+        with self._lock:
+            return self._get_or_create_locked(session_id)
+
+    def _get_or_create_locked(self, session_id):
+        now = time.monotonic()
+        context = self._sessions.get(session_id)
+        if context is not None:
+            self.stats['hits'] += 1
+            self._sessions.move_to_end(session_id)
+            self._last_access[session_id] = now
+            return context
+
+        self.stats['misses'] += 1
+        context = self.factory()
+        self._insert(session_id, context, now)
+        self.stats['created'] += 1
+        return context
+
+    def _insert(self, session_id, context, now):
+        while self.max_sessions and len(self._sessions) >= self.max_sessions:
+            evicted_id, _ = self._sessions.popitem(last=False)
+            del self._last_access[evicted_id]
+            self.stats['evicted_lru'] += 1
+            if self.journal is not None:
+                self.journal.delete(evicted_id)
+        self._sessions[session_id] = context
+        self._last_access[session_id] = now
+
+    def put(self, session_id, context, idle_seconds=0):
+        """Store ``context`` as the most recently used session, replacing any previous one"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._last_access.pop(session_id, None)
+            self._insert(session_id, context, time.monotonic() - idle_seconds)
+
+    def record_message(self, session_id, text, topics=(), sentiment_score=None):
+        """Append one user message (and its topics and score) to a session; returns the context"""
+        self._ensure_sweeper()
+        with self.session_lock(session_id):
+            if self.cold is not None and session_id not in self._sessions:
+                self._rehydrate(session_id)
+            now = time.time()
+            with self._lock:
+                context = self._get_or_create_locked(session_id)
+            # Only this session's stripe is held while the context changes
+            apply_message(context, text, now, topics, sentiment_score)
+            if self.journal is not None:
+                # Only queues the entry; the journal writes it from its own thread
+                self.journal.append(session_id, context, text, now, topics, sentiment_score)
+        return context
+
+    def import_messages(self, session_id, entries):
+        """Replace a session with a transcript of (text, timestamp, topics, score) entries; returns the context"""
+        self._ensure_sweeper()
+        with self.session_lock(session_id):
+            if self.cold is not None:
+                self.cold.discard(session_id)
+            context = build_context(entries, self.factory)
+            self.put(session_id, context)
+            if self.journal is not None:
+                # One record with the whole session, so a restart keeps the import time as its activity
+                self.journal.put(session_id, context)
+        self.stats['created'] += 1
+        return context
+
+    def _rehydrate(self, session_id):
+        # Under the session's lock, so concurrent requests cannot both miss the cold copy
+        with self.session_lock(session_id):
+            if session_id in self._sessions:
+                return
+            start = time.perf_counter()
+            state = self.cold.take(session_id)
+            if state is None:
+                return
+            context = load_context(state, self.factory)
+            with self._lock:
+                self._insert(session_id, context, time.monotonic())
+            self.cold.record_rehydrate(time.perf_counter() - start)
+
+    def spill(self, now=None):
+        """Move sessions idle for longer than ``spill_after`` to the cold tier; returns how many"""
+        if self.cold is None or not self.spill_after:
+            return 0
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.spill_after
+        with self._lock:
+            candidates = []
+            # LRU order means idle sessions are at the front
+            for session_id in self._sessions:
+                if self._last_access[session_id] > cutoff:
+                    break
+                candidates.append(session_id)
+
+        spilled = 0
+        for session_id in candidates:
+            start = time.perf_counter()
+            with self.session_lock(session_id):
+                with self._lock:
+                    context = self._sessions.get(session_id)
+                    if context is None or self._last_access[session_id] > cutoff:
+                        continue
+                version = context['version']
+                state = dump_context(context)
+                ram_bytes = deep_sizeof(context)
+            # Disk write happens outside the locks
+            self.cold.put(session_id, state, ram_bytes)
+            with self.session_lock(session_id), self._lock:
+                unchanged = (self._sessions.get(session_id) is context and context['version'] == version
+                             and self._last_access[session_id] <= cutoff)
+                if unchanged:
+                    del self._sessions[session_id]
+                    del self._last_access[session_id]
+            if unchanged:
+                spilled += 1
+                self.cold.record_spill(time.perf_counter() - start)
+            else:
+                # Used again while being written out: keep it hot
+                self.cold.discard(session_id)
+        return spilled
+
+    def export_sessions(self, serialize):
+        """Yield (session_id, serialize(context)) for every session, locking one session at a time"""
+        for session_id in self.keys():
+            with self.session_lock(session_id):
+                with self._lock:
+                    context = self._sessions.get(session_id)
+                if context is None:
+                    continue
+                state = serialize(context)
+            yield session_id, state
+
+    def message_count(self):
+        """Messages currently held across all sessions"""
+        return sum(len(context['messages']) for context in self.values())
+
+    def delete(self, session_id):
+        if self.cold is not None:
+            self.cold.discard(session_id)
+        if self.journal is not None:
+            self.journal.delete(session_id)
+        with self._lock:
+            self._last_access.pop(session_id, None)
+            return self._sessions.pop(session_id, None) is not None
+
+    def clear(self):
+        if self.cold is not None:
+            self.cold.clear()
+        if self.journal is not None:
+            self.journal.clear()
+        with self._lock:
+            self._sessions.clear()
+            self._last_access.clear()
+
+    def keys(self):
+        with self._lock:
+            return list(self._sessions.keys())
+
+    def values(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def items(self):
+        with self._lock:
+            return list(self._sessions.items())
+
+    def sweep(self, now=None):
+        """Spill idle sessions to the cold tier (if any) and evict every session
+        idle for longer than the timeout; returns how many were evicted"""
+        now = time.monotonic() if now is None else now
+        if self.cold is not None:
+            self.spill(now)
+            self.cold.sweep()
+        if not self.idle_timeout:
+            return 0
+        cutoff = now - self.idle_timeout
+        evicted = 0
+        with self._lock:
+            # LRU order means idle sessions are at the front
+            while self._sessions:
+                session_id = next(iter(self._sessions))
+                if self._last_access[session_id] > cutoff:
+                    break
+                del self._sessions[session_id]
+                del self._last_access[session_id]
+                evicted += 1
+                if self.journal is not None:
+                    self.journal.delete(session_id)
+            self.stats['evicted_idle'] += evicted
+        return evicted
+
+    def get_stats(self):
+        """Size and eviction counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['sessions'] = len(self._sessions)
+        stats['backend'] = self.backend
+        stats['max_sessions'] = self.max_sessions
+        stats['idle_timeout_seconds'] = self.idle_timeout
+        if self.cold is not None:
+            stats['hot_sessions'] = stats['sessions']
+            stats['spill_after_seconds'] = self.spill_after
+            stats['cold'] = self.cold.get_stats()
+        return stats
+
+
+def create_session_store(backend=None):
+    """Session store for the configured SESSION_BACKEND"""
+    backend = backend or Config.SESSION_BACKEND
+    if backend == 'memory':
+        store = SessionStore()
+        if Config.SESSION_COLD_PATH:
+            from session_cold import ColdSessionTier
+            store.cold = ColdSessionTier(Config.SESSION_COLD_PATH)
+        if Config.SESSION_JOURNAL_DIR:
+            from session_journal import SessionJournal
+            SessionJournal(Config.SESSION_JOURNAL_DIR).attach(store)
+        return store
+    if backend == 'sqlite':
+        from session_sqlite import SQLiteSessionStore
+        return SQLiteSessionStore(Config.SESSION_DB_PATH)
+    if backend == 'stateless':
+        from session_token import StatelessSessionStore
+        return StatelessSessionStore()
+    raise ValueError(f"Unknown session backend '{backend}' (expected one of {', '.join(BACKENDS)})")
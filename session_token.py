@@ -0,0 +1,193 @@
+# SentimentBot Pro - Stateless sessions carried by the client
+#
+# With SESSION_BACKEND=stateless the server keeps nothing between requests.
+# Each /chat response carries `session_state`: the session's aggregates,
+# topics and most recent messages, JSON-encoded, zlib-compressed and signed
+# with SECRET_KEY. The client sends it back with the next message (in the
+# JSON body or the X-Session-State header) and the request rebuilds the
+# session from it. Tokens are bound to their session id, expire after
+# SESSION_TIMEOUT_MINUTES of inactivity and are kept under
+# SESSION_TOKEN_MAX_BYTES by dropping the oldest messages of the window.
+#
+# Without SECRET_KEY the store refuses the public default key and signs with a
+# random per-process key instead, so tokens cannot be forged but only work
+# against the instance that issued them.
+import base64
+import contextlib
+import hashlib
+import hmac
+import json
+import secrets
+import sys
+import time
+import zlib
+
+from flask import g, has_request_context, request
+
+from config import Config
+from session_store import apply_message, build_context, dump_context, load_context, new_conversation_context
+
+TOKEN_PREFIX = 'v1.'
+STATE_HEADER = 'X-Session-State'
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(body, secret):
+    return _b64encode(hmac.new(secret.encode('utf-8'), body.encode('ascii'), hashlib.sha256).digest())
+
+
+def encode_session(session_id, context, secret=None, max_bytes=Config.SESSION_TOKEN_MAX_BYTES,
+                   window=Config.SESSION_TOKEN_MESSAGES):
+    """Signed, compressed token holding ``context``; the message window shrinks until it fits"""
+    secret = secret or Config.SECRET_KEY
+    state = dump_context(context)
+    messages = state['m'][-window:] if window else []
+    while True:
+        state['m'] = messages
+        payload = json.dumps([session_id, state], separators=(',', ':')).encode('utf-8')
+        body = TOKEN_PREFIX + _b64encode(zlib.compress(payload, 9))
+        token = body + '.' + _sign(body, secret)
+        if len(token) <= max_bytes or not messages:
+            return token
+        messages = messages[1:]
+
+
+def decode_session(token, session_id, secret=None, factory=new_conversation_context,
+                   max_idle=Config.SESSION_TIMEOUT_MINUTES * 60, max_bytes=Config.SESSION_TOKEN_MAX_BYTES):
+    """Context from a token, or None if it is malformed, forged, expired or for another session"""
+    secret = secret or Config.SECRET_KEY
+    if not isinstance(token, str) or len(token) > max_bytes or not token.startswith(TOKEN_PREFIX):
+        return None
+    body, _, signature = token.rpartition('.')
+    if not hmac.compare_digest(signature, _sign(body, secret)):
+        return None
+    try:
+        token_session_id, state = json.loads(zlib.decompress(_b64decode(body[len(TOKEN_PREFIX):])))
+    except (ValueError, TypeError, zlib.error):
+        return None
+    if token_session_id != session_id:
+        return None
+    try:
+        if max_idle and time.time() - state['a'] > max_idle:
+            return None
+        return load_context(state, factory)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        # Correctly signed but not a session this code wrote
+        return None
+
+
+class StatelessSessionStore:
+    """Session store interface over the token sent with the current request"""
+
+    backend = 'stateless'
+
+    def __init__(self, factory=new_conversation_context, secret=None):
+        self.factory = factory
+        self.secret = secret or Config.SECRET_KEY
+        if self.secret == Config.DEFAULT_SECRET_KEY:
+            print("Warning: SECRET_KEY is not set; stateless session tokens are signed with a random "
+                  "per-process key and will not be accepted by other instances or after a restart",
+                  file=sys.stderr)
+            self.secret = secrets.token_urlsafe(32)
+        self.stats = {
+            'created': 0,
+            'restored': 0,
+            'rejected': 0,
+        }
+
+    def _token(self):
+        data = request.get_json(silent=True)
+        if isinstance(data, dict) and data.get('session_state'):
+            return data['session_state']
+        return request.headers.get(STATE_HEADER)
+
+    def _load(self, session_id):
+        # Decoded once per request and kept on flask.g
+        cached = g.get('_session_state')
+        if cached is not None and cached[0] == session_id:
+            return cached[1]
+        context = None
+        token = self._token()
+        if token:
+            context = decode_session(token, session_id, secret=self.secret, factory=self.factory)
+            self.stats['restored' if context is not None else 'rejected'] += 1
+        g._session_state = (session_id, context)
+        return context
+
+    def __len__(self):
+        return 0
+
+    def __contains__(self, session_id):
+        return has_request_context() and self._load(session_id) is not None
+
+    def get(self, session_id, touch=True):
+        """Return the session carried by this request or None; never creates a session"""
+        if not has_request_context():
+            return None
+        return self._load(session_id)
+
+    def get_or_create(self, session_id):
+        context = self._load(session_id)
+        if context is None:
+            context = self.factory()
+            g._session_state = (session_id, context)
+            self.stats['created'] += 1
+        return context
+
+    def record_message(self, session_id, text, topics=(), sentiment_score=None):
+        """Append one user message to the request's session; returns the context"""
+        context = self.get_or_create(session_id)
+        apply_message(context, text, time.time(), topics, sentiment_score)
+        return context
+
+    def import_messages(self, session_id, entries):
+        """Build the request's session from a transcript; client_state() then carries it"""
+        context = build_context(entries, self.factory)
+        g._session_state = (session_id, context)
+        self.stats['created'] += 1
+        return context
+
+    def session_lock(self, session_id):
+        # The session belongs to this request alone
+        return contextlib.nullcontext()
+
+    def client_state(self, session_id):
+        """Token to return to the client after this request"""
+        context = self.get(session_id)
+        return None if context is None else encode_session(session_id, context, secret=self.secret)
+
+    def delete(self, session_id):
+        g.pop('_session_state', None)
+        return False
+
+    def clear(self):
+        pass
+
+    def keys(self):
+        return []
+
+    def values(self):
+        return []
+
+    def items(self):
+        return []
+
+    def message_count(self):
+        return 0
+
+    def sweep(self, now=None):
+        return 0
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['backend'] = self.backend
+        stats['sessions'] = 0
+        stats['max_token_bytes'] = Config.SESSION_TOKEN_MAX_BYTES
+        return stats
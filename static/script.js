@@ -6,6 +6,9 @@ class SentimentBotPro {
         this.setupPanelToggles();
         this.updateStatus('Ready');
         this.sessionId = this.generateSessionId();
+        this.sessionState = null;
+        // Cleared when the server has no /chat/stream (e.g. the serverless build)
+        this.streamingSupported = true;
         this.conversationStartTime = new Date();
         this.messageCount = 0;
     }
@@ -120,6 +123,27 @@ class SentimentBotPro {
         return 'session_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
     }
 
+    generateIdempotencyKey() {
+        if (window.crypto && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        return 'msg_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+    }
+
+    async fetchWithRetry(url, options, retries = 2) {
+        for (let attempt = 0; ; attempt++) {
+            try {
+                return await fetch(url, options);
+            } catch (error) {
+                // Network failures and timeouts only; HTTP error statuses are returned as they are
+                if (attempt >= retries) {
+                    throw error;
+                }
+                await new Promise(resolve => setTimeout(resolve, 500 * (attempt + 1)));
+            }
+        }
+    }
+
     async sendMessage() {
         const message = this.userInput.value.trim();
         if (!message) return;
@@ -134,20 +158,33 @@ class SentimentBotPro {
         this.messageCount++;
 
         try {
-            const response = await fetch('/chat', {
+            // Render each part of the reply as soon as the server has it
+            if (this.streamingSupported && await this.streamMessage(message)) {
+                return;
+            }
+
+            // Retries reuse the key, so the server records the message only once
+            const response = await this.fetchWithRetry('/chat', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Idempotency-Key': this.generateIdempotencyKey()
                 },
                 body: JSON.stringify({
                     message: message,
-                    session_id: this.sessionId
+                    session_id: this.sessionId,
+                    session_state: this.sessionState
                 })
             });
 
             const data = await response.json();
 
             if (data.status === 'success') {
+                // Stateless deployments hand the session back to us; send it with the next message
+                if (data.session_state) {
+                    this.sessionState = data.session_state;
+                }
+
                 // Add bot response to chat
                 this.addMessageToChat(data.bot_response, 'bot');
                 
@@ -168,6 +205,80 @@ class SentimentBotPro {
         }
     }
 
+    async streamMessage(message) {
+        const response = await fetch('/chat/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                message: message,
+                session_id: this.sessionId,
+                session_state: this.sessionState
+            })
+        });
+
+        if (response.status === 404 || response.status === 405) {
+            this.streamingSupported = false;
+            return false;
+        }
+        if (!response.ok || !response.body) {
+            return false;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                this.handleStreamEvent(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+            }
+        }
+        return true;
+    }
+
+    handleStreamEvent(chunk) {
+        let event = 'message';
+        let payload = '';
+        for (const line of chunk.split('\n')) {
+            if (line.startsWith('event: ')) {
+                event = line.slice(7);
+            } else if (line.startsWith('data: ')) {
+                payload += line.slice(6);
+            }
+        }
+        const data = payload ? JSON.parse(payload) : {};
+
+        switch (event) {
+            case 'sentiment':
+                // Preliminary label from the cheap analyzers; refined by 'analysis'
+                this.scoreText.textContent = data.combined_score;
+                this.sentimentLabel.textContent = data.final_sentiment;
+                this.updateSentimentLabelColor(data.final_sentiment);
+                break;
+            case 'analysis':
+                this.updateSentimentAnalysis(data.sentiment_analysis);
+                break;
+            case 'response':
+                this.addMessageToChat(data.bot_response, 'bot');
+                break;
+            case 'done':
+                if (data.session_state) {
+                    this.sessionState = data.session_state;
+                }
+                this.updateConversationStats();
+                this.updateStatus('Ready');
+                break;
+            case 'error':
+                throw new Error(data.error || 'Unknown error occurred');
+        }
+    }
+
     addMessageToChat(message, sender) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${sender}-message`;
@@ -214,7 +325,8 @@ class SentimentBotPro {
     }
 
     updateProgressBar(progressElement, scoreElement, score) {
-        if (progressElement && scoreElement) {
+        // Not every engine profile reports every analyzer
+        if (progressElement && scoreElement && typeof score === 'number') {
             const percentage = Math.abs(score) * 100;
             progressElement.style.width = `${percentage}%`;
             scoreElement.textContent = score.toFixed(3);
@@ -283,6 +395,7 @@ class SentimentBotPro {
         this.messageCount = 0;
         this.conversationStartTime = new Date();
         this.sessionId = this.generateSessionId();
+        this.sessionState = null;
         
         // Clear chat messages except welcome message
         const welcomeMessage = this.chatMessages.querySelector('.welcome-message');
@@ -0,0 +1,144 @@
+# SentimentBot Pro - Fingerprinted static assets and a precompressed home page
+#
+# Every file under the static folder is read once at start-up, hashed and kept
+# in memory next to its gzip (and, when the optional `brotli` package is
+# installed, brotli) variant. url_for('static', ...) adds the content hash as
+# ?v=<hash>, so a deploy that changes a file changes its URL. Fingerprinted
+# URLs are served with an immutable one-year Cache-Control. Plain URLs get
+# no-cache so browsers revalidate. Every response carries a strong ETag and
+# If-None-Match is answered with 304.
+#
+# Views wrapped in @cached_page are rendered on their first request only. The
+# bytes and their compressed variants are then served as they are until the
+# process restarts, that is once per deploy.
+import functools
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response, abort, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+VERSION_ARG = 'v'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+# Not worth compressing below this size
+MIN_COMPRESS_BYTES = 256
+
+
+class PrecompressedBody:
+    """One representation of a resource with its compressed variants and strong ETags"""
+
+    __slots__ = ('digest', 'content_type', 'variants')
+
+    def __init__(self, data, content_type):
+        self.digest = hashlib.sha256(data).hexdigest()[:16]
+        self.content_type = content_type
+        # encoding -> (bytes, etag); identity is always present
+        self.variants = {'identity': (data, f'"{self.digest}"')}
+        if len(data) >= MIN_COMPRESS_BYTES:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                self.variants['gzip'] = (compressed, f'"{self.digest}-gz"')
+            if brotli is not None:
+                compressed = brotli.compress(data)
+                if len(compressed) < len(data):
+                    self.variants['br'] = (compressed, f'"{self.digest}-br"')
+
+    def negotiate(self, accept_encodings):
+        """Best variant the client accepts, as (encoding, bytes, etag)"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return (encoding,) + self.variants[encoding]
+        return ('identity',) + self.variants['identity']
+
+    def response(self, cache_control):
+        """Response for the current request, 304 when If-None-Match already names this content"""
+        encoding, data, etag = self.negotiate(request.accept_encodings)
+        # If-None-Match uses weak comparison; any variant of the same content matches
+        if any(request.if_none_match.contains_weak(tag.strip('"')) for _, tag in self.variants.values()):
+            response = Response(status=304)
+        else:
+            response = Response(data, content_type=self.content_type)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+
+class AssetManifest:
+    """In-memory copies of every file under a static folder, keyed by relative path"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.assets = {}
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+                content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                if content_type.startswith('text/') or content_type == 'application/javascript':
+                    content_type += '; charset=utf-8'
+                self.assets[filename] = PrecompressedBody(data, content_type)
+
+    def version(self, filename):
+        asset = self.assets.get(filename)
+        return None if asset is None else asset.digest
+
+    def get_stats(self):
+        return {
+            'assets': len(self.assets),
+            'bytes': sum(len(asset.variants['identity'][0]) for asset in self.assets.values()),
+            'encodings': sorted({encoding for asset in self.assets.values() for encoding in asset.variants}),
+        }
+
+
+def cached_page(view):
+    """Render an HTML view once and serve the stored bytes (with gzip/brotli variants) afterwards"""
+    page = None
+    lock = threading.Lock()
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        nonlocal page
+        if page is None:
+            with lock:
+                if page is None:
+                    page = PrecompressedBody(view(*args, **kwargs).encode('utf-8'), 'text/html; charset=utf-8')
+        # The HTML is revalidated on every visit; the assets it links to are not
+        return page.response(REVALIDATE)
+    return wrapper
+
+
+def init_app(app):
+    """Serve the app's static folder from memory and fingerprint url_for('static', ...)"""
+    manifest = AssetManifest(app.static_folder)
+
+    @app.url_defaults
+    def _fingerprint_static(endpoint, values):
+        if endpoint == 'static' and VERSION_ARG not in values:
+            version = manifest.version(values.get('filename'))
+            if version is not None:
+                values[VERSION_ARG] = version
+
+    def static(filename):
+        asset = manifest.assets.get(filename)
+        if asset is None:
+            abort(404)
+        immutable = request.args.get(VERSION_ARG) == asset.digest
+        return asset.response(IMMUTABLE if immutable else REVALIDATE)
+
+    # Replace Flask's file-system static view
+    app.view_functions['static'] = static
+    app.extensions['static_assets'] = manifest
+    return manifest
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for admission control and adaptive degradation.
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import admission
+from admission import AdmissionController, queue_delay
+
+
+def test_levels_step_down_with_load():
+    """Each threshold of the in-flight limit moves requests one level down"""
+    controller = AdmissionController(max_in_flight=4, max_queue_delay_ms=0)
+    levels = [admission.LEVELS[controller.admit()] for _ in range(5)]
+    assert levels == ['normal', 'normal', 'no_summary', 'lite', 'shed']
+    # Shed requests are never counted in flight
+    assert controller.in_flight == 4
+    for _ in range(4):
+        controller.release()
+    assert controller.admit() == admission.NORMAL
+
+    controller = AdmissionController(max_in_flight=0, max_queue_delay_ms=100)
+    assert controller.admit(delay=0.01) == admission.NORMAL
+    assert controller.admit(delay=0.08) == admission.LITE
+    assert controller.admit(delay=0.2) == admission.SHED
+
+
+def test_queue_delay_header_formats():
+    """nginx seconds, milliseconds and microseconds are all understood"""
+    now = 1700000000.5
+    assert abs(queue_delay('t=1700000000.25', now) - 0.25) < 1e-6
+    assert abs(queue_delay('1700000000250', now) - 0.25) < 1e-6
+    assert abs(queue_delay('1700000000250000', now) - 0.25) < 1e-6
+    assert queue_delay(None, now) is None and queue_delay('garbage', now) is None
+    assert queue_delay('t=1700000001', now) == 0.0
+
+
+def test_chat_degrades_then_sheds():
+    """/chat drops suggestions, then switches engine, then answers 503 with Retry-After"""
+    import app
+
+    client = app.app.test_client()
+    controller = admission.controller
+    saved = controller.max_in_flight, controller.in_flight
+    controller.max_in_flight = 4
+    try:
+        body = {'message': 'I love my job', 'session_id': 'admission-test'}
+        controller.in_flight = 0
+        response = client.post('/chat', json=body)
+        assert response.headers['X-Degradation-Level'] == 'normal'
+        assert 'suggestions' in response.get_json() and 'degradation_level' not in response.get_json()
+
+        controller.in_flight = 2
+        response = client.post('/chat', json=body)
+        data = response.get_json()
+        assert response.headers['X-Degradation-Level'] == 'no_summary'
+        assert 'suggestions' not in data and data['degradation_level'] == 'no_summary'
+        # The summary cached for the first message is served without recomputing it
+        assert data['conversation_summary']['total_messages'] == 1
+
+        controller.in_flight = 3
+        response = client.post('/chat', json=body)
+        assert response.headers['X-Degradation-Level'] == 'lite'
+        assert set(response.get_json()['sentiment_analysis']) >= set(app.lite_engine.analyzers)
+
+        controller.in_flight = 4
+        response = client.post('/chat', json=body)
+        assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+        assert client.get('/health').status_code == 200
+        assert controller.in_flight == 4
+    finally:
+        controller.max_in_flight, controller.in_flight = saved
+        app.conversation_contexts.delete('admission-test')
+
+
+def test_request_deadlines():
+    """A request whose budget ran out while queueing is shed; one spent mid-request degrades"""
+    import app
+
+    client = app.app.test_client()
+    body = {'message': 'Hello there', 'session_id': 'deadline-test'}
+    try:
+        headers = {'X-Request-Start': f't={time.time() - 2:.3f}', 'X-Request-Timeout-Ms': '1000'}
+        response = client.post('/chat', json=body, headers=headers)
+        assert response.status_code == 503 and 'deadline' in response.get_json()['error']
+
+        response = client.post('/chat', json=body, headers={'X-Request-Timeout-Ms': '0.001'})
+        assert response.status_code == 200
+        assert response.get_json()['degradation_level'] == 'lite'
+
+        response = client.post('/chat', json=body, headers={'X-Request-Timeout-Ms': '10000'})
+        assert response.headers['X-Degradation-Level'] == 'normal'
+    finally:
+        app.conversation_contexts.delete('deadline-test')
+
+
+if __name__ == "__main__":
+    test_levels_step_down_with_load()
+    test_queue_delay_header_formats()
+    test_chat_degrades_then_sheds()
+    test_request_deadlines()
+    print("✅ Admission control tests passed")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark tooling (corpus generation and regression checks).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.common import compare_results, measure, percentile, report_comparison
+from benchmarks.corpus import make_corpus
+
+
+def test_corpus_is_reproducible():
+    """The same seed always yields the same corpus"""
+    assert make_corpus(20, 'medium', seed=7) == make_corpus(20, 'medium', seed=7)
+    assert make_corpus(20, 'medium', seed=7) != make_corpus(20, 'medium', seed=8)
+    assert len(make_corpus(5, 'long')[0].split()) >= 200
+
+
+def test_measure_and_percentile():
+    """measure() reports per-call statistics for every call"""
+    stats = measure(len, ['a', 'bb', 'ccc'], rounds=2, warmup=0)
+    assert stats['calls'] == 6
+    assert stats['p50_us'] <= stats['p99_us']
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 100) == 4
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    """Only slowdowns beyond the allowed percentage are reported"""
+    baseline = {'benchmarks': {'fast': {'p50_us': 10.0}, 'slow': {'p50_us': 10.0}}}
+    current = {'benchmarks': {'fast': {'p50_us': 11.0}, 'slow': {'p50_us': 15.0}, 'new': {'p50_us': 1.0}}}
+    regressions = compare_results(current, baseline, max_regression_pct=20)
+    assert [name for name, *_ in regressions] == ['slow']
+    assert compare_results(current, baseline, max_regression_pct=60) == []
+
+
+def test_missing_baseline_fails_the_gate():
+    """Comparing against a baseline that was never recorded is a failure, not a pass"""
+    import tempfile
+
+    current = {'benchmarks': {'fast': {'p50_us': 10.0}}}
+    with tempfile.TemporaryDirectory() as tmp:
+        assert report_comparison(current, os.path.join(tmp, 'engine-lite.json'), 20) == 1
+
+
+if __name__ == "__main__":
+    test_corpus_is_reproducible()
+    test_measure_and_percentile()
+    test_compare_flags_regressions_beyond_threshold()
+    test_missing_baseline_fails_the_gate()
+    print("✅ Benchmark tooling tests passed")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for submitting several queued messages through /chat/batch.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_batch_scoring_matches_single_analysis():
+    """analyze_batch gives the same results as analyze, message by message"""
+    from sentiment_engine import get_engine
+
+    engine = get_engine('lite')
+    texts = ['I love this!', 'This is terrible :(', 'The meeting is at noon', 'WOW great work!!!']
+    timings = []
+    assert engine.analyze_batch(texts, timer=lambda name, seconds: timings.append(name)) == \
+        [engine.analyze(text) for text in texts]
+    assert timings == list(engine.analyzers)
+
+
+def test_chat_batch_records_messages_in_order():
+    """Every message gets its own reply; the summary covers the whole batch"""
+    import app
+
+    client = app.app.test_client()
+    try:
+        messages = ['I love my job', {'message': 'My family is great'}, 'Coding all day']
+        data = client.post('/chat/batch', json={'messages': messages, 'session_id': 'batch-test'}).get_json()
+        assert [result['user_message'] for result in data['results']] == \
+            ['I love my job', 'My family is great', 'Coding all day']
+        assert all(result['bot_response'] for result in data['results'])
+        assert 'relationships' in data['results'][1]['detected_topics']
+        assert data['conversation_summary']['total_messages'] == 3
+        assert data['suggestions']
+        assert data['session_id'] == 'batch-test'
+
+        context = app.conversation_contexts.get('batch-test')
+        assert [record.message for record in context['messages']] == \
+            ['I love my job', 'My family is great', 'Coding all day']
+        assert context['conversation_length'] == 3
+
+        data = client.post('/chat', json={'message': 'One more', 'session_id': 'batch-test'}).get_json()
+        assert data['conversation_summary']['total_messages'] == 4
+
+        assert client.post('/chat/batch', json={'messages': []}).status_code == 400
+        response = client.post('/chat/batch', json={'messages': ['fine', '  '], 'session_id': 'batch-test'})
+        assert response.status_code == 400 and 'index 1' in response.get_json()['error']
+        too_many = ['hi'] * (app.Config.CHAT_BATCH_MAX_MESSAGES + 1)
+        assert client.post('/chat/batch', json={'messages': too_many}).status_code == 400
+        assert app.conversation_contexts.get('batch-test')['conversation_length'] == 4
+    finally:
+        app.conversation_contexts.delete('batch-test')
+
+
+if __name__ == "__main__":
+    test_batch_scoring_matches_single_analysis()
+    test_chat_batch_records_messages_in_order()
+    print("✅ Chat batch tests passed")
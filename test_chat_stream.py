@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the Server-Sent Events variant of /chat.
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_chat_stream_sends_events_in_order():
+    """The preliminary label comes first and the session is updated exactly once"""
+    import app
+
+    client = app.app.test_client()
+    try:
+        response = client.post('/chat/stream', json={'message': 'I love my job!', 'session_id': 'stream-test'})
+        assert response.mimetype == 'text/event-stream'
+        events = _events(response.get_data(as_text=True))
+        assert [name for name, _ in events] == ['sentiment', 'analysis', 'response', 'topics',
+                                                'suggestions', 'summary', 'done']
+        data = dict(events)
+        assert data['sentiment']['final_sentiment'] == data['analysis']['sentiment_analysis']['final_sentiment']
+        assert data['response']['bot_response']
+        assert 'work' in data['topics']['detected_topics']
+        assert data['summary']['conversation_summary']['total_messages'] == 1
+        assert data['done']['session_id'] == 'stream-test'
+
+        assert client.post('/chat/stream', json={'message': '  '}).status_code == 400
+        for body in ({}, {'message': 42}, {'message': ['hi']}, ['message'], 'message'):
+            assert client.post('/chat/stream', json=body).status_code == 400
+    finally:
+        app.conversation_contexts.delete('stream-test')
+
+
+def test_chat_stream_releases_session_lock_between_events():
+    """A client that stops reading mid-stream does not keep other requests off the session"""
+    import threading
+    import app
+
+    client = app.app.test_client()
+    try:
+        response = client.post('/chat/stream', json={'message': 'Hello there', 'session_id': 'stream-lock'},
+                               buffered=False)
+        chunks = iter(response.response)
+        while b'event: response' not in next(chunks):
+            pass
+
+        acquired = []
+        def other_request():
+            lock = app.conversation_contexts.session_lock('stream-lock')
+            if lock.acquire(timeout=1):
+                acquired.append(True)
+                lock.release()
+        thread = threading.Thread(target=other_request)
+        thread.start()
+        thread.join()
+        assert acquired == [True]
+
+        assert b'event: done' in b''.join(chunks)
+        response.close()
+    finally:
+        app.conversation_contexts.delete('stream-lock')
+
+
+if __name__ == "__main__":
+    test_chat_stream_sends_events_in_order()
+    test_chat_stream_releases_session_lock_between_events()
+    print("✅ Chat stream tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for running per-session conversation statistics.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from conversation_stats import MessageStats, SentimentStats
+
+
+def test_sentiment_aggregates():
+    """Count, mean, EWMA and sign counts are kept up to date"""
+    stats = SentimentStats(capacity=3, alpha=0.5)
+    for score in (1.0, -1.0, 0.0, 0.5):
+        stats.append(score)
+    assert stats.count == 4 and len(stats) == 4
+    assert stats.mean == 0.125
+    assert stats.ewma == 0.5 * 0.5 + 0.5 * (0.5 * 0.0 + 0.5 * (0.5 * -1.0 + 0.5 * 1.0))
+    assert (stats.positive, stats.negative) == (2, 1)
+    assert stats.last == 0.5
+
+
+def test_recent_ring_and_trend():
+    """Only the latest scores are kept and they drive the trend"""
+    stats = SentimentStats(capacity=5)
+    assert stats.trend() == "stable"
+    for score in (-0.5, -0.2, 0.3, 0.4, 0.6, 0.7):
+        stats.append(score)
+    assert stats.recent() == [-0.2, 0.3, 0.4, 0.6, 0.7]
+    assert stats.recent(2) == [0.6, 0.7]
+    assert stats.trend() == "improving"
+
+
+def test_message_stats_follow_history_window():
+    """Counters track exactly the messages the ring buffer retains"""
+    from session_store import SessionStore
+
+    store = SessionStore(max_sessions=10, idle_timeout=0)
+    texts = [('I love coding', {'technology'}), ('Work was long', {'work'}),
+             ('Coding at work', {'technology', 'work'}), ('Hello', set())]
+    # Past the history capacity, so old messages are evicted
+    for i in range(store.factory()['messages'].capacity + 13):
+        text, topics = texts[i % len(texts)]
+        context = store.record_message('s', text, topics)
+
+    stats = context['message_stats']
+    retained = list(context['messages'])
+    assert stats.count == len(retained)
+    assert stats.mean_length == sum(len(r.message) for r in retained) / len(retained)
+    for topic in ('technology', 'work'):
+        assert stats.frequency(topic) == sum(1 for r in retained if topic in r.topics)
+    assert stats.frequency('health') == 0
+
+
+def test_message_stats_remove():
+    """Removing the last message of a topic drops its counter"""
+    from message_history import MessageRecord
+
+    stats = MessageStats()
+    record = MessageRecord('hi', 0.0, topics=('work',))
+    stats.add(record)
+    stats.remove(record)
+    assert stats.topic_counts == {} and stats.count == 0 and stats.mean_length == 0.0
+
+
+if __name__ == "__main__":
+    test_sentiment_aggregates()
+    test_recent_ring_and_trend()
+    test_message_stats_follow_history_window()
+    test_message_stats_remove()
+    print("✅ Conversation stats tests passed")
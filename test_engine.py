@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared sentiment engine package and its runtime profiles.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from sentiment_engine import get_engine, PROFILES
+
+
+def test_lite_profile_results():
+    """The lite profile classifies obvious messages without NLTK"""
+    engine = get_engine('lite')
+    assert engine.profile == 'lite'
+
+    positive = engine.analyze("I'm feeling great today!! 😊")
+    assert positive['final_sentiment'] == 'positive'
+    for name in ('keyword_based', 'rule_based', 'emoticon_based', 'punctuation_based'):
+        assert name in positive
+
+    negative = engine.analyze("this is terrible and i am so sad :(")
+    assert negative['final_sentiment'] == 'negative'
+    assert negative['confidence'] == abs(negative['combined_score'])
+
+
+def test_engine_reads_config_topics():
+    """Topic detection uses Config.TOPIC_KEYWORDS for every profile"""
+    engine = get_engine('lite')
+    assert engine.topic_keywords is Config.TOPIC_KEYWORDS
+    topics = engine.detect_topics("My doctor says I need more exercise before my trip")
+    assert {'health', 'travel'} <= topics
+
+
+def test_profiles_are_cached_and_validated():
+    """Engines are built once per profile and unknown profiles are rejected"""
+    assert get_engine('lite') is get_engine('LITE')
+    # 'full' always resolves, falling back to lite when NLTK data is missing
+    assert get_engine('full').profile in PROFILES
+
+    try:
+        get_engine('turbo')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown profile should raise ValueError")
+
+
+def test_quick_analyze_scores_are_reused():
+    """The preliminary label comes from the cheap analyzers, which analyze() does not rerun"""
+    engine = get_engine('lite')
+    text = "I love this so much!! :)"
+    preliminary, scores = engine.quick_analyze(text)
+    assert set(scores) == set(engine.QUICK_ANALYZERS)
+    ran = []
+    result = engine.analyze(text, timer=lambda name, seconds: ran.append(name), scores=scores)
+    assert ran == [name for name in engine.analyzers if name not in scores]
+    # Lite analyzers are all cheap, so the preliminary result is already final
+    assert preliminary['final_sentiment'] == result['final_sentiment']
+    assert preliminary['combined_score'] == result['combined_score'] == engine.analyze(text)['combined_score']
+
+
+if __name__ == "__main__":
+    test_lite_profile_results()
+    test_engine_reads_config_topics()
+    test_profiles_are_cached_and_validated()
+    test_quick_analyze_scores_are_reused()
+    print("✅ Engine tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for Idempotency-Key handling on retried requests.
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from idempotency import IdempotencyCache
+
+
+def test_cache_expires_and_evicts():
+    """Entries expire after the TTL and the oldest are evicted beyond the bound"""
+    cache = IdempotencyCache(max_entries=2, ttl=60)
+    for key in ('a', 'b', 'c'):
+        assert cache.begin(key, 'body', timeout=1) == ('run', None)
+        cache.finish(key, 200, 'application/json', key.encode())
+    assert len(cache) == 2 and cache.stats['evicted'] == 1
+    assert cache.begin('a', 'body', timeout=1)[0] == 'run'
+    cache.finish('a')
+    assert cache.begin('c', 'body', timeout=1)[1][4] == b'c'
+    assert cache.begin('c', 'other body', timeout=1)[0] == 'conflict'
+
+    cache.ttl = -1
+    assert cache.begin('d', 'body', timeout=1)[0] == 'run'
+    cache.finish('d', 200, 'application/json', b'd')
+    assert cache.begin('d', 'body', timeout=1)[0] == 'run'
+    assert cache.stats['expired'] == 1
+
+
+def test_concurrent_duplicate_waits_for_original():
+    """A duplicate arriving mid-request gets the original's response once it is done"""
+    cache = IdempotencyCache()
+    assert cache.begin('k', 'body', timeout=1)[0] == 'run'
+    outcomes = []
+    waiter = threading.Thread(target=lambda: outcomes.append(cache.begin('k', 'body', timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    assert not outcomes
+    cache.finish('k', 200, 'application/json', b'done')
+    waiter.join()
+    assert outcomes[0][0] == 'replay' and outcomes[0][1][4] == b'done'
+    assert cache.begin('x', 'body', timeout=1)[0] == 'run'
+    assert cache.begin('x', 'body', timeout=0.05) == ('busy', None)
+
+
+def test_retried_chat_is_recorded_once():
+    """A retried /chat returns the stored response and leaves the session untouched"""
+    import app
+
+    client = app.app.test_client()
+    try:
+        body = {'message': 'I love my job', 'session_id': 'idempotency-test'}
+        headers = {'Idempotency-Key': 'retry-1'}
+        first = client.post('/chat', json=body, headers=headers)
+        retry = client.post('/chat', json=body, headers=headers)
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert retry.get_data() == first.get_data()
+        assert app.conversation_contexts.get('idempotency-test')['conversation_length'] == 1
+
+        assert client.post('/chat', json=dict(body, message='Other'), headers=headers).status_code == 422
+        client.post('/chat', json=body, headers={'Idempotency-Key': 'retry-2'})
+        client.post('/chat', json=body)
+        assert app.conversation_contexts.get('idempotency-test')['conversation_length'] == 3
+
+        sentiment = client.post('/sentiment', json={'text': 'Great!'}, headers=headers)
+        assert 'Idempotent-Replayed' not in sentiment.headers
+    finally:
+        app.conversation_contexts.delete('idempotency-test')
+
+
+if __name__ == "__main__":
+    test_cache_expires_and_evicts()
+    test_concurrent_duplicate_waits_for_original()
+    test_retried_chat_is_recorded_once()
+    print("✅ Idempotency tests passed")
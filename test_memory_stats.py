@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for session store memory accounting and the /admin/memory endpoint.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from memory_stats import deep_sizeof, estimate_store_size
+
+
+def test_deep_sizeof_follows_containers():
+    """Nested containers are larger than their shell alone"""
+    nested = {'messages': [{'message': 'x' * 1000}], 'topics': {'work'}}
+    assert deep_sizeof(nested) > sys.getsizeof(nested) + 1000
+
+
+def test_estimate_extrapolates_from_sample():
+    """Sampling a subset of sessions still estimates the whole store"""
+    store = {f's{i}': {'messages': [f'message {i} {j}' for j in range(4)]} for i in range(50)}
+    estimate = estimate_store_size(store, lambda state: len(state['messages']), sample_size=10, seed=1)
+    assert estimate['sessions'] == 50
+    assert estimate['messages'] == 200
+    assert estimate['sampled_sessions'] == 10
+    assert abs(estimate['estimated_total_bytes'] - estimate['bytes_per_session'] * 50) < 50
+
+
+def test_admin_memory_requires_token():
+    """The memory view is hidden unless the admin token is sent"""
+    from config import Config
+    import app
+
+    client = app.app.test_client()
+    client.post('/chat', json={'message': 'I love my new job', 'session_id': 'memory_test'})
+
+    Config.ADMIN_TOKEN = 'secret'
+    try:
+        assert client.get('/admin/memory').status_code == 404
+        response = client.get('/admin/memory', headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 200
+        assert response.get_json()['session_store']['sessions'] >= 1
+    finally:
+        Config.ADMIN_TOKEN = ''
+
+
+if __name__ == "__main__":
+    test_deep_sizeof_follows_containers()
+    test_estimate_extrapolates_from_sample()
+    test_admin_memory_requires_token()
+    print("✅ Memory stats tests passed")
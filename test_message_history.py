@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the ring-buffer message history.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from message_history import MessageHistory, MessageRecord, MessageType
+
+
+def test_ring_keeps_most_recent():
+    """Appending past capacity drops the oldest messages"""
+    history = MessageHistory(3)
+    for i in range(5):
+        history.append(MessageRecord(f'message {i}', float(i)))
+    assert len(history) == 3
+    assert [record.message for record in history] == ['message 2', 'message 3', 'message 4']
+    assert history[0].message == 'message 2'
+    assert history[-1].message == 'message 4'
+    assert history[-3].timestamp == 2.0
+
+
+def test_index_out_of_range():
+    """Indexing past the stored messages raises IndexError"""
+    history = MessageHistory(3)
+    history.append(MessageRecord('only', 0.0))
+    for index in (1, -2):
+        try:
+            history[index]
+        except IndexError:
+            continue
+        raise AssertionError(f'index {index} should be out of range')
+
+
+def test_records_are_compact():
+    """Records use slots and default to the user type"""
+    record = MessageRecord('hello', 1700000000.0)
+    assert not hasattr(record, '__dict__')
+    assert record.type is MessageType.USER
+    assert record.created_at.year >= 2023
+
+
+if __name__ == "__main__":
+    test_ring_keeps_most_recent()
+    test_index_out_of_range()
+    test_records_are_compact()
+    print("✅ Message history tests passed")
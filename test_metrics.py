@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus-style /metrics endpoint.
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import MetricsRegistry
+
+
+def test_registry_merges_thread_shards():
+    """Observations from several threads are merged at scrape time"""
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    registry.describe('latency_seconds', 'histogram', 'Latency')
+
+    def work():
+        for _ in range(100):
+            registry.inc('hits_total', (('route', '/chat'),))
+            registry.observe('latency_seconds', 0.05)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert 'hits_total{route="/chat"} 400' in text
+    assert 'latency_seconds_bucket{le="0.01"} 0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 400' in text
+    assert 'latency_seconds_count 400' in text
+
+
+def test_shards_of_exited_threads_are_retired():
+    """Short-lived threads do not leave their shards behind, and their counts are kept"""
+    registry = MetricsRegistry()
+    for _ in range(200):
+        thread = threading.Thread(target=registry.inc, args=('hits_total',))
+        thread.start()
+        thread.join()
+    registry.inc('hits_total')
+    assert len(registry._shards) <= 2
+    assert 'hits_total 201' in registry.render()
+    assert len(registry._shards) == 1
+
+
+def test_threaded_server_keeps_shards_bounded():
+    """A thread-per-connection server keeps one shard per live thread"""
+    import urllib.request
+    from werkzeug.serving import make_server
+    import app
+    from metrics import registry
+
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+    try:
+        for _ in range(100):
+            urllib.request.urlopen(f'http://127.0.0.1:{server.server_port}/health').read()
+        urllib.request.urlopen(f'http://127.0.0.1:{server.server_port}/metrics').read()
+        assert len(registry._shards) <= threading.active_count()
+    finally:
+        server.shutdown()
+        serving.join()
+
+
+def test_metrics_endpoint_reports_routes_and_chat_stages():
+    """/metrics exposes per-route requests and per-stage /chat timings"""
+    import app
+
+    client = app.app.test_client()
+    client.post('/chat', json={'message': 'I feel great about my project!', 'session_id': 'metrics_test'})
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    text = response.get_data(as_text=True)
+    assert 'sentimentbot_http_requests_total{route="/chat",method="POST",status="200"}' in text
+    for stage in ('update_context', 'topic_detection', 'response_generation', 'suggestions', 'summary'):
+        assert f'stage="{stage}"' in text
+    for analyzer in app.engine.analyzers:
+        assert f'stage="sentiment_{analyzer}"' in text
+    assert 'sentimentbot_sessions ' in text
+
+
+if __name__ == "__main__":
+    test_registry_merges_thread_shards()
+    test_shards_of_exited_threads_are_retired()
+    test_threaded_server_keeps_shards_bounded()
+    test_metrics_endpoint_reports_routes_and_chat_stages()
+    print("✅ Metrics tests passed")
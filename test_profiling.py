@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for header-triggered per-request profiling.
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+
+def _client():
+    import app
+    return app.app.test_client()
+
+
+def test_profile_header_is_ignored_without_admin_token():
+    """Non-admin requests are served normally even with X-Profile"""
+    client = _client()
+    Config.ADMIN_TOKEN = 'secret'
+    try:
+        response = client.post('/sentiment', json={'text': 'great'}, headers={'X-Profile': 'cprofile'})
+        assert response.is_json
+        assert 'X-Profile-Duration-Ms' not in response.headers
+    finally:
+        Config.ADMIN_TOKEN = ''
+
+
+def test_inline_cprofile_and_sample():
+    """Admins get pstats text or collapsed stacks back inline"""
+    client = _client()
+    Config.ADMIN_TOKEN = 'secret'
+    try:
+        response = client.post('/chat', json={'message': 'I love coding', 'session_id': 'profile_test'},
+                               headers={**ADMIN, 'X-Profile': 'cprofile'})
+        assert response.headers['X-Profile-Original-Status'] == '200'
+        assert 'function calls' in response.get_data(as_text=True)
+
+        response = client.post('/sentiment', json={'text': 'great ' * 2000},
+                               headers={**ADMIN, 'X-Profile': 'sample'})
+        assert response.content_type.startswith('text/plain')
+        assert response.headers['X-Profile-Original-Status'] == '200'
+    finally:
+        Config.ADMIN_TOKEN = ''
+
+
+def test_profile_saved_to_directory():
+    """X-Profile-Output: file writes the profile and keeps the normal response"""
+    client = _client()
+    Config.ADMIN_TOKEN = 'secret'
+    previous_dir = Config.PROFILE_DIR
+    Config.PROFILE_DIR = tempfile.mkdtemp()
+    try:
+        response = client.get('/health', headers={**ADMIN, 'X-Profile': 'cprofile', 'X-Profile-Output': 'file'})
+        assert response.is_json
+        path = response.headers['X-Profile-File']
+        assert path.endswith('.prof') and os.path.exists(path)
+    finally:
+        Config.ADMIN_TOKEN = ''
+        Config.PROFILE_DIR = previous_dir
+
+
+if __name__ == "__main__":
+    test_profile_header_is_ignored_without_admin_token()
+    test_inline_cprofile_and_sample()
+    test_profile_saved_to_directory()
+    print("✅ Profiling tests passed")
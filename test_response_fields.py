@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for /chat field selection and response profiles.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from response_fields import requested_fields
+
+FIELDS = ('bot_response', 'final_sentiment', 'suggestions')
+PROFILES = {'full': frozenset(FIELDS), 'compact': frozenset(('bot_response',))}
+
+
+def test_requested_fields_parsing():
+    """fields (list or comma string, body or query) wins over profile; the default is 'full'"""
+    assert requested_fields({}, {}, FIELDS, PROFILES) == PROFILES['full']
+    assert requested_fields({'profile': 'compact'}, {}, FIELDS, PROFILES) == {'bot_response'}
+    assert requested_fields({'fields': ['final_sentiment']}, {'profile': 'compact'}, FIELDS, PROFILES) == {'final_sentiment'}
+    assert requested_fields(None, {'fields': 'bot_response, suggestions'}, FIELDS, PROFILES) == {'bot_response', 'suggestions'}
+    for bad in ({'fields': ['nope']}, {'profile': 'nope'}, {'fields': 7}):
+        try:
+            requested_fields(bad, {}, FIELDS, PROFILES)
+        except ValueError:
+            continue
+        raise AssertionError(f'{bad} was accepted')
+
+
+def test_chat_skips_unrequested_stages():
+    """A compact /chat returns only its fields and never runs the skipped stages"""
+    import app
+
+    calls = []
+    original = app.generate_topic_suggestions
+    app.generate_topic_suggestions = lambda *args: calls.append(args) or original(*args)
+    try:
+        client = app.app.test_client()
+        data = client.post('/chat', json={'message': 'I love my job', 'session_id': 'fields-test',
+                                          'fields': ['bot_response', 'final_sentiment']}).get_json()
+        assert set(data) == {'bot_response', 'final_sentiment'}
+        assert calls == []
+
+        data = client.post('/chat', json={'message': 'Still great', 'session_id': 'fields-test'}).get_json()
+        assert 'final_sentiment' not in data and 'suggestions' in data
+        # The skipped stages never skip the session update
+        assert data['conversation_summary']['total_messages'] == 2
+        assert len(calls) == 1
+
+        assert client.post('/chat?profile=nope', json={'message': 'hi'}).status_code == 400
+    finally:
+        app.generate_topic_suggestions = original
+        app.conversation_contexts.delete('fields-test')
+
+
+if __name__ == "__main__":
+    test_requested_fields_parsing()
+    test_chat_skips_unrequested_stages()
+    print("✅ Response field tests passed")
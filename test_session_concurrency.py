@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Stress tests for per-session locking under threaded workers.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from session_store import SessionLocks, SessionStore
+
+
+def _run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_messages_are_not_lost_or_interleaved():
+    """Threads writing to the same sessions never lose a message or see another's write"""
+    store = SessionStore(max_sessions=100, idle_timeout=0)
+    threads, sessions, messages = 8, 4, 200
+    errors = []
+
+    def worker(n):
+        for i in range(messages):
+            session_id = f's{i % sessions}'
+            text = f'{n}-{i}'
+            with store.session_lock(session_id):
+                context = store.record_message(session_id, text, (f'topic{n}',), 0.1)
+                # Nothing else may touch the session until the request is done with it
+                if context['messages'][-1].message != text or context['version'] != context['conversation_length']:
+                    errors.append((n, i))
+
+    _run_threads(threads, worker)
+    assert errors == []
+    for s in range(sessions):
+        context = store.get(f's{s}')
+        assert context['conversation_length'] == threads * messages // sessions
+        assert context['sentiment_history'].count == context['conversation_length']
+        stats = context['message_stats']
+        assert stats.count == len(context['messages'])
+        assert sum(stats.topic_counts.values()) == len(context['messages'])
+
+
+def test_sqlite_store_serializes_threads_per_session():
+    """Threads of one worker keep the cached SQLite context in step with the database"""
+    from session_sqlite import SQLiteSessionStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(os.path.join(tmp, 'sessions.db'), idle_timeout=0)
+        _run_threads(4, lambda n: [store.record_message('s', f'{n}-{i}', ('work',), 0.5) for i in range(50)])
+        context = store.get('s')
+        assert context['conversation_length'] == 200
+        assert context['sentiment_history'].count == 200
+        # Older messages are pruned; the aggregates above still count all of them
+        assert store.message_count() == store.max_messages
+
+
+def test_striped_locks_let_sessions_run_in_parallel():
+    """Requests for different sessions hold their locks at the same time; a single lock would serialize them"""
+    def overlaps(store, first, second, timeout):
+        # Both threads must be inside their critical sections at once to pass the barrier
+        barrier = threading.Barrier(2, timeout=timeout)
+        met = []
+
+        def worker(n):
+            session_id = (first, second)[n]
+            with store.session_lock(session_id):
+                store.record_message(session_id, 'hello', (), 0.0)
+                try:
+                    barrier.wait()
+                    met.append(n)
+                except threading.BrokenBarrierError:
+                    pass
+        _run_threads(2, worker)
+        return len(met) == 2
+
+    striped = SessionStore(max_sessions=100, idle_timeout=0)
+    first = 'session-0'
+    second = next(f'session-{i}' for i in range(1, 1000)
+                  if striped.session_locks(f'session-{i}') is not striped.session_locks(first))
+    assert overlaps(striped, first, second, timeout=10)
+
+    single = SessionStore(max_sessions=100, idle_timeout=0)
+    single.session_locks = SessionLocks(1)
+    # Can never pass, so a short wait is enough
+    assert not overlaps(single, first, second, timeout=0.5)
+
+
+if __name__ == "__main__":
+    test_concurrent_messages_are_not_lost_or_interleaved()
+    test_sqlite_store_serializes_threads_per_session()
+    test_striped_locks_let_sessions_run_in_parallel()
+    print("✅ Session concurrency tests passed")
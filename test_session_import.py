@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk session import from transcripts.
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from session_import import parse_transcript
+from session_sqlite import SQLiteSessionStore
+from session_store import SessionStore
+
+TRANSCRIPT = [
+    {'role': 'user', 'message': 'I love my new job', 'timestamp': '2024-03-01T09:00:00'},
+    {'role': 'bot', 'message': 'That is great to hear!'},
+    {'role': 'user', 'message': 'My family is visiting soon', 'timestamp': '2024-03-01T09:05:00'},
+    'Coding all day is tiring',
+]
+
+
+def test_parse_transcript():
+    """Only user messages are kept, in time order, and bad entries are named"""
+    messages, skipped = parse_transcript(TRANSCRIPT)
+    assert skipped == 1
+    assert [text for text, _ in messages] == ['I love my new job', 'My family is visiting soon',
+                                             'Coding all day is tiring']
+    # Messages without a timestamp inherit the previous one
+    assert messages[2][1] == messages[1][1] > messages[0][1]
+
+    out_of_range = [[{'message': 'hi', 'timestamp': value}] for value in (1e300, float('inf'), float('nan'), 10 ** 400)]
+    for bad in ([], ['fine', ''], [{'message': 'hi', 'timestamp': 'yesterday'}], [{'role': 'bot', 'message': 'hi'}],
+                *out_of_range):
+        try:
+            parse_transcript(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f'{bad!r} was accepted')
+
+
+def test_import_matches_live_messages():
+    """An imported session has the same aggregates as one fed message by message"""
+    entries = [(f'message {i}', 1700000000.0 + i, ('work',) if i % 3 else (), (i % 5 - 2) / 4) for i in range(120)]
+
+    live = SessionStore(idle_timeout=0)
+    for text, _, topics, score in entries:
+        live.record_message('live', text, topics, score)
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = [SessionStore(idle_timeout=0), SQLiteSessionStore(os.path.join(directory, 'sessions.db'), idle_timeout=0)]
+        for store in stores:
+            store.record_message('imported', 'replaced by the import')
+            context = store.import_messages('imported', entries)
+            assert store.get('imported') is not None
+            expected = live.get('live')
+            assert context['conversation_length'] == 120
+            assert context['created_at'] == 1700000000.0
+            assert context['topics'] == {'work'}
+            assert [record.message for record in context['messages']] == \
+                [record.message for record in expected['messages']]
+            assert len(context['messages']) == Config.MAX_CONVERSATION_MEMORY
+            assert context['sentiment_history'].to_state() == expected['sentiment_history'].to_state()
+
+
+def test_import_endpoint():
+    """Admins import a transcript in one call and get one summary back"""
+    import app
+
+    client = app.app.test_client()
+    token = Config.ADMIN_TOKEN
+    Config.ADMIN_TOKEN = 'secret'
+    try:
+        body = {'session_id': 'import-test', 'messages': TRANSCRIPT}
+        assert client.post('/admin/sessions/import', json=body).status_code == 404
+        data = client.post('/admin/sessions/import', json=body, headers={'X-Admin-Token': 'secret'}).get_json()
+        assert data['imported'] == 3 and data['skipped'] == 1
+        assert data['conversation_summary']['total_messages'] == 3
+        assert data['import_stats']['messages_per_second'] > 0
+
+        data = client.post('/chat', json={'message': 'Back again', 'session_id': 'import-test'}).get_json()
+        assert data['conversation_summary']['total_messages'] == 4
+
+        response = client.post('/admin/sessions/import', json={'session_id': 'import-test', 'messages': ['ok', 1]},
+                               headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 400 and 'index 1' in response.get_json()['error']
+    finally:
+        Config.ADMIN_TOKEN = token
+        app.conversation_contexts.delete('import-test')
+
+
+def test_import_scores_outside_the_session_lock():
+    """Other requests for the session are not blocked while a transcript is scored"""
+    import threading
+    from flask import Flask
+    from session_import import init_app
+
+    store = SessionStore(idle_timeout=0)
+    acquired = []
+
+    class Engine:
+        def analyze_batch(self, texts):
+            def other_request():
+                lock = store.session_lock('locked')
+                if lock.acquire(timeout=1):
+                    acquired.append(True)
+                    lock.release()
+            thread = threading.Thread(target=other_request)
+            thread.start()
+            thread.join()
+            return [{'combined_score': 0.5} for _ in texts]
+
+        def detect_topics(self, text):
+            return set()
+
+    app = Flask(__name__)
+    init_app(app, store, Engine(), lambda session_id: {'total_messages': len(store.get(session_id)['messages'])})
+    token = Config.ADMIN_TOKEN
+    Config.ADMIN_TOKEN = 'secret'
+    try:
+        response = app.test_client().post('/admin/sessions/import', headers={'X-Admin-Token': 'secret'},
+                                          json={'session_id': 'locked', 'messages': ['one', 'two']})
+    finally:
+        Config.ADMIN_TOKEN = token
+    assert acquired == [True]
+    assert response.get_json()['conversation_summary']['total_messages'] == 2
+
+
+if __name__ == "__main__":
+    test_parse_transcript()
+    test_import_matches_live_messages()
+    test_import_endpoint()
+    test_import_scores_outside_the_session_lock()
+    print("✅ Session import tests passed")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind session journal and warm restart.
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from session_journal import SessionJournal
+from session_store import SessionStore
+
+
+def _attached_store(directory):
+    store = SessionStore(max_sessions=100, idle_timeout=0)
+    SessionJournal(directory, flush_interval=0.01, snapshot_interval=0).attach(store)
+    return store
+
+
+def test_restart_replays_journal():
+    """A new store restored from the journal has the same sessions"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _attached_store(tmp)
+        store.record_message('s', 'I love my job', {'work'}, 0.8)
+        store.record_message('s', 'Coding all day', {'technology'}, 0.2)
+        store.journal.flush()
+
+        restored = _attached_store(tmp)
+        context = restored.get('s')
+        assert context['conversation_length'] == 2
+        assert context['version'] == 2
+        assert [r.message for r in context['messages']] == ['I love my job', 'Coding all day']
+        assert context['topics'] == {'work', 'technology'}
+        assert context['sentiment_history'].recent() == [0.8, 0.2]
+        assert context['message_stats'].frequency('work') == 1
+        assert restored.journal.restore_stats['entries_replayed'] == 2
+
+
+def test_snapshot_then_tail():
+    """Snapshot plus journal tail restores without applying an entry twice"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _attached_store(tmp)
+        store.record_message('s', 'first', (), 0.1)
+        store.record_message('other', 'hello', (), -0.3)
+        assert store.journal.snapshot() == 2
+        store.record_message('s', 'second', (), 0.5)
+        store.journal.flush()
+
+        restored = _attached_store(tmp)
+        context = restored.get('s')
+        assert [r.message for r in context['messages']] == ['first', 'second']
+        assert context['sentiment_history'].count == 2
+        assert restored.get('other')['sentiment_history'].last == -0.3
+        assert restored.journal.restore_stats['snapshot_sessions'] == 2
+        assert restored.journal.restore_stats['entries_replayed'] == 1
+
+
+def test_restart_keeps_imported_sessions():
+    """An imported transcript survives a restart as active, not idle since its last historical message"""
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _attached_store(tmp)
+        transcript = [(f'message {i}', 1000000000.0 + i, ('work',), 0.5) for i in range(3)]
+        store.import_messages('imported', transcript)
+        store.import_messages('continued', transcript)
+        store.record_message('continued', 'live again', (), -0.5)
+        store.journal.flush()
+
+        restored = SessionStore(max_sessions=100, idle_timeout=3600)
+        SessionJournal(tmp, flush_interval=0.01, snapshot_interval=0).attach(restored)
+        assert restored.sweep() == 0
+        context = restored.get('imported')
+        assert context['conversation_length'] == 3
+        assert context['created_at'] == 1000000000.0
+        assert context['last_activity'].timestamp() > time.time() - 60
+        context = restored.get('continued')
+        assert [r.message for r in context['messages']] == ['message 0', 'message 1', 'message 2', 'live again']
+        assert context['sentiment_history'].recent() == [0.5, 0.5, 0.5, -0.5]
+
+
+def test_deleted_and_evicted_sessions_stay_gone_after_restart():
+    """Deletes, LRU evictions and idle sweeps are journaled, so a restart does not revive them"""
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(max_sessions=2, idle_timeout=60)
+        SessionJournal(tmp, flush_interval=0.01, snapshot_interval=0).attach(store)
+        for session_id in ('deleted', 'idle', 'evicted', 'kept', 'newest'):
+            store.record_message(session_id, 'hello', (), 0.1)
+            if session_id == 'deleted':
+                store.delete('deleted')
+            elif session_id == 'idle':
+                assert store.sweep(now=time.monotonic() + 120) == 1
+        assert set(store.keys()) == {'kept', 'newest'}
+        store.journal.flush()
+
+        restored = _attached_store(tmp)
+        assert set(restored.keys()) == {'kept', 'newest'}
+
+        restored.clear()
+        restored.journal.flush()
+        assert _attached_store(tmp).keys() == []
+
+
+def test_torn_tail_is_ignored():
+    """A partially written last line does not stop the restore"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _attached_store(tmp)
+        store.record_message('s', 'kept', (), 0.1)
+        store.journal.flush()
+        with open(store.journal._segment_path(store.journal._segment), 'a') as f:
+            f.write('["s", 1.0, 2, 1.0, "torn')
+
+        restored = _attached_store(tmp)
+        assert restored.get('s')['conversation_length'] == 1
+
+
+if __name__ == "__main__":
+    test_restart_replays_journal()
+    test_snapshot_then_tail()
+    test_restart_keeps_imported_sessions()
+    test_deleted_and_evicted_sessions_stay_gone_after_restart()
+    test_torn_tail_is_ignored()
+    print("✅ Session journal tests passed")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for the session-affinity router and its worker handoff.
+"""
+
+import sys
+import os
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from config import Config
+from session_router import HashRing, ROUTER_HEADER, WorkerPool, create_router_app, init_worker, worker_env
+from session_store import SessionStore
+
+SESSIONS = [f'session-{i}' for i in range(5000)]
+
+
+def test_ring_spreads_sessions_evenly():
+    """Virtual nodes keep every worker close to an equal share"""
+    ring = HashRing([f'worker-{i}' for i in range(4)])
+    counts = Counter(ring.node_for(session_id) for session_id in SESSIONS)
+    assert max(counts.values()) / (len(SESSIONS) / 4) < 1.3
+
+
+def test_ring_changes_move_only_affected_sessions():
+    """Adding a worker only moves sessions to it; removing one only moves its own"""
+    ring = HashRing([f'worker-{i}' for i in range(4)])
+    before = {session_id: ring.node_for(session_id) for session_id in SESSIONS}
+
+    ring.add('worker-4')
+    moved = [s for s in SESSIONS if ring.node_for(s) != before[s]]
+    assert all(ring.node_for(s) == 'worker-4' for s in moved)
+    assert 0.1 < len(moved) / len(SESSIONS) < 0.3
+
+    ring.remove('worker-4')
+    assert all(ring.node_for(s) == before[s] for s in SESSIONS)
+    ring.remove('worker-0')
+    assert all(ring.node_for(s) == before[s] for s in SESSIONS if before[s] != 'worker-0')
+
+
+def test_worker_handoff_endpoints():
+    """A worker releases the sessions a new ring gives away; another adopts them intact"""
+    def worker_app(store):
+        app = Flask(__name__)
+        init_worker(app, store)
+        return app.test_client()
+
+    old_store, new_store = SessionStore(idle_timeout=0), SessionStore(idle_timeout=0)
+    old, new = worker_app(old_store), worker_app(new_store)
+    for session_id in SESSIONS[:200]:
+        old_store.record_message(session_id, 'I love my job', ('work',), 0.5)
+        old_store.record_message(session_id, 'Coding all day', ('technology',), 0.25)
+
+    token, worker = Config.SESSION_ROUTER_TOKEN, Config.SESSION_ROUTER_WORKER
+    Config.SESSION_ROUTER_TOKEN, Config.SESSION_ROUTER_WORKER = 'secret', 'worker-0'
+    try:
+        assert old.post('/_router/release', json={}).status_code == 404
+        headers = {ROUTER_HEADER: 'secret'}
+        ring = HashRing(['worker-0', 'worker-1'])
+        released = old.post('/_router/release', headers=headers,
+                            json={'workers': ring.nodes, 'virtual_nodes': ring.virtual_nodes}).get_json()['sessions']
+        assert released and all(ring.node_for(s) == 'worker-1' for s in released)
+        assert len(old_store) + len(released) == 200
+
+        new.post('/_router/adopt', headers=headers, json={'sessions': released})
+        context = new_store.get(next(iter(released)))
+        assert context['conversation_length'] == 2
+        assert context['topics'] == {'work', 'technology'}
+        assert context['sentiment_history'].mean == 0.375
+    finally:
+        Config.SESSION_ROUTER_TOKEN, Config.SESSION_ROUTER_WORKER = token, worker
+
+
+def test_release_hands_off_cold_sessions_and_journals_it():
+    """Spilled sessions are released too, and released sessions do not return after a restart"""
+    import tempfile
+    from session_cold import ColdSessionTier
+    from session_journal import SessionJournal
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def journaled_store():
+            store = SessionStore(idle_timeout=0, spill_after=60)
+            store.cold = ColdSessionTier(os.path.join(tmp, 'cold.db'))
+            SessionJournal(os.path.join(tmp, 'journal'), flush_interval=0.01, snapshot_interval=0).attach(store)
+            return store
+
+        store = journaled_store()
+        app = Flask(__name__)
+        init_worker(app, store)
+        for session_id in SESSIONS[:100]:
+            store.record_message(session_id, 'I love my job', ('work',), 0.5)
+        assert store.spill(now=float('inf')) == 100
+
+        token, worker = Config.SESSION_ROUTER_TOKEN, Config.SESSION_ROUTER_WORKER
+        Config.SESSION_ROUTER_TOKEN, Config.SESSION_ROUTER_WORKER = 'secret', 'worker-0'
+        try:
+            ring = HashRing(['worker-0', 'worker-1'])
+            released = app.test_client().post('/_router/release', headers={ROUTER_HEADER: 'secret'},
+                                              json={'workers': ring.nodes, 'virtual_nodes': ring.virtual_nodes})
+            released = released.get_json()['sessions']
+        finally:
+            Config.SESSION_ROUTER_TOKEN, Config.SESSION_ROUTER_WORKER = token, worker
+        assert released and all(ring.node_for(s) == 'worker-1' for s in released)
+        assert len(store.cold) + len(released) == 100
+        store.journal.flush()
+
+        restarted = journaled_store()
+        assert not any(session_id in restarted for session_id in released)
+
+
+def test_router_rejects_non_string_session_ids():
+    """A session_id that cannot be hashed onto the ring is a client error"""
+    class Pool:
+        def forward(self, *args):
+            raise AssertionError('forwarded')
+
+    client = create_router_app(Pool()).test_client()
+    for session_id in ([1, 2], {'id': 1}, 42):
+        response = client.post('/chat', json={'message': 'hi', 'session_id': session_id})
+        assert response.status_code == 400
+
+
+def test_workers_get_their_own_journal_and_cold_tier():
+    """Workers never share a journal directory or cold tier file"""
+    environ = {'SESSION_JOURNAL_DIR': '/var/lib/bot/journal', 'SESSION_COLD_PATH': '/var/lib/bot/cold.db'}
+    env = worker_env('worker-1', 'token', environ)
+    assert env['SESSION_JOURNAL_DIR'] == os.path.join('/var/lib/bot/journal', 'worker-1')
+    assert env['SESSION_COLD_PATH'] == '/var/lib/bot/cold-worker-1.db'
+    assert env['SESSION_BACKEND'] == 'memory' and env['SESSION_ROUTER_WORKER'] == 'worker-1'
+
+    env = worker_env('worker-1', 'token', {})
+    assert 'SESSION_JOURNAL_DIR' not in env and 'SESSION_COLD_PATH' not in env
+
+
+def test_router_keeps_sessions_on_one_worker_while_scaling():
+    """Sessions stay intact through the router while workers are added and removed"""
+    pool = WorkerPool(2).start()
+    try:
+        client = create_router_app(pool).test_client()
+        sessions = SESSIONS[:30]
+
+        def send_all(expected_length):
+            for session_id in sessions:
+                data = client.post('/chat', json={'message': 'I love my job', 'session_id': session_id}).get_json()
+                assert data['conversation_summary']['total_messages'] == expected_length
+
+        send_all(1)
+        send_all(2)
+        pool.add_worker()
+        assert sum(w.stats['sessions_received'] for w in pool.workers.values()) > 0
+        send_all(3)
+        pool.remove_worker('worker-0')
+        send_all(4)
+
+        stats = pool.get_stats()
+        assert sorted(stats['workers']) == ['worker-1', 'worker-2']
+        assert stats['sessions'] == len(sessions)
+        assert stats['rebalances'] == 4
+        assert client.get('/health').status_code == 200
+    finally:
+        pool.stop()
+
+
+def test_router_relays_event_streams():
+    """/chat/stream is relayed event by event and keeps the session on its worker"""
+    pool = WorkerPool(1).start()
+    try:
+        client = create_router_app(pool).test_client()
+        response = client.post('/chat/stream', json={'message': 'I love my job', 'session_id': 'stream'},
+                               buffered=False)
+        assert response.mimetype == 'text/event-stream'
+        chunks = list(response.response)
+        response.close()
+        assert len(chunks) > 1
+        assert b'event: done' in b''.join(chunks)
+        assert pool.get_stats()['workers']['worker-0']['in_flight'] == 0
+
+        data = client.post('/chat', json={'message': 'Still here', 'session_id': 'stream'}).get_json()
+        assert data['conversation_summary']['total_messages'] == 2
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    test_ring_spreads_sessions_evenly()
+    test_ring_changes_move_only_affected_sessions()
+    test_worker_handoff_endpoints()
+    test_release_hands_off_cold_sessions_and_journals_it()
+    test_router_rejects_non_string_session_ids()
+    test_workers_get_their_own_journal_and_cold_tier()
+    test_router_keeps_sessions_on_one_worker_while_scaling()
+    test_router_relays_event_streams()
+    print("✅ Session router tests passed")
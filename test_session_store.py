@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded session store and non-allocating read paths.
+"""
+
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from session_store import SessionStore
+
+
+def test_lru_eviction():
+    """Creating a session beyond the limit evicts the least recently used one"""
+    store = SessionStore(dict, max_sessions=2, idle_timeout=0)
+    store.get_or_create('a')
+    store.get_or_create('b')
+    store.get('a')
+    store.get_or_create('c')
+    assert 'a' in store and 'c' in store
+    assert 'b' not in store
+    assert store.get_stats()['evicted_lru'] == 1
+
+
+def test_idle_sweep():
+    """Sessions idle for longer than the timeout are swept"""
+    store = SessionStore(dict, max_sessions=10, idle_timeout=60, sweep_interval=0)
+    store.get_or_create('old')
+    store.get_or_create('new')
+    now = store._last_access['new']
+    store._last_access['old'] = now - 120
+    assert store.sweep(now=now) == 1
+    assert 'old' not in store and 'new' in store
+    assert store.get_stats()['evicted_idle'] == 1
+
+
+def test_get_does_not_create():
+    """Reads of unknown sessions return None and leave the store untouched"""
+    store = SessionStore(dict, max_sessions=10, idle_timeout=0)
+    assert store.get('missing') is None
+    assert len(store) == 0
+    assert store.get_stats()['misses'] == 1
+
+
+def test_record_message_updates_context():
+    """record_message appends the message, topics and score in one call"""
+    store = SessionStore(max_sessions=10, idle_timeout=0)
+    context = store.record_message('s', 'I love my job', {'work'}, 0.8)
+    store.record_message('s', 'Coding all day', {'technology'}, 0.2)
+    assert context['conversation_length'] == 2
+    assert [m.message for m in context['messages']] == ['I love my job', 'Coding all day']
+    assert context['topics'] == {'work', 'technology'}
+    assert context['sentiment_history'].recent() == [0.8, 0.2]
+
+
+def test_sqlite_store_shared_between_workers():
+    """Two stores on one database (as two workers would be) see one consistent session"""
+    from session_sqlite import SQLiteSessionStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sessions.db')
+        worker_a = SQLiteSessionStore(path, idle_timeout=0)
+        worker_b = SQLiteSessionStore(path, idle_timeout=0)
+
+        worker_a.record_message('s', 'I love my job', {'work'}, 0.8)
+        worker_b.record_message('s', 'Coding all day', {'technology'}, 0.2)
+        context = worker_a.record_message('s', 'Feeling great', (), 0.9)
+
+        assert context['conversation_length'] == 3
+        assert [m.message for m in context['messages']] == ['I love my job', 'Coding all day', 'Feeling great']
+        assert context['topics'] == {'work', 'technology'}
+        assert context['sentiment_history'].recent() == [0.8, 0.2, 0.9]
+        assert worker_b.get('s')['conversation_length'] == 3
+        assert worker_b.get('missing') is None
+        assert 'missing' not in worker_b and len(worker_b) == 1
+
+
+def test_sqlite_cache_reloads_recreated_sessions():
+    """A session deleted or re-imported by another worker is reloaded even at the same length"""
+    from session_sqlite import SQLiteSessionStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sessions.db')
+        worker_a = SQLiteSessionStore(path, idle_timeout=0)
+        worker_b = SQLiteSessionStore(path, idle_timeout=0)
+
+        worker_a.record_message('s', 'old message about work', {'work'}, -0.5)
+        worker_b.delete('s')
+        worker_b.record_message('s', 'brand new text', (), 0.5)
+        context = worker_a.get('s')
+        assert [m.message for m in context['messages']] == ['brand new text']
+        assert context['topics'] == set()
+        assert context['sentiment_history'].recent() == [0.5]
+
+        worker_b.import_messages('s', [('imported text', 1000.0, ('technology',), 0.1)])
+        context = worker_a.get('s')
+        assert [m.message for m in context['messages']] == ['imported text']
+        assert context['topics'] == {'technology'}
+
+        # Writing through the stale cache reloads it as well
+        worker_b.delete('s')
+        worker_b.record_message('s', 'first again', (), 0.2)
+        context = worker_a.record_message('s', 'second', (), 0.3)
+        assert [m.message for m in context['messages']] == ['first again', 'second']
+
+
+def test_sqlite_store_keeps_aggregates_and_prunes_old_messages():
+    """Only the retained window of messages is stored; the sentiment aggregates cover them all"""
+    from session_sqlite import SQLiteSessionStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sessions.db')
+        writer = SQLiteSessionStore(path, idle_timeout=0, max_messages=5)
+        for i in range(12):
+            writer.record_message('s', f'message {i}', ('work',), 0.5 if i % 2 else -0.5)
+        assert writer.message_count() == 5
+
+        # A worker with a cold cache loads the aggregates from the sessions row
+        context = SQLiteSessionStore(path, idle_timeout=0, max_messages=5).get('s')
+        assert context['conversation_length'] == 12
+        assert [m.message for m in context['messages']] == [f'message {i}' for i in range(7, 12)]
+        stats = context['sentiment_history']
+        assert (stats.count, stats.positive, stats.negative, stats.last) == (12, 6, 6, 0.5)
+        assert stats.to_state() == writer.get('s')['sentiment_history'].to_state()
+
+        writer.import_messages('t', [(f'old {i}', 1000.0 + i, (), 0.1) for i in range(8)])
+        assert writer.message_count() == 10
+        assert writer.get('t')['sentiment_history'].count == 8
+
+
+def test_sqlite_store_sweeps_idle_sessions():
+    """Idle sessions are deleted from the shared database"""
+    import time
+    from session_sqlite import SQLiteSessionStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(os.path.join(tmp, 'sessions.db'), idle_timeout=60, sweep_interval=0)
+        store.record_message('old', 'hello')
+        assert store.sweep(now=time.time() + 120) == 1
+        assert 'old' not in store
+        assert store.message_count() == 0
+
+
+def test_idle_sessions_spill_and_rehydrate():
+    """Idle sessions move to the cold tier and come back intact on access"""
+    from session_cold import ColdSessionTier
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(max_sessions=10, idle_timeout=0, spill_after=60)
+        store.cold = ColdSessionTier(os.path.join(tmp, 'cold.db'))
+        store.record_message('idle', 'I love my job', {'work'}, 0.8)
+        store.record_message('busy', 'Coding all day', {'technology'}, 0.2)
+        store._last_access['idle'] -= 120
+
+        assert store.spill() == 1
+        assert len(store) == 1 and 'idle' in store
+        stats = store.get_stats()
+        assert stats['hot_sessions'] == 1
+        assert stats['cold']['cold_sessions'] == 1 and stats['cold']['ram_saved_bytes'] > 0
+
+        context = store.record_message('idle', 'Still enjoying it', {'work'}, 0.6)
+        assert context['conversation_length'] == 2
+        assert [r.message for r in context['messages']] == ['I love my job', 'Still enjoying it']
+        assert context['sentiment_history'].recent() == [0.8, 0.6]
+        assert store.cold.get_stats()['rehydrations'] == 1
+        assert len(store.cold) == 0
+
+
+def test_cold_misses_do_not_take_the_write_lock():
+    """Looking up sessions that were never spilled does not wait for the cold tier's writers"""
+    from session_cold import ColdSessionTier
+    from session_sqlite import connect
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cold.db')
+        store = SessionStore(max_sessions=10, idle_timeout=0, spill_after=60)
+        store.cold = ColdSessionTier(path)
+        writer = connect(path, busy_timeout_ms=0)
+        writer.execute('BEGIN IMMEDIATE')
+        try:
+            store.cold._connection().execute('PRAGMA busy_timeout=0')
+            assert store.get('never-spilled') is None
+            assert 'never-spilled' not in store
+        finally:
+            writer.execute('ROLLBACK')
+
+
+def test_unknown_session_endpoints_do_not_allocate():
+    """Summary and analysis of unknown sessions are 404s and create nothing"""
+    import app
+
+    client = app.app.test_client()
+    before = len(app.conversation_contexts)
+    assert client.get('/conversation_summary/no_such_session').status_code == 404
+    assert client.post('/long_conversation', json={'session_id': 'no_such_session'}).status_code == 404
+    assert len(app.conversation_contexts) == before
+    assert 'no_such_session' not in app.conversation_contexts
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_idle_sweep()
+    test_get_does_not_create()
+    test_record_message_updates_context()
+    test_sqlite_store_shared_between_workers()
+    test_sqlite_cache_reloads_recreated_sessions()
+    test_sqlite_store_keeps_aggregates_and_prunes_old_messages()
+    test_sqlite_store_sweeps_idle_sessions()
+    test_idle_sessions_spill_and_rehydrate()
+    test_cold_misses_do_not_take_the_write_lock()
+    test_unknown_session_endpoints_do_not_allocate()
+    print("✅ Session store tests passed")
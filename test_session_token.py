@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for stateless sessions carried in signed client tokens.
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from session_store import apply_message, new_conversation_context
+from session_token import decode_session, encode_session
+
+
+def _conversation(messages):
+    context = new_conversation_context()
+    for i in range(messages):
+        apply_message(context, f'message number {i} about work', time.time(), ('work',), 0.5 if i % 2 else -0.25)
+    return context
+
+
+def test_token_round_trip():
+    """A decoded token carries the session's aggregates, topics and recent window"""
+    context = _conversation(30)
+    restored = decode_session(encode_session('s1', context), 's1')
+    assert restored['conversation_length'] == 30
+    assert restored['version'] == context['version']
+    assert restored['topics'] == {'work'}
+    assert restored['sentiment_history'].mean == context['sentiment_history'].mean
+    assert restored['sentiment_history'].trend() == context['sentiment_history'].trend()
+    assert [r.message for r in restored['messages']] == [r.message for r in context['messages']][-10:]
+    assert restored['message_stats'].frequency('work') == len(restored['messages'])
+
+
+def test_token_rejects_tampering_and_other_sessions():
+    """Forged, re-keyed, expired or borrowed tokens are ignored"""
+    token = encode_session('s1', _conversation(3))
+    body, _, signature = token.rpartition('.')
+    assert decode_session(body + 'x.' + signature, 's1') is None
+    assert decode_session(token, 's1', secret='another-secret') is None
+    assert decode_session(token, 's2') is None
+    assert decode_session('garbage', 's1') is None
+    for not_a_token in ([1, 2], {'v1.': 1}, 42):
+        assert decode_session(not_a_token, 's1') is None
+    context = _conversation(3)
+    context['last_activity'] = context['last_activity'].fromtimestamp(time.time() - 7200)
+    assert decode_session(encode_session('s1', context), 's1', max_idle=3600) is None
+
+
+def test_token_size_is_bounded():
+    """Long messages are dropped from the window until the token fits"""
+    context = new_conversation_context()
+    for i in range(20):
+        apply_message(context, os.urandom(600).hex(), time.time(), (), 0.1)
+    token = encode_session('s1', context, max_bytes=2048)
+    assert len(token) <= 2048
+    restored = decode_session(token, 's1', max_bytes=2048)
+    assert restored['conversation_length'] == 20
+    assert 0 < len(restored['messages']) < 10
+
+
+def test_token_rejects_malformed_signed_payloads():
+    """A correctly signed token whose payload is not a session is ignored, not a server error"""
+    import json
+    import zlib
+    from session_token import TOKEN_PREFIX, _b64encode, _sign
+
+    def signed(payload):
+        body = TOKEN_PREFIX + _b64encode(zlib.compress(json.dumps(payload).encode('utf-8')))
+        return body + '.' + _sign(body, 'secret')
+
+    for payload in ('s1', ['s1'], ['s1', 'state'], ['s1', {}], ['s1', {'a': 'yesterday'}],
+                    ['s1', {'a': time.time(), 'm': [], 's': []}]):
+        assert decode_session(signed(payload), 's1', secret='secret') is None
+
+
+def test_stateless_store_refuses_the_default_secret():
+    """Without SECRET_KEY tokens are signed with a random key, so the public default cannot forge them"""
+    from config import Config
+    from session_token import StatelessSessionStore
+
+    default_secret, Config.SECRET_KEY = Config.SECRET_KEY, Config.DEFAULT_SECRET_KEY
+    try:
+        store = StatelessSessionStore()
+    finally:
+        Config.SECRET_KEY = default_secret
+    assert store.secret != Config.DEFAULT_SECRET_KEY
+    assert StatelessSessionStore(secret='configured').secret == 'configured'
+
+
+def test_stateless_chat_round_trip():
+    """/chat on a stateless store returns a token that continues the session"""
+    from flask import Flask, jsonify, request
+    from session_token import StatelessSessionStore
+
+    store = StatelessSessionStore()
+    app = Flask(__name__)
+
+    @app.route('/chat', methods=['POST'])
+    def chat():
+        session_id = request.get_json()['session_id']
+        context = store.record_message(session_id, request.get_json()['message'], ('work',), 0.5)
+        return jsonify({'length': context['conversation_length'], 'session_state': store.client_state(session_id)})
+
+    client = app.test_client()
+    state = None
+    for expected in (1, 2, 3):
+        data = client.post('/chat', json={'session_id': 'abc', 'message': 'hi', 'session_state': state}).get_json()
+        assert data['length'] == expected
+        state = data['session_state']
+    # A fresh instance sees a new session without the token
+    assert client.post('/chat', json={'session_id': 'abc', 'message': 'hi'}).get_json()['length'] == 1
+    assert store.get_stats()['restored'] == 2
+    # A state that is not a string is rejected like any other bad token
+    response = client.post('/chat', json={'session_id': 'abc', 'message': 'hi', 'session_state': [1, 2]})
+    assert response.get_json()['length'] == 1
+    assert store.get_stats()['rejected'] == 1
+
+
+def test_stateless_long_conversation_with_trimmed_window():
+    """A token carrying fewer than ten messages of a long conversation is still analyzed"""
+    import app
+    from session_token import StatelessSessionStore
+
+    store = StatelessSessionStore(secret='secret')
+    token = encode_session('trimmed', _conversation(12), secret='secret', window=5)
+    original, app.conversation_contexts = app.conversation_contexts, store
+    try:
+        response = app.app.test_client().post('/long_conversation',
+                                              json={'session_id': 'trimmed', 'session_state': token})
+    finally:
+        app.conversation_contexts = original
+    assert response.status_code == 200
+    assert response.get_json()['conversation_analysis']['total_messages'] == 12
+
+
+if __name__ == "__main__":
+    test_token_round_trip()
+    test_token_rejects_tampering_and_other_sessions()
+    test_token_size_is_bounded()
+    test_token_rejects_malformed_signed_payloads()
+    test_stateless_store_refuses_the_default_secret()
+    test_stateless_chat_round_trip()
+    test_stateless_long_conversation_with_trimmed_window()
+    print("✅ Session token tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for fingerprinted static assets and the cached home page.
+"""
+
+import sys
+import os
+import gzip
+import re
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _asset_urls(html):
+    return re.findall(r'(?:href|src)="(/static/[^"]+)"', html)
+
+
+def test_home_links_fingerprinted_assets():
+    """Both entry points link assets with their content hash and serve them immutable"""
+    import app
+    import index
+
+    for flask_app in (app.app, index.app):
+        client = flask_app.test_client()
+        html = client.get('/').get_data(as_text=True)
+        urls = _asset_urls(html)
+        assert sorted(url.split('?')[0] for url in urls) == ['/static/script.js', '/static/styles.css']
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+            assert response.headers['ETag'].startswith('"')
+
+            etag = response.headers['ETag']
+            assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+        plain = client.get('/static/styles.css')
+        assert plain.headers['Cache-Control'] == 'no-cache'
+        assert client.get('/static/missing.css').status_code == 404
+
+
+def test_home_page_rendered_once_and_precompressed():
+    """The home page is the same stored bytes each time, gzip-encoded when accepted"""
+    import app
+
+    client = app.app.test_client()
+    first = client.get('/')
+    compressed = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(compressed.get_data()) == first.get_data()
+    assert len(compressed.get_data()) < len(first.get_data()) / 2
+
+    response = client.get('/', headers={'If-None-Match': compressed.headers['ETag']})
+    assert response.status_code == 304 and not response.get_data()
+    assert client.get('/static/script.js', headers={'Accept-Encoding': 'gzip'}).headers['Content-Encoding'] == 'gzip'
+
+
+if __name__ == "__main__":
+    test_home_links_fingerprinted_assets()
+    test_home_page_rendered_once_and_precompressed()
+    print("✅ Static asset tests passed")
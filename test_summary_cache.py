@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned conversation summary cache and ETag revalidation.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_summary_etag_revalidation():
+    """Unchanged sessions answer If-None-Match with 304; a new message changes the ETag"""
+    import app
+
+    client = app.app.test_client()
+    client.post('/chat', json={'message': 'I love my new job', 'session_id': 'etag_test'})
+
+    first = client.get('/conversation_summary/etag_test')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+
+    cached = client.get('/conversation_summary/etag_test', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+
+    client.post('/chat', json={'message': 'Work is stressful today', 'session_id': 'etag_test'})
+    changed = client.get('/conversation_summary/etag_test', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['summary']['total_messages'] == 2
+
+
+def test_derived_results_cached_per_version():
+    """Derived results are computed once per session version"""
+    import app
+
+    app.update_conversation_context('version_test', 'Coding all day', {'technology'}, 0.4)
+    context = app.conversation_contexts.get('version_test')
+    calls = []
+
+    def compute(ctx):
+        calls.append(ctx['version'])
+        return {'version': ctx['version']}
+
+    assert app.cached_for_version(context, 'test', compute) == {'version': 1}
+    assert app.cached_for_version(context, 'test', compute) == {'version': 1}
+    app.update_conversation_context('version_test', 'Still coding', {'technology'}, 0.1)
+    assert app.cached_for_version(context, 'test', compute) == {'version': 2}
+    assert calls == [1, 2]
+
+
+if __name__ == "__main__":
+    test_summary_etag_revalidation()
+    test_derived_results_cached_per_version()
+    print("✅ Summary cache tests passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for slow request tracing and the /debug/slow endpoint.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from tracing import SlowRequestTracer
+
+
+def test_fast_requests_are_not_recorded():
+    """Requests under the threshold leave the ring buffer untouched"""
+    tracer = SlowRequestTracer(threshold_ms=10000, capacity=3)
+    tracer.begin()
+    tracer.add_span('json_parse', 0.001)
+    assert tracer.finish('/chat', 'POST', 200, 10) is None
+    assert len(tracer.traces) == 0
+
+
+def test_slow_requests_fill_a_bounded_ring():
+    """Slow requests keep their breakdown and the oldest ones are dropped"""
+    tracer = SlowRequestTracer(threshold_ms=0, capacity=3)
+    for i in range(5):
+        tracer.begin()
+        tracer.add_span('json_parse', 0.002)
+        tracer.add_span('summary', 0.001 * i)
+        tracer.finish('/chat', 'POST', 200, i)
+
+    assert len(tracer.traces) == 3
+    assert [trace['input_bytes'] for trace in tracer.traces] == [2, 3, 4]
+    assert tracer.traces[-1]['spans_ms'] == {'json_parse': 2.0, 'summary': 4.0}
+
+
+def test_debug_slow_endpoint():
+    """/debug/slow serves the chat breakdown to admins only"""
+    import app
+    from tracing import tracer
+
+    client = app.app.test_client()
+    previous_threshold = tracer.threshold
+    tracer.threshold = 0
+    Config.ADMIN_TOKEN = 'secret'
+    try:
+        client.post('/chat', json={'message': 'Work has been stressful lately', 'session_id': 'trace_test'})
+        assert client.get('/debug/slow').status_code == 404
+
+        response = client.get('/debug/slow', headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 200
+        chat_traces = [trace for trace in response.get_json()['traces'] if trace['route'] == '/chat']
+        spans = chat_traces[0]['spans_ms']
+        for stage in ('json_parse', 'update_context', 'topic_detection', 'response_generation',
+                      'suggestions', 'summary'):
+            assert stage in spans
+        assert chat_traces[0]['input_bytes'] > 0
+    finally:
+        tracer.threshold = previous_threshold
+        Config.ADMIN_TOKEN = ''
+
+
+if __name__ == "__main__":
+    test_fast_requests_are_not_recorded()
+    test_slow_requests_fill_a_bounded_ring()
+    test_debug_slow_endpoint()
+    print("✅ Tracing tests passed")
@@ -0,0 +1,123 @@
+# SentimentBot Pro - Slow request tracing
+#
+# Every request accumulates span timings into a preallocated per-thread array.
+# Only requests slower than SLOW_REQUEST_THRESHOLD_MS are turned into trace
+# records, which are kept in a bounded ring buffer served at /debug/slow.
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+
+from flask import jsonify, request
+
+from config import Config
+from admin import admin_required
+
+MAX_STAGES = 64
+
+
+class SlowRequestTracer:
+    """Per-request span timings with a ring buffer of slow requests"""
+
+    def __init__(self, threshold_ms=Config.SLOW_REQUEST_THRESHOLD_MS, capacity=Config.SLOW_TRACE_BUFFER_SIZE):
+        self.threshold = threshold_ms / 1000.0
+        self.traces = deque(maxlen=capacity)
+        self._stage_index = {}
+        self._stage_names = []
+        self._stages_lock = threading.Lock()
+        self._local = threading.local()
+        self._zeros = array('d', [0.0] * MAX_STAGES)
+
+    def _index(self, stage):
+        index = self._stage_index.get(stage)
+        if index is None:
+            with self._stages_lock:
+                index = self._stage_index.get(stage)
+                if index is None:
+                    if len(self._stage_names) >= MAX_STAGES:
+                        return None
+                    index = len(self._stage_names)
+                    self._stage_names.append(stage)
+                    self._stage_index[stage] = index
+        return index
+
+    def begin(self):
+        """Start timing a request on this thread"""
+        local = self._local
+        spans = getattr(local, 'spans', None)
+        if spans is None:
+            spans = local.spans = array('d', self._zeros)
+        else:
+            spans[:] = self._zeros
+        local.start = time.perf_counter()
+        local.active = True
+
+    def add_span(self, stage, seconds):
+        """Accumulate time spent in a stage of the current request"""
+        local = self._local
+        if not getattr(local, 'active', False):
+            return
+        index = self._index(stage)
+        if index is not None:
+            local.spans[index] += seconds
+
+    def finish(self, route, method, status, input_bytes):
+        """Stop timing; keep a trace record only if the request was slow"""
+        local = self._local
+        if not getattr(local, 'active', False):
+            return None
+        local.active = False
+        elapsed = time.perf_counter() - local.start
+        if elapsed < self.threshold:
+            return None
+
+        spans = local.spans
+        breakdown = {}
+        for index, stage in enumerate(self._stage_names):
+            if spans[index]:
+                breakdown[stage] = round(spans[index] * 1000, 3)
+
+        trace = {
+            'timestamp': datetime.now().isoformat(),
+            'route': route,
+            'method': method,
+            'status': status,
+            'duration_ms': round(elapsed * 1000, 3),
+            'input_bytes': input_bytes,
+            'spans_ms': breakdown,
+        }
+        self.traces.append(trace)
+        return trace
+
+
+tracer = SlowRequestTracer()
+
+
+def init_app(app):
+    """Trace every request and serve the slow-request buffer at /debug/slow"""
+
+    @app.before_request
+    def _begin_trace():
+        tracer.begin()
+
+    @app.after_request
+    def _finish_trace(response):
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        tracer.finish(route, request.method, response.status_code, request.content_length or 0)
+        return response
+
+    @app.route('/debug/slow', methods=['GET'])
+    @admin_required
+    def debug_slow():
+        """Slowest recent requests with their per-stage breakdown (admin only)"""
+        traces = list(tracer.traces)
+        traces.reverse()
+        return jsonify({
+            'threshold_ms': tracer.threshold * 1000,
+            'capacity': tracer.traces.maxlen,
+            'count': len(traces),
+            'traces': traces
+        })
+
+    return app